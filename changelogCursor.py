@@ -0,0 +1,61 @@
+import time
+
+
+class ChangelogCursor:
+    """Position in the internship_changes changelog that doesn't skip entries committed out of order.
+
+    seq is AUTO_INCREMENT, so it is handed out when a transaction writes its
+    entry, not when it commits: a poll can see seq 12 while the transaction
+    holding seq 11 is still open. Seqs missing below the newest one read are
+    kept as gaps and asked for again on every poll (see where()), until they
+    turn up or are older than `gap_timeout` seconds. A rolled back
+    transaction leaves a gap that never fills, so gaps can't be kept forever;
+    one that expires may have been a very long transaction, which is what
+    the periodic reconcile is for.
+
+    Gaps are kept as {seq: unix time first noticed}, so they can be persisted
+    as JSON and passed back in.
+    """
+
+    def __init__(self, position, gaps=None, gap_timeout=60.0, max_gaps=1000):
+        self.position = position
+        self.gaps = {int(seq): noticed_at for seq, noticed_at in (gaps or {}).items()}
+        self.gap_timeout = gap_timeout
+        self.max_gaps = max_gaps
+        self.given_up = 0  # Missing seqs no longer waited for, see expire()
+
+    def where(self):
+        """SQL condition and params for the entries still to read: after the position, plus open gaps."""
+        if not self.gaps:
+            return "seq > %s", [self.position]
+        gaps = sorted(self.gaps)
+        return f"(seq > %s OR seq IN ({', '.join(['%s'] * len(gaps))}))", [self.position] + gaps
+
+    def advance(self, seqs, now=None):
+        """Move past the seqs a read returned, in ascending order, opening gaps for any it skipped."""
+        now = time.time() if now is None else now
+        for seq in seqs:
+            if self.gaps.pop(seq, None) is not None or seq <= self.position:
+                continue
+            # A jump of thousands of seqs (a large rolled back insert) isn't
+            # worth a huge IN list; only the newest max_gaps are waited for
+            first_missing = max(self.position + 1, seq - self.max_gaps)
+            self.given_up += first_missing - (self.position + 1)
+            for missing in range(first_missing, seq):
+                self.gaps[missing] = now
+            self.position = seq
+
+    def expire(self, now=None):
+        """Give up on gaps older than gap_timeout or beyond max_gaps; returns how many were given up since the last call."""
+        now = time.time() if now is None else now
+        expired = {seq for seq, noticed_at in self.gaps.items() if now - noticed_at > self.gap_timeout}
+        remaining = sorted(seq for seq in self.gaps if seq not in expired)
+        expired.update(remaining[:max(len(remaining) - self.max_gaps, 0)])
+        for seq in expired:
+            del self.gaps[seq]
+        given_up, self.given_up = self.given_up + len(expired), 0
+        return given_up
+
+    def floor(self):
+        """The newest seq with nothing still missing at or below it."""
+        return min(self.gaps) - 1 if self.gaps else self.position
@@ -0,0 +1,602 @@
+import mysql.connector
+from google.oauth2.credentials import Credentials
+from google_auth_oauthlib.flow import InstalledAppFlow
+from google.auth.transport.requests import Request
+from datetime import datetime
+import argparse
+import os
+import re
+import tempfile
+import time
+
+from googleServices import build_service
+
+SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
+
+# Widening order for inferred column types. A column is promoted to the
+# narrowest type that can hold every sampled value.
+TYPE_ORDER = ["BOOLEAN", "INT", "BIGINT", "DOUBLE", "DATE", "DATETIME", "VARCHAR"]
+
+INT_RANGE = (-(2**31), 2**31 - 1)
+BIGINT_RANGE = (-(2**63), 2**63 - 1)
+
+DATE_FORMATS = ["%Y-%m-%d", "%m/%d/%Y", "%d-%m-%Y"]
+DATETIME_FORMATS = ["%Y-%m-%d %H:%M:%S", "%m/%d/%Y %H:%M:%S", "%Y-%m-%dT%H:%M:%S"]
+
+INTEGER_PATTERN = re.compile(r"^-?(0|[1-9]\d*)$")
+FLOAT_PATTERN = re.compile(r"^-?\d+\.\d*$|^-?\d*\.\d+$|^-?\d+(\.\d*)?[eE][-+]?\d+$")
+
+# VARCHAR columns longer than this are created as TEXT instead
+MAX_VARCHAR_LENGTH = 1024
+
+
+# Google Sheets Authentication
+def google_sheets_auth():
+    creds = None
+    if os.path.exists("token.json"):
+        creds = Credentials.from_authorized_user_file("token.json", SCOPES)
+    if not creds or not creds.valid:
+        if creds and creds.expired and creds.refresh_token:
+            creds.refresh(Request())
+        else:
+            flow = InstalledAppFlow.from_client_secrets_file("credentials.json", SCOPES)
+            creds = flow.run_local_server(port=8080)
+        with open("token.json", "w") as token:
+            token.write(creds.to_json())
+    return creds
+
+
+def read_spreadsheet_id(path):
+    if not os.path.exists(path):
+        raise FileNotFoundError("The spreadsheet ID file is missing.")
+    with open(path, "r") as file:
+        return file.read().strip()
+
+
+def get_db_connection(allow_local_infile=False):
+    return mysql.connector.connect(
+        host="localhost",
+        database="superzz",
+        user="superjoin",
+        password="super",
+        allow_local_infile=allow_local_infile,
+    )
+
+
+# ===================== Reading the Sheet ===================== #
+def column_letter(index):
+    """Convert a zero-based column index into a sheet column letter (0 -> A, 26 -> AA)."""
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def grid_row_count(sheet, spreadsheet_id, tab):
+    """Return how many rows the tab's grid has, or None if the API doesn't say."""
+    result = (
+        sheet.get(
+            spreadsheetId=spreadsheet_id,
+            fields="sheets(properties(title,gridProperties(rowCount)))",
+        )
+        .execute()
+    )
+    for tab_resource in result.get("sheets", []):
+        properties = tab_resource.get("properties", {})
+        if properties.get("title") == tab:
+            return properties.get("gridProperties", {}).get("rowCount")
+    return None
+
+
+def read_sheet_rows(sheet, spreadsheet_id, tab, first_row, last_column, limit=None, page_size=1000,
+                    last_row=None):
+    """Yield (row number, row) pairs starting at `first_row`, one API page at a time.
+
+    Reads up to `last_row` (the grid's row count) when it is known, and
+    otherwise until a page comes back with no rows at all. Values are
+    requested unformatted so numbers and booleans arrive typed, while dates
+    are kept as their formatted strings.
+    """
+    row_number = first_row
+    remaining = limit
+    while remaining is None or remaining > 0:
+        count = page_size if remaining is None else min(page_size, remaining)
+        if last_row is not None:
+            count = min(count, last_row - row_number + 1)
+            if count <= 0:
+                return
+        range_name = f"{tab}!A{row_number}:{last_column}{row_number + count - 1}"
+        result = (
+            sheet.values()
+            .get(
+                spreadsheetId=spreadsheet_id,
+                range=range_name,
+                valueRenderOption="UNFORMATTED_VALUE",
+                dateTimeRenderOption="FORMATTED_STRING",
+            )
+            .execute()
+        )
+        values = result.get("values", [])
+        for offset, row in enumerate(values):
+            yield row_number + offset, row
+        # Trailing empty rows are not returned, so a short page can still be
+        # followed by more data after a run of blank rows. Without the grid
+        # size, only a page with nothing in it marks the end.
+        if last_row is None and not values:
+            return
+        row_number += count
+        if remaining is not None:
+            remaining -= count
+
+
+def is_empty(value):
+    return value is None or (isinstance(value, str) and value.strip() == "")
+
+
+# ===================== Schema Inference ===================== #
+def sanitize_column_names(headers):
+    """Turn sheet headers into unique, SQL-safe column names."""
+    names = []
+    seen = set()
+    for position, header in enumerate(headers):
+        name = re.sub(r"[^0-9a-zA-Z]+", "_", str(header or "")).strip("_").lower()
+        if not name:
+            name = f"column_{position + 1}"
+        if name[0].isdigit():
+            name = f"c_{name}"
+        name = name[:64]
+        base, suffix = name, 2
+        while name in seen:
+            name = f"{base[:60]}_{suffix}"
+            suffix += 1
+        seen.add(name)
+        names.append(name)
+    return names
+
+
+def parse_datetime(value, formats):
+    for fmt in formats:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def classify_value(value):
+    """Return the narrowest type name that can store a single non-empty value."""
+    if isinstance(value, bool):
+        return "BOOLEAN"
+    if isinstance(value, int):
+        return "INT" if INT_RANGE[0] <= value <= INT_RANGE[1] else "BIGINT"
+    if isinstance(value, float):
+        if value.is_integer() and INT_RANGE[0] <= value <= INT_RANGE[1]:
+            return "INT"
+        return "DOUBLE"
+
+    text = str(value).strip()
+    if text.upper() in ("TRUE", "FALSE"):
+        return "BOOLEAN"
+    if INTEGER_PATTERN.match(text):
+        number = int(text)
+        if INT_RANGE[0] <= number <= INT_RANGE[1]:
+            return "INT"
+        if BIGINT_RANGE[0] <= number <= BIGINT_RANGE[1]:
+            return "BIGINT"
+        return "VARCHAR"
+    if FLOAT_PATTERN.match(text):
+        return "DOUBLE"
+    if parse_datetime(text, DATE_FORMATS):
+        return "DATE"
+    if parse_datetime(text, DATETIME_FORMATS):
+        return "DATETIME"
+    return "VARCHAR"
+
+
+def widen(current, new):
+    """Combine two inferred types into one that can hold both."""
+    if current is None:
+        return new
+    if current == new:
+        return current
+    numeric = {"INT", "BIGINT", "DOUBLE"}
+    temporal = {"DATE", "DATETIME"}
+    if (current in numeric and new in numeric) or (current in temporal and new in temporal):
+        return max(current, new, key=TYPE_ORDER.index)
+    return "VARCHAR"
+
+
+def infer_schema(column_names, sample_rows):
+    """Infer type, nullability and a primary key for each column from sampled rows."""
+    columns = []
+    for position, name in enumerate(column_names):
+        column_type = None
+        nullable = False
+        max_length = 0
+        distinct_values = set()
+        unique = True
+
+        for row in sample_rows:
+            value = row[position] if position < len(row) else None
+            if is_empty(value):
+                nullable = True
+                continue
+            column_type = widen(column_type, classify_value(value))
+            max_length = max(max_length, len(str(value)))
+            key = str(value).strip()
+            if key in distinct_values:
+                unique = False
+            distinct_values.add(key)
+
+        columns.append(
+            {
+                "name": name,
+                "type": column_type or "VARCHAR",
+                "nullable": nullable or column_type is None,
+                "max_length": max_length,
+                "unique": unique and not nullable and column_type is not None,
+            }
+        )
+
+    primary_key = choose_primary_key(columns)
+    for column in columns:
+        column["primary_key"] = column["name"] == primary_key
+    return columns, primary_key
+
+
+def choose_primary_key(columns):
+    """Pick a natural key: a unique, non-null column, preferring integer id-like names."""
+    candidates = [column for column in columns if column["unique"]]
+    if not candidates:
+        return None
+
+    def score(column):
+        id_like = column["name"] == "id" or column["name"].endswith("_id")
+        integer = column["type"] in ("INT", "BIGINT")
+        short_text = column["type"] == "VARCHAR" and column["max_length"] <= 255
+        return (id_like and integer, integer, id_like, short_text)
+
+    best = max(candidates, key=score)
+    if best["type"] in ("INT", "BIGINT") or (
+        best["type"] == "VARCHAR" and best["max_length"] <= 255
+    ):
+        return best["name"]
+    return None
+
+
+def varchar_length(column):
+    """Longest value, in characters, the text column created for `column` can hold."""
+    if column["max_length"] > MAX_VARCHAR_LENGTH // 2 and not column["primary_key"]:
+        # TEXT holds 65535 bytes, which is 16383 characters of utf8mb4 at worst
+        return 65535 // 4
+    # Leave headroom above the longest sampled value, rounded to a power of two
+    length = 32
+    while length < column["max_length"] * 2 and length < MAX_VARCHAR_LENGTH:
+        length *= 2
+    return min(length, 255) if column["primary_key"] else length
+
+
+def column_sql_type(column):
+    if column["type"] == "VARCHAR":
+        length = varchar_length(column)
+        return "TEXT" if length > MAX_VARCHAR_LENGTH else f"VARCHAR({length})"
+    if column["type"] == "BOOLEAN":
+        return "TINYINT(1)"
+    return column["type"]
+
+
+def build_create_table_query(table_name, columns, primary_key):
+    column_definitions = []
+    if primary_key is None:
+        # No natural key in the sample, so fall back to a surrogate one
+        column_definitions.append("`_row_id` BIGINT AUTO_INCREMENT")
+    for column in columns:
+        null_clause = "NULL" if column["nullable"] else "NOT NULL"
+        column_definitions.append(
+            f"`{column['name']}` {column_sql_type(column)} {null_clause}"
+        )
+    key_column = primary_key or "_row_id"
+    column_definitions.append(f"PRIMARY KEY (`{key_column}`)")
+    return f"CREATE TABLE IF NOT EXISTS `{table_name}` ({', '.join(column_definitions)})"
+
+
+def print_schema(table_name, columns, primary_key, sampled):
+    print(f"Inferred schema for `{table_name}` from {sampled} sampled rows:")
+    for column in columns:
+        flags = []
+        if column["primary_key"]:
+            flags.append("PRIMARY KEY")
+        flags.append("NULL" if column["nullable"] else "NOT NULL")
+        print(f"  {column['name']:<30} {column_sql_type(column):<14} {' '.join(flags)}")
+    if primary_key is None:
+        print("  (no unique non-null column found, using surrogate key `_row_id`)")
+
+
+# ===================== Bulk Loading ===================== #
+def convert_value(value, column):
+    """Convert a raw sheet value into the Python value for its inferred column type."""
+    if is_empty(value):
+        return None
+    column_type = column["type"]
+    text = str(value).strip()
+    if column_type == "BOOLEAN":
+        if isinstance(value, bool):
+            return int(value)
+        if text.upper() not in ("TRUE", "FALSE"):
+            raise ValueError(f"{value!r} is not a boolean")
+        return 1 if text.upper() == "TRUE" else 0
+    if column_type in ("INT", "BIGINT"):
+        if isinstance(value, float) and not value.is_integer():
+            raise ValueError(f"{value!r} is not a whole number")
+        number = int(value) if isinstance(value, float) else int(text)
+        low, high = INT_RANGE if column_type == "INT" else BIGINT_RANGE
+        if not low <= number <= high:
+            raise ValueError(f"{number} is out of range for {column_type}")
+        return number
+    if column_type == "DOUBLE":
+        return float(value)
+    if column_type == "DATE":
+        return parse_datetime(text, DATE_FORMATS).date()
+    if column_type == "DATETIME":
+        parsed = parse_datetime(text, DATETIME_FORMATS) or parse_datetime(text, DATE_FORMATS)
+        if parsed is None:
+            raise ValueError(f"{value!r} is not a date and time")
+        return parsed
+    length = varchar_length(column)
+    if len(text) > length:
+        raise ValueError(f"{len(text)} characters is too long for {column_sql_type(column)}")
+    return text
+
+
+def convert_row(row, columns, row_number):
+    converted = []
+    for position, column in enumerate(columns):
+        value = row[position] if position < len(row) else None
+        try:
+            converted_value = convert_value(value, column)
+        except (TypeError, ValueError, AttributeError):
+            raise ValueError(
+                f"Row {row_number}: value {value!r} does not fit inferred type "
+                f"{column['type']} of column `{column['name']}`. "
+                "Re-run with a larger --sample-rows (0 samples every row)."
+            )
+        if converted_value is None and not column["nullable"]:
+            raise ValueError(
+                f"Row {row_number}: column `{column['name']}` was inferred NOT NULL "
+                "but is empty. Re-run with a larger --sample-rows (0 samples every row)."
+            )
+        converted.append(converted_value)
+    return converted
+
+
+def validate_rows(numbered_rows, columns, primary_key):
+    """Convert every row once before anything is written; raises ValueError naming the first bad row.
+
+    Also checks the primary key is unique across all rows, not just the
+    sample it was chosen from: the load upserts, so a repeated key would
+    silently keep only the last of its rows.
+    """
+    key_position = next(
+        (position for position, column in enumerate(columns) if column["name"] == primary_key), None
+    )
+    first_seen = {}
+    for row_number, row in numbered_rows:
+        converted = convert_row(row, columns, row_number)
+        if key_position is None:
+            continue
+        key = converted[key_position]
+        # Text keys compare like MySQL's default case-insensitive collation
+        if isinstance(key, str):
+            key = key.lower()
+        if key in first_seen:
+            raise ValueError(
+                f"Row {row_number}: `{primary_key}` value {converted[key_position]!r} "
+                f"repeats row {first_seen[key]}, so it can't be the primary key. "
+                "Re-run with a larger --sample-rows (0 samples every row)."
+            )
+        first_seen[key] = row_number
+
+
+def build_insert_query(table_name, column_names, row_count, primary_key):
+    columns_sql = ", ".join(f"`{name}`" for name in column_names)
+    row_placeholder = "(" + ", ".join(["%s"] * len(column_names)) + ")"
+    query = (
+        f"INSERT INTO `{table_name}` ({columns_sql}) VALUES "
+        + ", ".join([row_placeholder] * row_count)
+    )
+    update_columns = [name for name in column_names if name != primary_key]
+    if primary_key and update_columns:
+        query += " ON DUPLICATE KEY UPDATE " + ", ".join(
+            f"`{name}` = VALUES(`{name}`)" for name in update_columns
+        )
+    return query
+
+
+def load_with_inserts(cursor, connection, table_name, columns, primary_key, rows, chunk_size):
+    """Load rows with one multi-row INSERT per chunk, committing after each chunk."""
+    column_names = [column["name"] for column in columns]
+    total_loaded = 0
+    chunk = []
+
+    def flush():
+        params = [value for row in chunk for value in row]
+        cursor.execute(
+            build_insert_query(table_name, column_names, len(chunk), primary_key), params
+        )
+        connection.commit()
+
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            flush()
+            total_loaded += len(chunk)
+            chunk = []
+    if chunk:
+        flush()
+        total_loaded += len(chunk)
+    return total_loaded
+
+
+def escape_infile_value(value):
+    """Render a value for LOAD DATA's default tab-separated, backslash-escaped format."""
+    if value is None:
+        return "\\N"
+    text = str(value)
+    return (
+        text.replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def load_with_infile(cursor, connection, table_name, columns, primary_key, rows):
+    """Spool rows to a temporary file and load them with a single LOAD DATA LOCAL INFILE."""
+    column_names = [column["name"] for column in columns]
+    total_loaded = 0
+    handle, path = tempfile.mkstemp(suffix=".tsv")
+    try:
+        with os.fdopen(handle, "w", encoding="utf-8", newline="") as spool:
+            for row in rows:
+                spool.write("\t".join(escape_infile_value(value) for value in row) + "\n")
+                total_loaded += 1
+
+        duplicate_handling = "REPLACE " if primary_key else ""
+        columns_sql = ", ".join(f"`{name}`" for name in column_names)
+        cursor.execute(
+            f"LOAD DATA LOCAL INFILE %s {duplicate_handling}INTO TABLE `{table_name}` "
+            f"CHARACTER SET utf8mb4 ({columns_sql})",
+            (path,),
+        )
+        connection.commit()
+    finally:
+        os.remove(path)
+    return total_loaded
+
+
+# ===================== Main Code ===================== #
+def import_sheet(args):
+    spreadsheet_id = args.spreadsheet_id or read_spreadsheet_id(args.spreadsheet_id_file)
+    service = build_service("sheets", "v4", credentials=google_sheets_auth())
+    sheet = service.spreadsheets()
+
+    header_rows = list(
+        read_sheet_rows(sheet, spreadsheet_id, args.tab, args.header_row, "ZZ", limit=1)
+    )
+    if not header_rows:
+        print("No data found.")
+        return
+    headers = header_rows[0][1]
+    column_names = sanitize_column_names(headers)
+    last_column = column_letter(len(headers) - 1)
+    first_data_row = args.header_row + 1
+    last_row = grid_row_count(sheet, spreadsheet_id, args.tab)
+
+    def data_rows(limit=None):
+        """Yield (row number, row) for the non-blank rows below the header."""
+        for row_number, row in read_sheet_rows(
+            sheet, spreadsheet_id, args.tab, first_data_row, last_column,
+            limit=limit, page_size=args.chunk_size, last_row=last_row,
+        ):
+            if any(not is_empty(value) for value in row):
+                yield row_number, row
+
+    sample = list(data_rows(limit=args.sample_rows or None))
+    columns, primary_key = infer_schema(column_names, [row for _, row in sample])
+    print_schema(args.table, columns, primary_key, len(sample))
+
+    # Rows beyond the sample may not fit the inferred types, and by the time
+    # the load reached them earlier chunks would already be committed. With
+    # --sample-rows 0 the sample is every row, so no second read is needed.
+    all_rows_sampled = not args.sample_rows
+    try:
+        validate_rows(sample if all_rows_sampled else data_rows(), columns, primary_key)
+    except ValueError as error:
+        print(f"Failed to import sheet, nothing was written. {error}")
+        return
+
+    connection = None
+    created = False
+    try:
+        connection = get_db_connection(allow_local_infile=args.load_data_infile)
+        cursor = connection.cursor()
+        cursor.execute("SHOW TABLES LIKE %s", (args.table,))
+        created = args.replace or not cursor.fetchall()
+        if args.replace:
+            cursor.execute(f"DROP TABLE IF EXISTS `{args.table}`")
+        cursor.execute(build_create_table_query(args.table, columns, primary_key))
+        if primary_key is None:
+            # Without a natural key re-running would duplicate rows, so reload from scratch
+            cursor.execute(f"TRUNCATE TABLE `{args.table}`")
+        connection.commit()
+
+        # Rows are numbered from the sheet so errors point at the real row
+        converted_rows = (
+            convert_row(row, columns, row_number)
+            for row_number, row in (sample if all_rows_sampled else data_rows())
+        )
+
+        start_time = time.perf_counter()
+        if args.load_data_infile:
+            total_loaded = load_with_infile(
+                cursor, connection, args.table, columns, primary_key, converted_rows
+            )
+        else:
+            total_loaded = load_with_inserts(
+                cursor, connection, args.table, columns, primary_key, converted_rows,
+                args.chunk_size,
+            )
+        elapsed = time.perf_counter() - start_time
+
+        method = "LOAD DATA LOCAL INFILE" if args.load_data_infile else "multi-row INSERT"
+        rate = total_loaded / elapsed if elapsed > 0 else float("inf")
+        print(
+            f"{total_loaded} rows loaded into `{args.table}` via {method} "
+            f"in {elapsed:.2f}s ({rate:,.0f} rows/sec)."
+        )
+
+    except mysql.connector.Error as error:
+        print(f"Failed to import sheet into MySQL table {error}")
+
+    except ValueError as error:
+        # The sheet changed after it was validated. Don't leave a half-loaded
+        # table behind if this run created it.
+        connection.rollback()
+        if created:
+            cursor.execute(f"DROP TABLE IF EXISTS `{args.table}`")
+            print(f"Failed to import sheet, `{args.table}` was dropped. {error}")
+        else:
+            print(f"Failed to import sheet, rows before this one were already loaded. {error}")
+
+    finally:
+        if connection and connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Create a typed MySQL table from a Google Sheet and bulk-load its rows."
+    )
+    parser.add_argument("--spreadsheet-id", help="Spreadsheet to import (defaults to the ID file).")
+    parser.add_argument("--spreadsheet-id-file", default="spreadsheet_id.txt")
+    parser.add_argument("--tab", default="Sheet1", help="Sheet tab to import.")
+    parser.add_argument("--table", default="dynamic_table", help="MySQL table to create.")
+    parser.add_argument("--header-row", type=int, default=1, help="Row holding the column headers.")
+    parser.add_argument(
+        "--sample-rows", type=int, default=1000,
+        help="Rows sampled for type inference (0 samples every row).",
+    )
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Rows per read page and INSERT.")
+    parser.add_argument(
+        "--load-data-infile", action="store_true",
+        help="Bulk-load with LOAD DATA LOCAL INFILE instead of multi-row INSERTs.",
+    )
+    parser.add_argument("--replace", action="store_true", help="Drop and recreate the table first.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    import_sheet(parse_args())
@@ -1,24 +1,46 @@
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-import os.path
-from googleapiclient.discovery import build
 import os
+import sys
+
+# Run from the project root (python extra/CRUD.py) so it shares the sync
+# engine's spreadsheet_id.txt, token and row index
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from googleApiEmulator import emulator_http  # noqa: E402
+from googleServices import build_service  # noqa: E402
+from sheetRowIndex import SheetRowIndex  # noqa: E402
 
 SCOPES = [
     "https://www.googleapis.com/auth/spreadsheets",
 ]
 
+# Data rows start on sheet row 3, below the title and header rows
+FIRST_DATA_ROW = 3
+
+# Row index saved by the sync engine, trusted while it is this fresh
+ROW_INDEX_FILE = os.environ.get("SYNC_ROW_INDEX_FILE", "sheet_row_index.json")
+ROW_INDEX_MAX_AGE_SECONDS = float(os.environ.get("SYNC_ROW_INDEX_MAX_AGE_SECONDS", 10))
+
+# Base URL of googleApiEmulator.py; when set, all Sheets calls go there instead of Google
+GOOGLE_API_EMULATOR_URL = os.environ.get("GOOGLE_API_EMULATOR_URL")
+
+# Built once and reused by every operation
+service = None
+
 
 def google_sheets_auth():
     """Handles Google Sheets API authentication and returns the credentials."""
+    from google.oauth2.credentials import Credentials
+
     creds = None
     if os.path.exists("token.json"):
         creds = Credentials.from_authorized_user_file("token.json", SCOPES)
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
+            from google.auth.transport.requests import Request
+
             creds.refresh(Request())
         else:
+            from google_auth_oauthlib.flow import InstalledAppFlow
+
             flow = InstalledAppFlow.from_client_secrets_file("credentials.json", SCOPES)
             creds = flow.run_local_server(port=8080)
         with open("token.json", "w") as token:
@@ -34,15 +56,24 @@ def read_spreadsheet_id():
         return file.read().strip()
 
 
+def get_service():
+    """Returns the Sheets client (or one bound to the local emulator), building it on first use."""
+    global service
+    if service is None:
+        if GOOGLE_API_EMULATOR_URL:
+            service = build_service("sheets", "v4", http=emulator_http(GOOGLE_API_EMULATOR_URL))
+        else:
+            service = build_service("sheets", "v4", credentials=google_sheets_auth())
+    return service
+
+
 def read_sheet_data():
     """Reads data from the Google Sheet."""
     spreadsheet_id = read_spreadsheet_id()  # Get the stored spreadsheet ID
-    creds = google_sheets_auth()  # Authenticate with Google Sheets
-    service = build("sheets", "v4", credentials=creds)
 
     # Call the Sheets API to read data from the specific range in the sheet
-    range_name = "Sheet1!A1:Z1000"
-    sheet = service.spreadsheets()
+    range_name = "Sheet1!A1:Z"
+    sheet = get_service().spreadsheets()
     result = (
         sheet.values().get(spreadsheetId=spreadsheet_id, range=range_name).execute()
     )
@@ -58,76 +89,86 @@ def read_sheet_data():
         return values
 
 
-def write_to_sheet(values_to_insert):
-    """Writes new data to the Google Sheet."""
-    spreadsheet_id = read_spreadsheet_id()  # Get the stored spreadsheet ID
-    creds = google_sheets_auth()  # Authenticate with Google Sheets
-    service = build("sheets", "v4", credentials=creds)
-
-    # Define the body with values to append to the sheet
-    body = {"values": values_to_insert}
+def load_row_index(fresh=False):
+    """Returns the id -> row index: the sync engine's if it is fresh, else one read of the id column.
 
-    # Call the Sheets API to append the new data
-    range_name = "Sheet1!A1:Z1000"
+    Pass `fresh` to always read the id column, e.g. before appending rows.
+    """
+    index = None if fresh else SheetRowIndex.load(ROW_INDEX_FILE, ROW_INDEX_MAX_AGE_SECONDS)
+    if index is None:
+        result = (
+            get_service().spreadsheets().values()
+            .get(spreadsheetId=read_spreadsheet_id(), range=f"Sheet1!A{FIRST_DATA_ROW}:A")
+            .execute()
+        )
+        index = SheetRowIndex(FIRST_DATA_ROW)
+        index.rebuild(result.get("values", []))
+    return index
+
+
+def apply_sheet_operations(operations):
+    """Applies several row operations in one values.batchUpdate call.
+
+    Each operation is ("update", id, values), ("delete", id) or
+    ("create", values) with the id as the first value. Rows are found
+    through the row index instead of by scanning the sheet. Creates read the
+    id column first, so a new row goes below the last row actually on the
+    sheet (the saved index may not know the engine's latest appends) and an
+    id that is already there is refused.
+    """
+    index = load_row_index(fresh=any(operation[0] == "create" for operation in operations))
+    data = []
+    for operation in operations:
+        kind = operation[0]
+        typed_id = operation[1][0] if kind == "create" else operation[1]
+        row_id = SheetRowIndex.id_of([typed_id])
+        if row_id is None:
+            print(f"Invalid ID {typed_id!r}. IDs are whole numbers.")
+            continue
+        if kind == "create":
+            if index.row_of(row_id) is not None:
+                print(f"A record with ID {row_id} already exists. Use update to change it.")
+                continue
+            row_number = index.place(row_id)
+            values = operation[1]
+        elif kind == "update":
+            row_number = index.row_of(row_id)
+            values = operation[2]
+        else:
+            row_number = index.remove(row_id)
+            # Delete the row by replacing it with empty values
+            values = [""] * 5
+        if row_number is None:
+            print(f"No record found with ID {row_id}.")
+            continue
+        data.append({"range": f"Sheet1!A{row_number}:E{row_number}", "values": [values]})
+
+    if not data:
+        return None
     result = (
-        service.spreadsheets()
-        .values()
-        .append(
-            spreadsheetId=spreadsheet_id,
-            range=range_name,
-            valueInputOption="RAW",  # Insert data as-is
-            insertDataOption="INSERT_ROWS",  # Insert new rows
-            body=body,
+        get_service().spreadsheets().values()
+        .batchUpdate(
+            spreadsheetId=read_spreadsheet_id(),
+            body={"valueInputOption": "RAW", "data": data},
         )
         .execute()
     )
-
-    print(f'{result.get("updates").get("updatedRows")} rows appended.')
+    # Later operations in this run can use the index without reading the sheet again
+    index.save(ROW_INDEX_FILE)
+    print(f"{len(data)} rows written in one request.")
     return result
 
 
 def update_sheet_data(id_to_update, new_values):
     """Updates the row with the given ID in the Google Sheet."""
-    data = read_sheet_data()
-
-    # Find the row with the given ID
-    for index, row in enumerate(data):
-        if row[0] == id_to_update:
-            # Update the row with new values
-            range_name = f"Sheet1!A{index+1}:E{index+1}"  # Target row
-            body = {"values": [new_values]}
-            service = build("sheets", "v4", credentials=google_sheets_auth())
-            service.spreadsheets().values().update(
-                spreadsheetId=read_spreadsheet_id(),
-                range=range_name,
-                valueInputOption="RAW",
-                body=body,
-            ).execute()
-            print(f"Row with ID {id_to_update} updated.")
-            return
-    print(f"No record found with ID {id_to_update}.")
+    if apply_sheet_operations([("update", id_to_update, new_values)]):
+        print(f"Row with ID {id_to_update} updated.")
 
 
 def delete_sheet_data(id_to_delete):
     """Deletes the row with the given ID from the Google Sheet."""
-    data = read_sheet_data()
-
-    # Find the row with the given ID
-    for index, row in enumerate(data):
-        if len(row) > 0 and row[0] == id_to_delete:
-            # Delete the row by replacing it with empty values
-            range_name = f"Sheet1!A{index+1}:E{index+1}"  # Target row
-            body = {"values": [[""] * len(row)]}
-            service = build("sheets", "v4", credentials=google_sheets_auth())
-            service.spreadsheets().values().update(
-                spreadsheetId=read_spreadsheet_id(),
-                range=range_name,
-                valueInputOption="RAW",
-                body=body,
-            ).execute()
-            print(f"Row with ID {id_to_delete} deleted.")
-            return
-    print(f"No record found with ID {id_to_delete}.")
+    if apply_sheet_operations([("delete", id_to_delete)]):
+        print(f"Row with ID {id_to_delete} deleted.")
 
 
 def menu():
@@ -137,9 +178,10 @@ def menu():
     print("2. Read all data")
     print("3. Update an entry by ID")
     print("4. Delete an entry by ID")
-    print("5. Exit")
+    print("5. Apply several updates/deletes in one request")
+    print("6. Exit")
 
-    choice = input("Enter your choice (1-5): ")
+    choice = input("Enter your choice (1-6): ")
 
     if choice == "1":
         print("\n-- Create New Entry --")
@@ -150,7 +192,7 @@ def menu():
             input("CGPA Cut-off: "),
             input("Remarks: "),
         ]
-        write_to_sheet([new_entry])
+        apply_sheet_operations([("create", new_entry)])
 
     elif choice == "2":
         print("\n-- Read All Data --")
@@ -174,6 +216,26 @@ def menu():
         delete_sheet_data(id_to_delete)
 
     elif choice == "5":
+        print("\n-- Batch Of Operations --")
+        print("One per line: 'update <id> <company>,<job>,<cgpa>,<remarks>' or 'delete <id>'. Empty line to send.")
+        operations = []
+        while True:
+            line = input("> ").strip()
+            if not line:
+                break
+            kind, _, rest = line.partition(" ")
+            row_id, _, fields = rest.strip().partition(" ")
+            if kind == "delete":
+                operations.append(("delete", row_id))
+            elif kind == "update":
+                values = [row_id] + [field.strip() for field in fields.split(",")]
+                operations.append(("update", row_id, (values + [""] * 5)[:5]))
+            else:
+                print("Unknown operation; expected update or delete.")
+        if operations:
+            apply_sheet_operations(operations)
+
+    elif choice == "6":
         print("Exiting the program.")
         exit()
     else:
@@ -0,0 +1,242 @@
+import json
+import re
+import threading
+from collections import Counter
+
+# A1 notation: optional 'Sheet name'! prefix, then CELL or CELL:CELL where a
+# cell may omit its row (whole columns) or its column (whole rows)
+A1_PATTERN = re.compile(
+    r"^(?:(?P<sheet>'(?:[^']|'')+'|[^!]+)!)?"
+    r"(?P<start_col>[A-Za-z]*)(?P<start_row>\d*)"
+    r"(?::(?P<end_col>[A-Za-z]*)(?P<end_row>\d*))?$"
+)
+
+
+def column_index(letters):
+    """Convert a column name like 'A' or 'AB' to a 0-based index."""
+    index = 0
+    for char in letters.upper():
+        index = index * 26 + ord(char) - ord("A") + 1
+    return index - 1
+
+
+def column_letter(index):
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+def parse_range(a1_range, default_sheet="Sheet1"):
+    """Parse A1 notation into (sheet, first_row, first_col, last_row, last_col).
+
+    Rows and columns are 0-based; a last bound of None means unbounded.
+    """
+    match = A1_PATTERN.match(a1_range.strip())
+    if not match:
+        raise ValueError(f"Unable to parse range: {a1_range}")
+    sheet = match.group("sheet") or default_sheet
+    if sheet.startswith("'"):
+        sheet = sheet[1:-1].replace("''", "'")
+
+    start_col, start_row = match.group("start_col"), match.group("start_row")
+    first_col = column_index(start_col) if start_col else 0
+    first_row = int(start_row) - 1 if start_row else 0
+    if match.group("end_col") is None and match.group("end_row") is None:
+        if not start_col and not start_row:
+            # Just a sheet name: the whole sheet
+            return sheet, 0, 0, None, None
+        # Single cell
+        return sheet, first_row, first_col, first_row, first_col
+
+    end_col, end_row = match.group("end_col"), match.group("end_row")
+    last_col = column_index(end_col) if end_col else None
+    last_row = int(end_row) - 1 if end_row else None
+    return sheet, first_row, first_col, last_row, last_col
+
+
+def formatted_value(cell):
+    """Render a stored cell the way FORMATTED_VALUE reads return it (always a string)."""
+    if isinstance(cell, bool):
+        return "TRUE" if cell else "FALSE"
+    if isinstance(cell, float) and cell.is_integer():
+        return str(int(cell))
+    return str(cell)
+
+
+class SheetGrid:
+    """In-memory spreadsheet: named tabs of ragged rows, addressed with A1 ranges.
+
+    Implements the semantics of the Sheets values API the engine relies on:
+    reads trim trailing empty cells and rows, writes grow the grid as needed,
+    and clears blank the range without shifting anything.
+    """
+
+    def __init__(self, sheet_names=("Sheet1",)):
+        self.tabs = {name: [] for name in sheet_names}
+        self.lock = threading.Lock()
+
+    def _tab(self, sheet):
+        if sheet not in self.tabs:
+            raise ValueError(f"Unable to parse range: {sheet}")
+        return self.tabs[sheet]
+
+    def add_tab(self, name):
+        with self.lock:
+            if name in self.tabs:
+                raise ValueError(f'A sheet with the name "{name}" already exists.')
+            self.tabs[name] = []
+
+    def get(self, a1_range, value_render_option="FORMATTED_VALUE"):
+        sheet, first_row, first_col, last_row, last_col = parse_range(a1_range)
+        with self.lock:
+            rows = self._tab(sheet)
+            end = len(rows) if last_row is None else min(len(rows), last_row + 1)
+            values = []
+            for row in rows[first_row:end]:
+                cells = row[first_col:] if last_col is None else row[first_col:last_col + 1]
+                while cells and cells[-1] in ("", None):
+                    cells = cells[:-1]
+                if value_render_option == "FORMATTED_VALUE":
+                    values.append([formatted_value(cell) for cell in cells])
+                else:
+                    values.append(list(cells))
+        while values and not values[-1]:
+            values.pop()
+        return values
+
+    def update(self, a1_range, values):
+        sheet, first_row, first_col, _, _ = parse_range(a1_range)
+        updated_cells = 0
+        with self.lock:
+            rows = self._tab(sheet)
+            while len(rows) < first_row + len(values):
+                rows.append([])
+            for offset, new_cells in enumerate(values):
+                row = rows[first_row + offset]
+                needed = first_col + len(new_cells)
+                if len(row) < needed:
+                    row.extend([""] * (needed - len(row)))
+                row[first_col:needed] = ["" if cell is None else cell for cell in new_cells]
+                updated_cells += len(new_cells)
+        return {
+            "updatedRange": a1_range,
+            "updatedRows": len(values),
+            "updatedColumns": max((len(row) for row in values), default=0),
+            "updatedCells": updated_cells,
+        }
+
+    def clear(self, a1_range):
+        sheet, first_row, first_col, last_row, last_col = parse_range(a1_range)
+        with self.lock:
+            rows = self._tab(sheet)
+            end = len(rows) if last_row is None else min(len(rows), last_row + 1)
+            for row in rows[first_row:end]:
+                stop = len(row) if last_col is None else min(len(row), last_col + 1)
+                for index in range(first_col, stop):
+                    row[index] = ""
+        return {"clearedRange": a1_range}
+
+
+# ===================== In-process googleapiclient stand-in ===================== #
+class FakeResponse(dict):
+    """Mimics httplib2.Response: a dict of headers with a status attribute."""
+
+    def __init__(self, status=200, headers=None):
+        super().__init__(headers or {})
+        self.status = status
+
+
+def _parse_json(resp, content):
+    return json.loads(content)
+
+
+class FakeRequest:
+    """Mimics googleapiclient.http.HttpRequest closely enough for execute_sheets_request.
+
+    Bodies and responses go through JSON just like the real client, so the
+    serialisation cost shows up in measurements.
+    """
+
+    def __init__(self, handler, body=None):
+        self.handler = handler
+        self.body = json.dumps(body) if body is not None else None
+        self.postproc = _parse_json
+
+    def execute(self):
+        result = self.handler(json.loads(self.body) if self.body else None)
+        return self.postproc(FakeResponse(), json.dumps(result).encode("utf-8"))
+
+
+class FakeValues:
+    def __init__(self, grid, calls):
+        self.grid = grid
+        self.calls = calls
+
+    def get(self, spreadsheetId, range, valueRenderOption="FORMATTED_VALUE", **kwargs):
+        self.calls["get"] += 1
+        return FakeRequest(
+            lambda _: {
+                "range": range,
+                "majorDimension": "ROWS",
+                "values": self.grid.get(range, valueRenderOption),
+            }
+        )
+
+    def batchGet(self, spreadsheetId, ranges, valueRenderOption="FORMATTED_VALUE", **kwargs):
+        self.calls["batchGet"] += 1
+        return FakeRequest(
+            lambda _: {
+                "spreadsheetId": spreadsheetId,
+                "valueRanges": [
+                    {"range": r, "majorDimension": "ROWS", "values": self.grid.get(r, valueRenderOption)}
+                    for r in ranges
+                ],
+            }
+        )
+
+    def update(self, spreadsheetId, range, body, **kwargs):
+        self.calls["update"] += 1
+        return FakeRequest(lambda body: self.grid.update(range, body.get("values", [])), body)
+
+    def batchUpdate(self, spreadsheetId, body, **kwargs):
+        self.calls["batchUpdate"] += 1
+
+        def handler(body):
+            responses = [
+                self.grid.update(value_range["range"], value_range.get("values", []))
+                for value_range in body.get("data", [])
+            ]
+            return {
+                "spreadsheetId": spreadsheetId,
+                "totalUpdatedCells": sum(r["updatedCells"] for r in responses),
+                "responses": responses,
+            }
+
+        return FakeRequest(handler, body)
+
+    def clear(self, spreadsheetId, range, **kwargs):
+        self.calls["clear"] += 1
+        return FakeRequest(lambda _: self.grid.clear(range), {})
+
+
+class FakeSpreadsheets:
+    def __init__(self, grid, calls):
+        self._values = FakeValues(grid, calls)
+
+    def values(self):
+        return self._values
+
+
+class FakeSheetsService:
+    """Drop-in for build("sheets", "v4") backed by a SheetGrid, counting calls per method."""
+
+    def __init__(self, grid=None):
+        self.grid = grid or SheetGrid()
+        self.calls = Counter()
+        self._spreadsheets = FakeSpreadsheets(self.grid, self.calls)
+
+    def spreadsheets(self):
+        return self._spreadsheets
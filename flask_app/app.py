@@ -1,61 +1,526 @@
-from flask import Flask, render_template, request, redirect, url_for, flash
+from flask import Flask, render_template, request, redirect, url_for, flash, stream_template, jsonify, g
 import mysql.connector
+from mysql.connector import pooling
+import csv
+import hashlib
+import io
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+# The changelog cursor is shared with the sync engine in the project root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from change_feed import ChangeFeed  # noqa: E402
+from changelogCursor import ChangelogCursor  # noqa: E402
+from metrics import CACHE_LOOKUPS, DB_QUERY_SECONDS, HTTP_REQUEST_SECONDS, SSE_OPEN_STREAMS, render_metrics  # noqa: E402
+from response_cache import ResponseCache  # noqa: E402
+from xlsx_stream import stream_xlsx  # noqa: E402
 
 app = Flask(__name__)
 app.secret_key = 'your_secret_key'
 
+# Listing page size, overridable per request with ?page_size= up to MAX_PAGE_SIZE
+PAGE_SIZE = int(os.environ.get('PAGE_SIZE', 50))
+MAX_PAGE_SIZE = 500
+
+# Columns that can be projected with ?columns=, with their table headings
+LIST_COLUMNS = {
+    'id': 'ID',
+    'company_name': 'Company Name',
+    'job_title': 'Job Title',
+    'cgpa_cutoff': 'CGPA Cut-off',
+    'remarks': 'Remarks',
+}
+
+# Read cache for list pages and single rows. Entries are dropped as soon as
+# the rows they cover change, whether the write came from this app or from
+# anywhere else (picked up from the internship_changes changelog)
+CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 1024))
+CACHE_CHANGELOG_POLL_SECONDS = float(os.environ.get('CACHE_CHANGELOG_POLL_SECONDS', 1.0))
+# More changes than this since the last poll and the whole cache is dropped
+CHANGELOG_POLL_LIMIT = 10000
+# A changelog seq missing below ones already read is a write that hasn't
+# committed yet; it is looked for on every poll for this long, and the whole
+# cache is dropped if it never shows up
+CACHE_CHANGELOG_GAP_SECONDS = float(os.environ.get('CACHE_CHANGELOG_GAP_SECONDS', 60.0))
+# No entry is served once it is this old, in case a change arrived after its
+# gap was given up on (0 keeps entries until they are invalidated)
+CACHE_MAX_AGE_SECONDS = float(os.environ.get('CACHE_MAX_AGE_SECONDS', 300.0))
+
+cache = ResponseCache(CACHE_MAX_ENTRIES, CACHE_MAX_AGE_SECONDS or None)
+changelog_lock = threading.Lock()
+changelog_cursor = None
+last_changelog_poll = 0.0
+
+DB_CONFIG = dict(
+    host="localhost",
+    database="superzz",
+    user="superjoin",
+    password="super"
+)
+
+# Each worker process gets its own pool from create_app(), sized to its
+# threads (see gunicorn.conf.py). Borrowers wait up to DB_POOL_TIMEOUT_SECONDS
+# for a free connection when all of them are in use, then get a PoolError.
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 8))
+DB_POOL_TIMEOUT_SECONDS = float(os.environ.get('DB_POOL_TIMEOUT_SECONDS', 5))
+db_pool = None
+
 # Database connection
 def get_db_connection():
-    return mysql.connector.connect(
-        host="localhost",
-        database="superzz",
-        user="superjoin",
-        password="super"
-    )
+    if db_pool is None:
+        return mysql.connector.connect(**DB_CONFIG)
+    deadline = time.monotonic() + DB_POOL_TIMEOUT_SECONDS
+    while True:
+        try:
+            # close() on a pooled connection hands it back to the pool
+            return db_pool.get_connection()
+        except pooling.PoolError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.005)
+
+def refresh_cache_from_changelog():
+    """Invalidate cache entries for rows changed since the last poll.
+
+    Returns False if the changelog can't be read, in which case the caller
+    should bypass the cache.
+    """
+    global changelog_cursor, last_changelog_poll
+    if time.monotonic() - last_changelog_poll < CACHE_CHANGELOG_POLL_SECONDS:
+        return changelog_cursor is not None
+    # Another request is already polling; its result is at most a poll old
+    if not changelog_lock.acquire(blocking=False):
+        return changelog_cursor is not None
+
+    try:
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor()
+            if changelog_cursor is not None:
+                where, params = changelog_cursor.where()
+                with DB_QUERY_SECONDS.labels('changelog').time():
+                    cursor.execute(
+                        f'SELECT seq, row_id FROM internship_changes WHERE {where} ORDER BY seq LIMIT %s',
+                        params + [CHANGELOG_POLL_LIMIT],
+                    )
+                    changes = cursor.fetchall()
+                if len(changes) >= CHANGELOG_POLL_LIMIT:
+                    changelog_cursor = None
+                else:
+                    changelog_cursor.advance([seq for seq, _ in changes])
+                    cache.invalidate_ids(row_id for _, row_id in changes)
+                    if changelog_cursor.expire():
+                        # The missing entries may hold changes to any row
+                        cache.clear()
+            if changelog_cursor is None:
+                cursor.execute('SELECT COALESCE(MAX(seq), 0) FROM internship_changes')
+                changelog_cursor = ChangelogCursor(cursor.fetchone()[0], gap_timeout=CACHE_CHANGELOG_GAP_SECONDS)
+                cache.clear()
+            cursor.close()
+        finally:
+            conn.close()
+        last_changelog_poll = time.monotonic()
+        return True
+    except mysql.connector.Error as error:
+        print(f"Failed to read the internship changelog, bypassing the cache {error}")
+        cache.clear()
+        changelog_cursor = None
+        # Wait a poll interval before trying again, rather than on every request
+        last_changelog_poll = time.monotonic()
+        return False
+    finally:
+        changelog_lock.release()
+
+# Live row changes for open list pages, see /api/internships/changes. Each
+# stream holds a request thread, so at most SSE_MAX_STREAMS are open per
+# process, and each ends after SSE_STREAM_SECONDS (the browser reconnects and
+# carries on from its Last-Event-ID) so no thread is held forever.
+SSE_POLL_SECONDS = float(os.environ.get('SSE_POLL_SECONDS', 1.0))
+SSE_MAX_STREAMS = int(os.environ.get('SSE_MAX_STREAMS', 100))
+SSE_STREAM_SECONDS = float(os.environ.get('SSE_STREAM_SECONDS', 300))
+SSE_HEARTBEAT_SECONDS = 15
+SSE_RETRY_MS = 2000
+
+# Streams don't use the pool: the feed polls on its own connection
+change_feed = ChangeFeed(
+    lambda: mysql.connector.connect(**DB_CONFIG),
+    poll_seconds=SSE_POLL_SECONDS,
+    max_streams=SSE_MAX_STREAMS,
+    gap_seconds=CACHE_CHANGELOG_GAP_SECONDS,
+)
+
+def make_etag(*parts):
+    return hashlib.md5(repr(parts).encode('utf-8')).hexdigest()
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    if 'request_start' in g:
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        HTTP_REQUEST_SECONDS.labels(request.method, endpoint, response.status_code).observe(
+            time.perf_counter() - g.request_start
+        )
+    return response
+
+def not_modified(etag):
+    response = app.response_class(status=304)
+    response.set_etag(etag)
+    return response
+
+def parse_page_size():
+    page_size = request.args.get('page_size', PAGE_SIZE, type=int)
+    return max(1, min(page_size, MAX_PAGE_SIZE))
+
+
+def parse_columns():
+    # id is always selected since it is the pagination key and the row's edit/delete target
+    requested = request.args.get('columns')
+    if not requested:
+        return list(LIST_COLUMNS)
+    columns = [c for c in LIST_COLUMNS if c in requested.split(',')]
+    return ['id'] + [c for c in columns if c != 'id']
+
+
+# Full-text terms shorter than InnoDB's innodb_ft_min_token_size aren't indexed
+FULLTEXT_MIN_TOKEN_SIZE = 3
+
+
+def parse_search():
+    # Search terms and CGPA range from the query string; empty values mean "no filter"
+    q = ' '.join(request.args.get('q', '').split())
+    return {
+        'q': q,
+        'cgpa_min': request.args.get('cgpa_min', type=float),
+        'cgpa_max': request.args.get('cgpa_max', type=float),
+    }
+
+
+def search_clauses(search):
+    """Build WHERE clauses and parameters for a search over company name, job title and CGPA."""
+    clauses, params = [], []
+    if search['q']:
+        # Strip boolean-mode operators so user input can't change the query's meaning
+        terms = [''.join(ch for ch in term if ch.isalnum()) for term in search['q'].split()]
+        indexed = [t for t in terms if len(t) >= FULLTEXT_MIN_TOKEN_SIZE]
+        if indexed:
+            # Every term must match, as a prefix, in either column (FULLTEXT index ft_company_job)
+            clauses.append('MATCH(company_name, job_title) AGAINST (%s IN BOOLEAN MODE)')
+            params.append(' '.join(f'+{t}*' for t in indexed))
+        for term in (t for t in terms if t and len(t) < FULLTEXT_MIN_TOKEN_SIZE):
+            clauses.append('(company_name LIKE %s OR job_title LIKE %s)')
+            params += [f'%{term}%', f'%{term}%']
+    # Range filters use the idx_cgpa_cutoff index
+    if search['cgpa_min'] is not None:
+        clauses.append('cgpa_cutoff >= %s')
+        params.append(search['cgpa_min'])
+    if search['cgpa_max'] is not None:
+        clauses.append('cgpa_cutoff <= %s')
+        params.append(search['cgpa_max'])
+    return clauses, params
+
+
+# Keyset pagination on the primary key: the cost of a page only depends on its
+# size, not on how deep into the table it is
+def fetch_page(columns, page_size, after_id=None, before_id=None, search=None):
+    column_list = ', '.join(columns)
+    clauses, params = search_clauses(search) if search else ([], [])
+    # One extra row tells us whether there is another page in that direction
+    if before_id is not None:
+        clauses.append('id < %s')
+        params.append(before_id)
+        order = 'id DESC'
+    else:
+        if after_id is not None:
+            clauses.append('id > %s')
+            params.append(after_id)
+        order = 'id'
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+    query = f"SELECT {column_list} FROM internships{where} ORDER BY {order} LIMIT %s"
+    params.append(page_size + 1)
+
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor(dictionary=True)
+        with DB_QUERY_SECONDS.labels('page').time():
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+        cursor.close()
+    finally:
+        conn.close()
+
+    # The ids this page depends on, as (low, high] including the look-ahead
+    # row, so the cache can tell which changes affect it
+    unbounded = float('inf')
+    has_more = len(rows) > page_size
+    lookahead_id = rows[page_size]['id'] if has_more else None
+    rows = rows[:page_size]
+    if before_id is not None:
+        rows.reverse()
+        has_previous, has_next = has_more, True
+        id_range = (lookahead_id - 1 if has_more else -unbounded, before_id - 1)
+    else:
+        has_previous, has_next = after_id is not None, has_more
+        id_range = (after_id if after_id is not None else -unbounded, lookahead_id if has_more else unbounded)
+    return rows, has_previous, has_next, id_range
+
+
+def get_page(columns, page_size, after_id, before_id, search):
+    """Return a page of internships from the cache, reading it from MySQL on a miss."""
+    key = ('page', after_id, before_id, page_size, tuple(columns), tuple(sorted(search.items())))
+    use_cache = refresh_cache_from_changelog()
+    page = cache.get(key) if use_cache else None
+    if use_cache:
+        CACHE_LOOKUPS.labels('hit' if page is not None else 'miss').inc()
+    if page is None:
+        generation = cache.generation
+        internships, has_previous, has_next, id_range = fetch_page(
+            columns, page_size, after_id=after_id, before_id=before_id, search=search
+        )
+        page = {
+            'internships': internships,
+            'has_previous': has_previous,
+            'has_next': has_next,
+            'etag': make_etag(key, internships, has_previous, has_next),
+        }
+        if use_cache:
+            cache.put(key, page, id_range, generation)
+    return page
+
 
 # Home Route - Display Internships (Read)
 @app.route('/')
 def index():
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM internships")
-    internships = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return render_template('index.html', internships=internships)
+    page_size = parse_page_size()
+    columns = parse_columns()
+    search = parse_search()
+    page = get_page(
+        columns,
+        page_size,
+        request.args.get('after', type=int),
+        request.args.get('before', type=int),
+        search,
+    )
+
+    if request.if_none_match.contains(page['etag']):
+        return not_modified(page['etag'])
+    internships = page['internships']
+    has_previous, has_next = page['has_previous'], page['has_next']
+
+    page_args = {'page_size': page_size}
+    if request.args.get('columns'):
+        page_args['columns'] = ','.join(columns)
+    page_args.update({name: value for name, value in search.items() if value not in (None, '')})
+    previous_url = next_url = None
+    if internships and has_previous:
+        previous_url = url_for('index', before=internships[0]['id'], **page_args)
+    if internships and has_next:
+        next_url = url_for('index', after=internships[-1]['id'], **page_args)
+
+    # Stream the page so the browser starts rendering before the template finishes
+    response = app.response_class(stream_template(
+        'index.html',
+        internships=internships,
+        columns=[(c, LIST_COLUMNS[c]) for c in columns],
+        search=search,
+        first_url=url_for('index', **page_args),
+        previous_url=previous_url,
+        next_url=next_url,
+        page_size=page_size,
+        filtered=any(value not in (None, '') for value in search.values()),
+    ))
+    response.set_etag(page['etag'])
+    # Browsers may keep the page but must revalidate it with If-None-Match
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+# Search API - Keyset-paginated JSON search over internships
+@app.route('/api/internships/search')
+def search_internships():
+    page_size = parse_page_size()
+    search = parse_search()
+    page = get_page(parse_columns(), page_size, request.args.get('after', type=int), None, search)
+    if request.if_none_match.contains(page['etag']):
+        return not_modified(page['etag'])
+
+    internships = page['internships']
+    response = jsonify({
+        'results': internships,
+        'page_size': page_size,
+        # Pass back as ?after= to get the next page
+        'next_after': internships[-1]['id'] if internships and page['has_next'] else None,
+    })
+    response.set_etag(page['etag'])
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+# ===================== Live Changes ===================== #
+def iter_change_events(subscriber):
+    deadline = time.monotonic() + SSE_STREAM_SECONDS
+    SSE_OPEN_STREAMS.inc()
+    try:
+        yield f'retry: {SSE_RETRY_MS}\n\n'
+        while time.monotonic() < deadline:
+            try:
+                yield subscriber.get(timeout=SSE_HEARTBEAT_SECONDS)
+            except queue.Empty:
+                # A comment keeps proxies from closing an idle stream, and
+                # finds out if the browser has gone
+                yield ': keep-alive\n\n'
+    finally:
+        # Runs when the stream ends and when the browser disconnects
+        change_feed.unsubscribe(subscriber)
+        SSE_OPEN_STREAMS.dec()
+
+
+# Change Stream - Server-Sent Events for every row inserted, updated or deleted, by anyone
+@app.route('/api/internships/changes')
+def internship_changes():
+    # EventSource sends Last-Event-ID when it reconnects by itself; the page
+    # passes ?last_event_id= when it has to open a new stream
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+    if last_event_id is None:
+        last_event_id = request.args.get('last_event_id', type=int)
+    subscriber = change_feed.subscribe(last_event_id)
+    if subscriber is None:
+        response = jsonify({'error': 'Too many open change streams, try again shortly'})
+        response.headers['Retry-After'] = str(SSE_RETRY_MS // 1000)
+        return response, 503
+
+    response = app.response_class(iter_change_events(subscriber), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+# ===================== Streaming Export ===================== #
+# Rows pulled from the server-side cursor per round trip
+EXPORT_FETCH_SIZE = int(os.environ.get('EXPORT_FETCH_SIZE', 5000))
+
+
+def iter_export_batches(columns, search):
+    """Yield batches of export rows from an unbuffered (server-side) cursor.
+
+    Exports use their own connection instead of the pool so a long download
+    can't starve the request threads.
+    """
+    clauses, params = search_clauses(search)
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+    conn = mysql.connector.connect(**DB_CONFIG)
+    cursor = conn.cursor(buffered=False)
+    try:
+        cursor.execute(f"SELECT {', '.join(columns)} FROM internships{where} ORDER BY id", params)
+        while True:
+            rows = cursor.fetchmany(EXPORT_FETCH_SIZE)
+            if not rows:
+                break
+            yield rows
+    finally:
+        # Runs on completion and when the client disconnects mid-download
+        try:
+            cursor.close()
+        except mysql.connector.Error as error:
+            # A download abandoned midway leaves unread rows, which makes the
+            # cursor refuse to close; the connection is closed regardless
+            print(f"Failed to close the export cursor {error}")
+        finally:
+            conn.close()
+
+
+def iter_csv(columns, search):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([LIST_COLUMNS[c] for c in columns])
+    yield buffer.getvalue()
+    for rows in iter_export_batches(columns, search):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue()
+
+
+# Export Internships - streamed as CSV or XLSX, honouring ?columns= and the search filters
+@app.route('/export/internships.<fmt>')
+def export_internships(fmt):
+    columns = parse_columns()
+    search = parse_search()
+    if fmt == 'csv':
+        body, mimetype = iter_csv(columns, search), 'text/csv'
+    elif fmt == 'xlsx':
+        body = stream_xlsx([LIST_COLUMNS[c] for c in columns], iter_export_batches(columns, search), 'Internships')
+        mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    else:
+        return jsonify({'error': "Export format must be 'csv' or 'xlsx'"}), 404
+
+    response = app.response_class(body, mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename=internships.{fmt}'
+    # Ask reverse proxies not to buffer the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
 # Create Internship (Create)
 @app.route('/create', methods=('GET', 'POST'))
 def create():
     if request.method == 'POST':
+        row_id = request.form.get('id', '').strip()
         company_name = request.form['company_name']
         job_title = request.form['job_title']
         cgpa_cutoff = request.form['cgpa_cutoff']
         remarks = request.form['remarks']
 
-        if not company_name or not job_title:
+        # internships.id has no AUTO_INCREMENT, so the form has to supply it
+        if not row_id.isdigit():
+            flash('ID is required and must be a whole number!')
+        elif not company_name or not job_title:
             flash('Company Name and Job Title are required!')
         else:
             conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute("INSERT INTO internships (company_name, job_title, cgpa_cutoff, remarks) VALUES (%s, %s, %s, %s)",
-                           (company_name, job_title, cgpa_cutoff, remarks))
-            conn.commit()
-            cursor.close()
-            conn.close()
-            return redirect(url_for('index'))
+            try:
+                cursor = conn.cursor()
+                cursor.execute("INSERT INTO internships (id, company_name, job_title, cgpa_cutoff, remarks) VALUES (%s, %s, %s, %s, %s)",
+                               (int(row_id), company_name, job_title, cgpa_cutoff, remarks))
+                conn.commit()
+                cursor.close()
+            except mysql.connector.IntegrityError:
+                flash(f'An internship with ID {row_id} already exists!')
+            else:
+                cache.invalidate_ids([int(row_id)])
+                return redirect(url_for('index'))
+            finally:
+                conn.close()
 
     return render_template('create.html')
 
+def fetch_internship(id):
+    key = ('row', id)
+    use_cache = refresh_cache_from_changelog()
+    entry = cache.get(key) if use_cache else None
+    if use_cache:
+        CACHE_LOOKUPS.labels('hit' if entry is not None else 'miss').inc()
+    if entry is None:
+        generation = cache.generation
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor(dictionary=True)
+            with DB_QUERY_SECONDS.labels('row').time():
+                cursor.execute('SELECT * FROM internships WHERE id = %s', (id,))
+                internship = cursor.fetchone()
+            cursor.close()
+        finally:
+            conn.close()
+        entry = {'internship': internship, 'etag': make_etag(key, internship)}
+        if use_cache:
+            cache.put(key, entry, (id - 1, id), generation)
+    return entry
+
 # Edit Internship (Update)
 @app.route('/edit/<int:id>', methods=('GET', 'POST'))
 def edit(id):
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute('SELECT * FROM internships WHERE id = %s', (id,))
-    internship = cursor.fetchone()
-    cursor.close()
-
     if request.method == 'POST':
         company_name = request.form['company_name']
         job_title = request.form['job_title']
@@ -65,27 +530,324 @@ def edit(id):
         if not company_name or not job_title:
             flash('Company Name and Job Title are required!')
         else:
-            cursor = conn.cursor()
-            cursor.execute("UPDATE internships SET company_name = %s, job_title = %s, cgpa_cutoff = %s, remarks = %s WHERE id = %s",
-                           (company_name, job_title, cgpa_cutoff, remarks, id))
-            conn.commit()
-            cursor.close()
-            conn.close()
+            conn = get_db_connection()
+            try:
+                cursor = conn.cursor()
+                cursor.execute("UPDATE internships SET company_name = %s, job_title = %s, cgpa_cutoff = %s, remarks = %s WHERE id = %s",
+                               (company_name, job_title, cgpa_cutoff, remarks, id))
+                conn.commit()
+                cursor.close()
+            finally:
+                conn.close()
+            cache.invalidate_ids([id])
             return redirect(url_for('index'))
 
-    return render_template('edit.html', internship=internship)
+    entry = fetch_internship(id)
+    if request.method == 'GET' and request.if_none_match.contains(entry['etag']):
+        return not_modified(entry['etag'])
+    response = app.make_response(render_template('edit.html', internship=entry['internship']))
+    response.set_etag(entry['etag'])
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 # Delete Internship (Delete)
 @app.route('/delete/<int:id>', methods=('POST',))
 def delete(id):
     conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM internships WHERE id = %s', (id,))
+        conn.commit()
+        cursor.close()
+    finally:
+        conn.close()
+    cache.invalidate_ids([id])
+    flash('Internship deleted successfully!')
+    return redirect(url_for('index'))
+
+# ===================== Batch JSON API ===================== #
+# Operations applied per transaction, and the most one request may carry
+BATCH_CHUNK_SIZE = int(os.environ.get('BATCH_CHUNK_SIZE', 1000))
+MAX_BATCH_OPERATIONS = int(os.environ.get('MAX_BATCH_OPERATIONS', 100000))
+
+DATA_COLUMNS = ['company_name', 'job_title', 'cgpa_cutoff', 'remarks']
+
+
+def validate_operation(operation):
+    """Return an error message for a malformed batch operation, or None if it is valid."""
+    if not isinstance(operation, dict):
+        return 'operation must be an object'
+    op = operation.get('op')
+    if op not in ('create', 'update', 'delete'):
+        return "op must be one of 'create', 'update' or 'delete'"
+    row_id = operation.get('id')
+    if row_id is not None and (not isinstance(row_id, int) or isinstance(row_id, bool)):
+        return 'id must be an integer'
+    # internships.id has no AUTO_INCREMENT, so creates have to name their row too
+    if row_id is None:
+        return f'id is required for {op}'
+    if op == 'delete':
+        return None
+
+    data = operation.get('data')
+    if not isinstance(data, dict) or not data:
+        return 'data must be a non-empty object'
+    unknown = set(data) - set(DATA_COLUMNS)
+    if unknown:
+        return f"unknown fields: {', '.join(sorted(unknown))}"
+    if op == 'create' and (not data.get('company_name') or not data.get('job_title')):
+        return 'Company Name and Job Title are required!'
+    if op == 'update' and any(not data.get(f, True) for f in ('company_name', 'job_title')):
+        return 'Company Name and Job Title cannot be empty'
+    return None
+
+
+def split_into_runs(items):
+    """Group consecutive operations of the same type into runs that can share one statement.
+
+    A run is cut when the op changes or an id repeats, so the batch keeps the
+    same effect as applying every operation in order.
+    """
+    runs = []
+    current, seen_ids = [], set()
+    for item in items:
+        row_id = item['operation'].get('id')
+        if current and (item['operation']['op'] != current[0]['operation']['op'] or row_id in seen_ids):
+            runs.append(current)
+            current, seen_ids = [], set()
+        current.append(item)
+        if row_id is not None:
+            seen_ids.add(row_id)
+    if current:
+        runs.append(current)
+    return runs
+
+
+def existing_ids(cursor, ids):
+    if not ids:
+        return set()
+    placeholders = ', '.join(['%s'] * len(ids))
+    cursor.execute(f'SELECT id FROM internships WHERE id IN ({placeholders}) FOR UPDATE', list(ids))
+    return {row[0] for row in cursor.fetchall()}
+
+
+def apply_create_run(cursor, run):
+    taken = existing_ids(cursor, [item['operation']['id'] for item in run])
+    rows = []
+    for item in run:
+        if item['operation']['id'] in taken:
+            item['result'].update(status=409, error='id already exists')
+        else:
+            rows.append(item)
+
+    if not rows:
+        return
+    columns = ['id'] + DATA_COLUMNS
+    params = []
+    for item in rows:
+        data = item['operation']['data']
+        params += [item['operation']['id']] + [data.get(c) for c in DATA_COLUMNS]
+    row_placeholder = '(' + ', '.join(['%s'] * len(columns)) + ')'
+    cursor.execute(
+        f"INSERT INTO internships ({', '.join(columns)}) VALUES "
+        + ', '.join([row_placeholder] * len(rows)),
+        params,
+    )
+    for item in rows:
+        item['result'].update(status=201, id=item['operation']['id'])
+
+
+def apply_update_run(cursor, run):
+    found = existing_ids(cursor, [item['operation']['id'] for item in run])
+    present = []
+    for item in run:
+        if item['operation']['id'] in found:
+            present.append(item)
+        else:
+            item['result'].update(status=404, error='not found')
+    if not present:
+        return
+
+    # One UPDATE for the whole run, using CASE to give each row its own values
+    assignments, params = [], []
+    for column in DATA_COLUMNS:
+        updating = [item for item in present if column in item['operation']['data']]
+        if not updating:
+            continue
+        cases = ' '.join(['WHEN %s THEN %s'] * len(updating))
+        assignments.append(f'{column} = CASE id {cases} ELSE {column} END')
+        for item in updating:
+            params += [item['operation']['id'], item['operation']['data'][column]]
+    ids = [item['operation']['id'] for item in present]
+    params += ids
+    cursor.execute(
+        f"UPDATE internships SET {', '.join(assignments)} WHERE id IN ({', '.join(['%s'] * len(ids))})",
+        params,
+    )
+    for item in present:
+        item['result'].update(status=200)
+
+
+def apply_delete_run(cursor, run):
+    ids = [item['operation']['id'] for item in run]
+    found = existing_ids(cursor, ids)
+    if found:
+        cursor.execute(
+            f"DELETE FROM internships WHERE id IN ({', '.join(['%s'] * len(found))})",
+            list(found),
+        )
+    for item in run:
+        if item['operation']['id'] in found:
+            item['result'].update(status=200)
+        else:
+            item['result'].update(status=404, error='not found')
+
+
+RUN_APPLIERS = {'create': apply_create_run, 'update': apply_update_run, 'delete': apply_delete_run}
+
+
+def apply_batch(conn, operations):
+    """Apply operations in chunked transactions and return one result per operation."""
+    results = []
+    valid_items = []
+    for index, operation in enumerate(operations):
+        result = {'index': index}
+        if isinstance(operation, dict):
+            result.update(op=operation.get('op'), id=operation.get('id'))
+        error = validate_operation(operation)
+        if error:
+            result.update(status=400, error=error)
+        else:
+            valid_items.append({'operation': operation, 'result': result})
+        results.append(result)
+
+    for start in range(0, len(valid_items), BATCH_CHUNK_SIZE):
+        chunk = valid_items[start:start + BATCH_CHUNK_SIZE]
+        cursor = conn.cursor()
+        try:
+            with DB_QUERY_SECONDS.labels('batch').time():
+                for run in split_into_runs(chunk):
+                    RUN_APPLIERS[run[0]['operation']['op']](cursor, run)
+                conn.commit()
+        except mysql.connector.Error as error:
+            # The whole chunk is rolled back, so none of its operations took effect
+            conn.rollback()
+            for item in chunk:
+                item['result'].update(status=500, error=f'transaction rolled back: {error.msg}')
+        finally:
+            cursor.close()
+    return results
+
+
+def claim_idempotency_key(conn, key, request_hash):
+    """Reserve an idempotency key, or return (status, body) if the key was already used."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            'INSERT INTO api_idempotency_keys (idempotency_key, request_hash) VALUES (%s, %s)',
+            (key, request_hash),
+        )
+        conn.commit()
+        return None
+    except mysql.connector.IntegrityError:
+        conn.rollback()
+        cursor.execute(
+            'SELECT request_hash, status_code, response FROM api_idempotency_keys WHERE idempotency_key = %s',
+            (key,),
+        )
+        stored_hash, status_code, response = cursor.fetchone()
+        if stored_hash != request_hash:
+            return 422, {'error': 'Idempotency-Key was already used with a different request body'}
+        if response is None:
+            return 409, {'error': 'A request with this Idempotency-Key is still in progress'}
+        return status_code, json.loads(response)
+    finally:
+        cursor.close()
+
+
+def store_idempotent_response(conn, key, status_code, body):
     cursor = conn.cursor()
-    cursor.execute('DELETE FROM internships WHERE id = %s', (id,))
+    cursor.execute(
+        'UPDATE api_idempotency_keys SET status_code = %s, response = %s WHERE idempotency_key = %s',
+        (status_code, json.dumps(body), key),
+    )
     conn.commit()
     cursor.close()
-    conn.close()
-    flash('Internship deleted successfully!')
-    return redirect(url_for('index'))
+
+
+# Batch API - Create, update and delete many internships in one request
+@app.route('/api/internships/batch', methods=('POST',))
+def batch_internships():
+    payload = request.get_json(silent=True)
+    operations = payload.get('operations') if isinstance(payload, dict) else None
+    if not isinstance(operations, list):
+        return jsonify({'error': "Request body must be a JSON object with an 'operations' array"}), 400
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        return jsonify({'error': f'At most {MAX_BATCH_OPERATIONS} operations per request'}), 413
+
+    idempotency_key = request.headers.get('Idempotency-Key')
+    conn = get_db_connection()
+    try:
+        if idempotency_key:
+            request_hash = hashlib.sha256(request.get_data()).hexdigest()
+            replay = claim_idempotency_key(conn, idempotency_key, request_hash)
+            if replay:
+                status_code, body = replay
+                response = jsonify(body)
+                response.headers['Idempotent-Replayed'] = 'true'
+                return response, status_code
+
+        try:
+            results = apply_batch(conn, operations)
+            cache.invalidate_ids(r['id'] for r in results if r['status'] < 400)
+        except Exception:
+            if idempotency_key:
+                # Release the key so the client can retry the same request
+                cursor = conn.cursor()
+                cursor.execute('DELETE FROM api_idempotency_keys WHERE idempotency_key = %s', (idempotency_key,))
+                conn.commit()
+                cursor.close()
+            raise
+
+        summary = {'created': 0, 'updated': 0, 'deleted': 0, 'failed': 0}
+        for result in results:
+            if result['status'] >= 400:
+                summary['failed'] += 1
+            else:
+                summary[{'create': 'created', 'update': 'updated', 'delete': 'deleted'}[result['op']]] += 1
+        body = {'results': results, 'summary': summary}
+
+        if idempotency_key:
+            store_idempotent_response(conn, idempotency_key, 200, body)
+        return jsonify(body), 200
+    finally:
+        conn.close()
+
+
+# Prometheus metrics for this app (all workers when served by gunicorn)
+@app.route('/metrics')
+def metrics():
+    body, content_type = render_metrics()
+    return app.response_class(body, content_type=content_type)
+
+
+def create_app():
+    """WSGI app factory: sets up this process's connection pool and returns the app.
+
+    Production servers call it once per worker process (see gunicorn.conf.py),
+    so no pool or cache is ever shared across a fork.
+    """
+    global db_pool
+    app.secret_key = os.environ.get('FLASK_SECRET_KEY', app.secret_key)
+    if db_pool is None:
+        db_pool = pooling.MySQLConnectionPool(
+            pool_name=f'flask-{os.getpid()}',
+            pool_size=DB_POOL_SIZE,
+            **DB_CONFIG
+        )
+    return app
+
 
 if __name__ == '__main__':
+    # Development server only; use gunicorn.conf.py in production
     app.run(debug=True)
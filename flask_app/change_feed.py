@@ -0,0 +1,168 @@
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+
+import mysql.connector
+
+# The changelog cursor is shared with the sync engine in the project root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from changelogCursor import ChangelogCursor  # noqa: E402
+
+# Sent instead of the missed events to a stream that fell too far behind to
+# catch up; the page reloads its rows
+RESET_MESSAGE = 'event: reset\ndata: {}\n\n'
+
+
+def format_event(seq, payload):
+    return f'id: {seq}\nevent: change\ndata: {json.dumps(payload, default=str)}\n\n'
+
+
+class ChangeFeed:
+    """Fans row-level changes from the internship_changes changelog out to Server-Sent Events streams.
+
+    One thread per process polls the changelog, and only while at least one
+    stream is open. It reads the current values of the changed rows in one
+    query and formats each event once, so a thousand open pages cost the
+    database and the CPU the same as one. The last `backlog` events are kept
+    so a stream that reconnects with Last-Event-ID gets exactly what it
+    missed. Otherwise it is sent a reset.
+
+    Changelog entries can become visible out of seq order (see
+    ChangelogCursor), so an event may carry a lower seq than one sent before
+    it. Missed events are therefore replayed by the order they were sent in,
+    not by seq, and every stream is reset if a missing entry never shows up.
+    """
+
+    def __init__(self, connect, poll_seconds=1.0, backlog=1000, max_streams=100, gap_seconds=60.0):
+        self.connect = connect
+        self.poll_seconds = poll_seconds
+        self.backlog = backlog
+        self.max_streams = max_streams
+        self.gap_seconds = gap_seconds
+        self.lock = threading.Lock()
+        self.subscribers = set()
+        self.recent = deque(maxlen=backlog)  # (seq, message), in the order sent
+        # Every event sent after the one with this seq is in `recent`
+        self.horizon = None
+        self.changelog = None
+        self.thread = None
+
+    def subscribe(self, last_event_id=None):
+        """Open a stream; returns its queue of messages, or None if max_streams are already open."""
+        with self.lock:
+            if len(self.subscribers) >= self.max_streams:
+                return None
+            subscriber = queue.Queue(maxsize=self.backlog)
+            if last_event_id is not None:
+                seqs = [seq for seq, _ in self.recent]
+                if self.horizon is not None and last_event_id == self.horizon:
+                    missed = list(self.recent)
+                elif last_event_id in seqs:
+                    missed = list(self.recent)[seqs.index(last_event_id) + 1:]
+                else:
+                    missed = [(None, RESET_MESSAGE)]
+                for _, message in missed:
+                    subscriber.put_nowait(message)
+            self.subscribers.add(subscriber)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='change_feed', daemon=True)
+                self.thread.start()
+            return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    def publish(self, messages):
+        """Hand (seq, message) pairs to every open stream."""
+        with self.lock:
+            for seq, message in messages:
+                if seq is not None:
+                    if len(self.recent) == self.recent.maxlen:
+                        self.horizon = self.recent[0][0]
+                    self.recent.append((seq, message))
+                for subscriber in self.subscribers:
+                    try:
+                        subscriber.put_nowait(message)
+                    except queue.Full:
+                        # Too slow to keep up: drop what it hasn't read and
+                        # have it reload instead
+                        while not subscriber.empty():
+                            subscriber.get_nowait()
+                        subscriber.put_nowait(RESET_MESSAGE)
+
+    def poll(self, connection):
+        """Read changelog entries since the last poll and return them as (seq, message) pairs."""
+        cursor = connection.cursor(dictionary=True)
+        try:
+            if self.changelog is None:
+                cursor.execute('SELECT COALESCE(MAX(seq), 0) AS seq FROM internship_changes')
+                self.changelog = ChangelogCursor(cursor.fetchone()['seq'], gap_timeout=self.gap_seconds)
+                with self.lock:
+                    self.recent.clear()
+                    self.horizon = self.changelog.position
+                return []
+
+            where, params = self.changelog.where()
+            cursor.execute(
+                f'SELECT seq, row_id FROM internship_changes WHERE {where} ORDER BY seq LIMIT %s',
+                params + [self.backlog],
+            )
+            entries = cursor.fetchall()
+            if len(entries) >= self.backlog:
+                # More changes than a page could usefully patch in; every
+                # stream reloads instead, and the feed restarts from now
+                self.changelog = None
+                return [(None, RESET_MESSAGE)]
+            self.changelog.advance([entry['seq'] for entry in entries])
+            if self.changelog.expire():
+                # A change that may have been missed; pages reload to be sure
+                return [(None, RESET_MESSAGE)]
+            if not entries:
+                return []
+
+            # Many entries for one row become one event with its current values
+            last_seq = {entry['row_id']: entry['seq'] for entry in entries}
+            ids = list(last_seq)
+            cursor.execute(
+                'SELECT id, company_name, job_title, cgpa_cutoff, remarks FROM internships '
+                f"WHERE id IN ({', '.join(['%s'] * len(ids))})",
+                ids,
+            )
+            rows = {row['id']: row for row in cursor.fetchall()}
+            messages = []
+            for row_id, seq in sorted(last_seq.items(), key=lambda item: item[1]):
+                row = rows.get(row_id)
+                payload = {'id': row_id, 'op': 'delete' if row is None else 'upsert', 'row': row}
+                messages.append((seq, format_event(seq, payload)))
+            return messages
+        finally:
+            cursor.close()
+
+    def run(self):
+        connection = None
+        while True:
+            with self.lock:
+                if not self.subscribers:
+                    # Nobody is listening; the next subscribe() starts a new thread
+                    self.thread = None
+                    self.changelog = self.horizon = None
+                    break
+            try:
+                if connection is None:
+                    connection = self.connect()
+                    # Each poll has to see rows committed since the last one
+                    connection.autocommit = True
+                self.publish(self.poll(connection))
+            except mysql.connector.Error as error:
+                print(f"Failed to read the internship changelog for the change feed {error}")
+                if connection is not None:
+                    connection.close()
+                connection = None
+            time.sleep(self.poll_seconds)
+        if connection is not None:
+            connection.close()
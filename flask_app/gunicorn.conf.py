@@ -0,0 +1,64 @@
+# Gunicorn settings for serving the Flask app in production:
+#   gunicorn -c flask_app/gunicorn.conf.py
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+# Import wsgi.py from this directory, whatever the current working directory is
+chdir = os.path.dirname(os.path.abspath(__file__))
+wsgi_app = "wsgi:app"
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+
+# Several processes, each serving requests on a small thread pool. Every worker
+# imports the app itself (no preload), so each gets its own DB pool and cache.
+workers = int(os.environ.get("WEB_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "gthread"
+request_threads = int(os.environ.get("WEB_THREADS", 4))
+# Change streams (/api/internships/changes) hold a thread each for minutes at
+# a time, so they get threads of their own on top of the request threads
+stream_threads = int(os.environ.get("WEB_STREAM_THREADS", 16))
+threads = request_threads + stream_threads
+preload_app = False
+
+# gthread hands any request to any free thread, so when few streams are open
+# all of the threads can be running ordinary requests at once. The pool gets
+# one connection per thread plus one for the cache's changelog poll (streams
+# themselves share the change feed's single connection). mysql-connector caps
+# a pool at 32 connections; past that, requests wait DB_POOL_TIMEOUT_SECONDS
+# for a free one and then fail with PoolError.
+raw_env = [
+    f"DB_POOL_SIZE={os.environ.get('DB_POOL_SIZE', min(threads + 1, 32))}",
+    f"SSE_MAX_STREAMS={os.environ.get('SSE_MAX_STREAMS', stream_threads)}",
+]
+
+# Recycle workers after a jittered number of requests so leaks can't build up
+# and workers don't all restart at once; in-flight requests get graceful_timeout
+max_requests = int(os.environ.get("WEB_MAX_REQUESTS", 5000))
+max_requests_jitter = int(os.environ.get("WEB_MAX_REQUESTS_JITTER", 500))
+graceful_timeout = 30
+timeout = 30
+keepalive = 5
+
+accesslog = "-"
+errorlog = "-"
+
+# Workers share their Prometheus samples through files in this directory, so
+# /metrics on any worker reports totals for the whole server. It has to be
+# set before the workers import prometheus_client.
+if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="flask-metrics-")
+
+
+def on_starting(server):
+    # Samples left over from a previous run would be counted again
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
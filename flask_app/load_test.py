@@ -0,0 +1,79 @@
+import argparse
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_route(base_url, route, make_path, concurrency, duration):
+    """Hammer one route from `concurrency` threads for `duration` seconds."""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        session = requests.Session()
+        local_latencies, local_errors = [], 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                response = session.get(base_url + make_path(), timeout=30)
+                # Read the whole (possibly streamed) body, like a browser would
+                response.content
+                if response.status_code >= 400:
+                    local_errors += 1
+            except requests.RequestException:
+                local_errors += 1
+            local_latencies.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local_latencies)
+            errors[0] += local_errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(
+        f"{route:<8} {len(latencies):>8} requests  {len(latencies) / elapsed:>9.1f} req/s  "
+        f"p50 {percentile(latencies, 0.50) * 1000:>7.1f} ms  "
+        f"p99 {percentile(latencies, 0.99) * 1000:>7.1f} ms  "
+        f"errors {errors[0]}"
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Load-test the list and edit routes and report req/s and p99 latency."
+    )
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of the app.")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent client threads.")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds per route.")
+    parser.add_argument("--max-id", type=int, default=1000, help="Edit pages hit random ids 1..N.")
+    parser.add_argument("--page-size", type=int, default=50)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    print(f"Load testing {args.url} with {args.concurrency} threads, {args.duration}s per route")
+    run_route(
+        args.url, "list", lambda: f"/?page_size={args.page_size}",
+        args.concurrency, args.duration,
+    )
+    run_route(
+        args.url, "edit", lambda: f"/edit/{random.randint(1, args.max_id)}",
+        args.concurrency, args.duration,
+    )
@@ -0,0 +1,52 @@
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+QUERY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    'http_request_duration_seconds',
+    'Time to build the response for a request (streamed bodies continue after this).',
+    ['method', 'endpoint', 'status'],
+    buckets=QUERY_BUCKETS + (10,),
+)
+DB_QUERY_SECONDS = Histogram(
+    'web_db_query_duration_seconds',
+    'Latency of the web app\'s MySQL queries.',
+    ['query'],
+    buckets=QUERY_BUCKETS,
+)
+CACHE_LOOKUPS = Counter(
+    'response_cache_lookups_total',
+    'Read cache lookups, by hit or miss.',
+    ['result'],
+)
+
+SSE_OPEN_STREAMS = Gauge(
+    'sse_open_streams',
+    'Server-Sent Events change streams currently open.',
+    multiprocess_mode='livesum',
+)
+
+
+def render_metrics():
+    """Return the metrics exposition and its content type.
+
+    Under gunicorn every worker writes its samples to PROMETHEUS_MULTIPROC_DIR
+    (set up in gunicorn.conf.py), and any worker can aggregate all of them.
+    """
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
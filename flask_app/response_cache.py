@@ -0,0 +1,68 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """Thread-safe LRU cache for read routes, invalidated by the row ids that changed.
+
+    Every entry records the id range it depends on as (low, high), meaning it
+    covers rows with low < id <= high. A change to any id in that range drops
+    the entry; everything else stays cached. With `max_age_seconds` set, an
+    entry older than that is a miss too, which bounds how long a change the
+    changelog failed to report can go unnoticed.
+    """
+
+    def __init__(self, max_entries, max_age_seconds=None):
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        # Bumped on every invalidation, so a read that raced with a write
+        # doesn't put stale data back into the cache
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and self.max_age_seconds and time.monotonic() - entry[2] > self.max_age_seconds:
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, id_range, generation):
+        with self.lock:
+            if generation != self.generation:
+                return
+            self.entries[key] = (value, id_range, time.monotonic())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_ids(self, ids):
+        ids = set(ids)
+        if not ids:
+            return
+        with self.lock:
+            self.generation += 1
+            stale = [
+                key
+                for key, (_, (low, high), _) in self.entries.items()
+                if any(low < row_id <= high for row_id in ids)
+            ]
+            for key in stale:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.generation += 1
+            self.entries.clear()
@@ -0,0 +1,4 @@
+# Production entry point: gunicorn -c flask_app/gunicorn.conf.py
+from app import create_app
+
+app = create_app()
@@ -0,0 +1,569 @@
+import argparse
+import io
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from fakeSheets import SheetGrid
+
+# Hosts the Google client libraries talk to; the emulator answers for all of them
+GOOGLE_API_HOSTS = ("https://sheets.googleapis.com", "https://www.googleapis.com")
+
+SPREADSHEET_MIME_TYPE = "application/vnd.google-apps.spreadsheet"
+
+SPREADSHEET_PATH = re.compile(r"^/v4/spreadsheets/(?P<id>[^/:]+)(?P<rest>(:batchUpdate)?)$")
+SHEETS_VALUES_PATH = re.compile(r"^/v4/spreadsheets/(?P<id>[^/:]+)/values(?P<rest>.*)$")
+DRIVE_FILE_PATH = re.compile(r"^/drive/v3/files/(?P<id>[^/]+)$")
+UPLOAD_PATHS = ("/upload/drive/v3/files", "/resumable/upload/drive/v3/files")
+UPLOAD_SESSION_PATH = re.compile(r"^/upload/sessions/(?P<id>[0-9a-f]+)$")
+
+# Drive query clauses understood by files.list, joined with "and"
+QUERY_CLAUSES = (
+    (re.compile(r"^name\s*=\s*'((?:[^'\\]|\\.)*)'$"), "name"),
+    (re.compile(r"^mimeType\s*=\s*'((?:[^'\\]|\\.)*)'$"), "mimeType"),
+    (re.compile(r"^trashed\s*=\s*(true|false)$"), "trashed"),
+    (re.compile(r"^'((?:[^'\\]|\\.)*)'\s+in\s+parents$"), "parent"),
+)
+
+
+# ===================== Client Side ===================== #
+def emulator_http(emulator_url):
+    """An httplib2.Http that sends every Google API request to the emulator instead.
+
+    Pass it as build(..., http=...). Rewriting at the transport level also
+    covers Drive's absolute media upload URLs, which client_options can't.
+    """
+    import httplib2
+
+    emulator_url = emulator_url.rstrip("/")
+
+    class EmulatorHttp(httplib2.Http):
+        def request(self, uri, method="GET", body=None, headers=None, *args, **kwargs):
+            for host in GOOGLE_API_HOSTS:
+                if uri.startswith(host):
+                    uri = emulator_url + uri[len(host):]
+                    break
+            return super().request(uri, method, body, headers, *args, **kwargs)
+
+    http = EmulatorHttp()
+    # Resumable uploads answer 308 with how much arrived; like
+    # googleapiclient's own build_http(), don't follow it as a redirect
+    http.redirect_codes = http.redirect_codes - {308}
+    return http
+
+
+# ===================== Fault Injection ===================== #
+class EmulatorConfig:
+    """Latency, quota and failure settings; can be changed at runtime via /_emulator/config."""
+
+    FIELDS = {
+        "latency_ms": float,
+        "jitter_ms": float,
+        "read_quota": int,
+        "write_quota": int,
+        "quota_window_seconds": float,
+        "failure_rate": float,
+        "failure_status": int,
+    }
+
+    def __init__(self, **settings):
+        self.latency_ms = 0.0
+        self.jitter_ms = 0.0
+        self.read_quota = 0  # Requests allowed per window; 0 means unlimited
+        self.write_quota = 0
+        self.quota_window_seconds = 60.0
+        self.failure_rate = 0.0
+        self.failure_status = 503
+        self.update(settings)
+
+    def update(self, settings):
+        for key, value in settings.items():
+            if key not in self.FIELDS:
+                raise ValueError(f"Unknown setting: {key}")
+            setattr(self, key, self.FIELDS[key](value))
+
+    def as_dict(self):
+        return {key: getattr(self, key) for key in self.FIELDS}
+
+
+class QuotaWindow:
+    """Sliding-window request counter, like the per-minute quotas of the real APIs."""
+
+    def __init__(self):
+        self.requests = deque()
+        self.lock = threading.Lock()
+
+    def allow(self, limit, window_seconds):
+        if not limit:
+            return True
+        now = time.monotonic()
+        with self.lock:
+            while self.requests and self.requests[0] <= now - window_seconds:
+                self.requests.popleft()
+            if len(self.requests) >= limit:
+                return False
+            self.requests.append(now)
+            return True
+
+
+class ApiError(Exception):
+    def __init__(self, status, message, reason="INVALID_ARGUMENT"):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.reason = reason
+
+
+# ===================== Emulated State ===================== #
+class EmulatorState:
+    def __init__(self, config):
+        self.config = config
+        self.spreadsheets = {}
+        self.files = {}
+        self.upload_sessions = {}
+        self.calls = Counter()
+        self.throttled = Counter()
+        self.quotas = {"read": QuotaWindow(), "write": QuotaWindow()}
+        self.lock = threading.Lock()
+
+    def grid(self, spreadsheet_id):
+        """Spreadsheets spring into existence on first use, each with a Sheet1 tab."""
+        with self.lock:
+            if spreadsheet_id not in self.spreadsheets:
+                self.spreadsheets[spreadsheet_id] = SheetGrid()
+            return self.spreadsheets[spreadsheet_id]
+
+    def reset(self):
+        with self.lock:
+            self.spreadsheets.clear()
+            self.files.clear()
+            self.upload_sessions.clear()
+            self.calls.clear()
+            self.throttled.clear()
+
+    def admit(self, method, kind):
+        """Apply latency, quota and failure injection to one API call."""
+        self.calls[method] += 1
+        config = self.config
+        delay = config.latency_ms + random.uniform(-config.jitter_ms, config.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+        limit = config.read_quota if kind == "read" else config.write_quota
+        if not self.quotas[kind].allow(limit, config.quota_window_seconds):
+            self.throttled[method] += 1
+            raise ApiError(
+                429,
+                f"Quota exceeded for quota metric '{kind.title()} requests' and limit "
+                f"'{kind.title()} requests per {config.quota_window_seconds:g}s'",
+                "RESOURCE_EXHAUSTED",
+            )
+        if config.failure_rate and random.random() < config.failure_rate:
+            raise ApiError(config.failure_status, "Injected failure", "UNAVAILABLE")
+
+    def create_file(self, metadata, content):
+        file_id = uuid.uuid4().hex
+        file = {
+            "kind": "drive#file",
+            "id": file_id,
+            "name": metadata.get("name", "Untitled"),
+            "mimeType": metadata.get("mimeType", "application/octet-stream"),
+            "parents": metadata.get("parents", []),
+            "trashed": False,
+            "size": str(len(content)),
+        }
+        # Drive converts uploaded workbooks, so the new id is readable as a spreadsheet
+        grid = workbook_to_grid(content) if file["mimeType"] == SPREADSHEET_MIME_TYPE else None
+        with self.lock:
+            if grid is not None:
+                self.spreadsheets[file_id] = grid
+            self.files[file_id] = file
+        return file
+
+
+def grid_cell(cell):
+    """Keep JSON-native cell values; dates and the like are stored as their text."""
+    if cell is None:
+        return ""
+    return cell if isinstance(cell, (str, int, float)) else str(cell)
+
+
+def workbook_to_grid(content):
+    grid = SheetGrid()
+    if not content:
+        return grid
+    try:
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+    except Exception as error:
+        print(f"Uploaded file is not a readable workbook ({error}); created an empty sheet.")
+        return grid
+    try:
+        worksheet = workbook.worksheets[0]
+        rows = [[grid_cell(cell) for cell in row] for row in worksheet.iter_rows(values_only=True)]
+    finally:
+        workbook.close()
+    grid.update("Sheet1!A1", rows)
+    return grid
+
+
+def select_fields(resource, fields):
+    """Apply a simple `fields` mask such as "id, name" or "files(id, name)"."""
+    if not fields:
+        return resource
+    names = [name.strip() for name in fields.split(",")]
+    return {name: resource[name] for name in names if name in resource}
+
+
+def matches_query(file, query):
+    if not query:
+        return True
+    for clause in re.split(r"\s+and\s+", query.strip()):
+        for pattern, field in QUERY_CLAUSES:
+            match = pattern.match(clause.strip())
+            if not match:
+                continue
+            value = match.group(1).replace("\\'", "'").replace("\\\\", "\\")
+            if field == "trashed":
+                if file["trashed"] != (value == "true"):
+                    return False
+            elif field == "parent":
+                if value not in file["parents"]:
+                    return False
+            elif file[field] != value:
+                return False
+            break
+        else:
+            raise ApiError(400, f"Invalid Value: unsupported query clause {clause!r}")
+    return True
+
+
+# ===================== HTTP Handler ===================== #
+def make_handler(state):
+    class EmulatorHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            self.dispatch("GET")
+
+        def do_POST(self):
+            self.dispatch("POST")
+
+        def do_PUT(self):
+            self.dispatch("PUT")
+
+        def do_PATCH(self):
+            self.dispatch("PATCH")
+
+        def dispatch(self, method):
+            url = urlsplit(self.path)
+            self.query = parse_qs(url.query)
+            length = int(self.headers.get("Content-Length") or 0)
+            self.body = self.rfile.read(length) if length else b""
+            try:
+                if url.path.startswith("/_emulator/"):
+                    self.handle_admin(method, url.path)
+                elif url.path.startswith("/v4/"):
+                    self.handle_sheets(method, url.path)
+                elif url.path.startswith(("/drive/", "/upload/", "/resumable/")):
+                    self.handle_drive(method, url.path)
+                else:
+                    raise ApiError(404, f"Not found: {url.path}", "NOT_FOUND")
+            except ApiError as error:
+                self.send_json(
+                    {"error": {"code": error.status, "message": error.message, "status": error.reason}},
+                    error.status,
+                )
+            except (ValueError, KeyError) as error:
+                self.send_json(
+                    {"error": {"code": 400, "message": str(error), "status": "INVALID_ARGUMENT"}},
+                    400,
+                )
+
+        def param(self, name, default=None):
+            return self.query.get(name, [default])[0]
+
+        def json_body(self):
+            return json.loads(self.body) if self.body else {}
+
+        def send_json(self, payload, status=200, headers=None):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=UTF-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.send_header("x-request-id", uuid.uuid4().hex)
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        # ----- Sheets: spreadsheets ----- #
+        def spreadsheet_resource(self, spreadsheet_id, grid):
+            return {
+                "spreadsheetId": spreadsheet_id,
+                "properties": {"title": spreadsheet_id},
+                "sheets": [
+                    {"properties": {"sheetId": index, "title": name, "index": index}}
+                    for index, name in enumerate(grid.tabs)
+                ],
+            }
+
+        def handle_spreadsheet(self, method, path):
+            if method == "POST" and path == "/v4/spreadsheets":
+                state.admit("spreadsheets.create", "write")
+                body = self.json_body()
+                spreadsheet_id = uuid.uuid4().hex
+                titles = [
+                    sheet.get("properties", {}).get("title", f"Sheet{index + 1}")
+                    for index, sheet in enumerate(body.get("sheets", []))
+                ]
+                grid = SheetGrid(titles or ("Sheet1",))
+                with state.lock:
+                    state.spreadsheets[spreadsheet_id] = grid
+                self.send_json(self.spreadsheet_resource(spreadsheet_id, grid))
+                return
+            match = SPREADSHEET_PATH.match(path)
+            grid = state.grid(unquote(match.group("id")))
+            if method == "GET" and not match.group("rest"):
+                state.admit("spreadsheets.get", "read")
+                self.send_json(self.spreadsheet_resource(match.group("id"), grid))
+            elif method == "POST" and match.group("rest") == ":batchUpdate":
+                state.admit("spreadsheets.batchUpdate", "write")
+                replies = []
+                for request in self.json_body().get("requests", []):
+                    if "addSheet" not in request:
+                        raise ApiError(400, f"Unsupported request: {', '.join(request)}")
+                    title = request["addSheet"].get("properties", {}).get("title", f"Sheet{len(grid.tabs) + 1}")
+                    grid.add_tab(title)
+                    replies.append({"addSheet": {"properties": {"sheetId": len(grid.tabs) - 1, "title": title}}})
+                self.send_json({"spreadsheetId": match.group("id"), "replies": replies})
+            else:
+                raise ApiError(404, f"Not found: {method} {path}", "NOT_FOUND")
+
+        # ----- Sheets: spreadsheets.values ----- #
+        def handle_sheets(self, method, path):
+            if path == "/v4/spreadsheets" or SPREADSHEET_PATH.match(path):
+                self.handle_spreadsheet(method, path)
+                return
+            match = SHEETS_VALUES_PATH.match(path)
+            if not match:
+                raise ApiError(404, f"Not found: {path}", "NOT_FOUND")
+            grid = state.grid(unquote(match.group("id")))
+            rest = match.group("rest")
+            render = self.param("valueRenderOption", "FORMATTED_VALUE")
+
+            if method == "GET" and rest == ":batchGet":
+                state.admit("values.batchGet", "read")
+                ranges = self.query.get("ranges", [])
+                self.send_json({
+                    "spreadsheetId": match.group("id"),
+                    "valueRanges": [
+                        {"range": r, "majorDimension": "ROWS", "values": grid.get(r, render)}
+                        for r in ranges
+                    ],
+                })
+            elif method == "POST" and rest == ":batchUpdate":
+                state.admit("values.batchUpdate", "write")
+                responses = [
+                    grid.update(value_range["range"], value_range.get("values", []))
+                    for value_range in self.json_body().get("data", [])
+                ]
+                self.send_json({
+                    "spreadsheetId": match.group("id"),
+                    "totalUpdatedCells": sum(r["updatedCells"] for r in responses),
+                    "totalUpdatedRows": sum(r["updatedRows"] for r in responses),
+                    "responses": responses,
+                })
+            elif method == "POST" and rest.endswith(":clear"):
+                state.admit("values.clear", "write")
+                self.send_json(grid.clear(unquote(rest[1:-len(":clear")])))
+            elif method == "GET" and rest.startswith("/"):
+                state.admit("values.get", "read")
+                a1_range = unquote(rest[1:])
+                values = grid.get(a1_range, render)
+                payload = {"range": a1_range, "majorDimension": "ROWS"}
+                if values:
+                    payload["values"] = values
+                self.send_json(payload)
+            elif method == "PUT" and rest.startswith("/"):
+                state.admit("values.update", "write")
+                self.send_json(grid.update(unquote(rest[1:]), self.json_body().get("values", [])))
+            else:
+                raise ApiError(404, f"Not found: {method} {path}", "NOT_FOUND")
+
+        # ----- Drive: files.list / get / create ----- #
+        def handle_drive(self, method, path):
+            fields = self.param("fields")
+            if method == "GET" and path == "/drive/v3/files":
+                state.admit("files.list", "read")
+                page_size = int(self.param("pageSize", 100))
+                files = [
+                    f for f in state.files.values() if matches_query(f, self.param("q"))
+                ][:page_size]
+                list_fields = None
+                if fields:
+                    inner = re.match(r"^\s*files\((.*)\)\s*$", fields)
+                    list_fields = inner.group(1) if inner else None
+                self.send_json({"files": [select_fields(f, list_fields) for f in files]})
+            elif method == "GET" and DRIVE_FILE_PATH.match(path):
+                state.admit("files.get", "read")
+                file = state.files.get(DRIVE_FILE_PATH.match(path).group("id"))
+                if file is None:
+                    raise ApiError(404, "File not found.", "NOT_FOUND")
+                self.send_json(select_fields(file, fields))
+            elif method == "POST" and path in UPLOAD_PATHS:
+                self.start_upload(fields)
+            elif method == "POST" and path == "/drive/v3/files":
+                state.admit("files.create", "write")
+                self.send_json(select_fields(state.create_file(self.json_body(), b""), fields))
+            elif method == "PUT" and UPLOAD_SESSION_PATH.match(path):
+                self.continue_upload(UPLOAD_SESSION_PATH.match(path).group("id"))
+            else:
+                raise ApiError(404, f"Not found: {method} {path}", "NOT_FOUND")
+
+        def start_upload(self, fields):
+            state.admit("files.create", "write")
+            upload_type = self.param("uploadType", "media")
+            if upload_type == "resumable":
+                session_id = uuid.uuid4().hex
+                state.upload_sessions[session_id] = {
+                    "metadata": self.json_body(),
+                    "total": int(self.headers.get("X-Upload-Content-Length") or -1),
+                    "data": bytearray(),
+                    "fields": fields,
+                }
+                host = self.headers.get("Host")
+                self.send_json(
+                    {}, headers={"Location": f"http://{host}/upload/sessions/{session_id}"}
+                )
+            elif upload_type == "multipart":
+                content_type = self.headers.get("Content-Type", "")
+                message = BytesParser(policy=HTTP).parsebytes(
+                    f"Content-Type: {content_type}\r\n\r\n".encode() + self.body
+                )
+                parts = list(message.iter_parts())
+                metadata = json.loads(parts[0].get_content())
+                media = parts[1].get_payload(decode=True) if len(parts) > 1 else b""
+                self.send_json(select_fields(state.create_file(metadata, media), fields))
+            else:
+                self.send_json(select_fields(state.create_file({}, self.body), fields))
+
+        def continue_upload(self, session_id):
+            session = state.upload_sessions.get(session_id)
+            if session is None:
+                raise ApiError(404, "Upload session not found.", "NOT_FOUND")
+            match = re.match(r"bytes (\d+)-(\d+)/(\d+|\*)", self.headers.get("Content-Range", ""))
+            status_query = re.match(r"bytes \*/(\d+|\*)", self.headers.get("Content-Range", ""))
+            if match:
+                state.admit("files.upload", "write")
+                start = int(match.group(1))
+                if start != len(session["data"]):
+                    raise ApiError(400, "Chunk does not continue the upload.", "FAILED_PRECONDITION")
+                session["data"].extend(self.body)
+                if match.group(3) != "*":
+                    session["total"] = int(match.group(3))
+            elif not status_query:
+                raise ApiError(400, "Missing Content-Range.")
+
+            received = len(session["data"])
+            if session["total"] >= 0 and received >= session["total"]:
+                del state.upload_sessions[session_id]
+                file = state.create_file(session["metadata"], bytes(session["data"]))
+                self.send_json(select_fields(file, session["fields"]))
+                return
+            # 308 tells the client how much arrived so it sends the next chunk
+            headers = {"Range": f"bytes=0-{received - 1}"} if received else {}
+            self.send_response(308)
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        # ----- Admin ----- #
+        def handle_admin(self, method, path):
+            if path == "/_emulator/config":
+                if method == "POST":
+                    state.config.update(self.json_body())
+                self.send_json(state.config.as_dict())
+            elif path == "/_emulator/state" and method == "GET":
+                self.send_json({
+                    "calls": dict(state.calls),
+                    "throttled": dict(state.throttled),
+                    "spreadsheets": {
+                        spreadsheet_id: {name: len(rows) for name, rows in grid.tabs.items()}
+                        for spreadsheet_id, grid in state.spreadsheets.items()
+                    },
+                    "files": list(state.files.values()),
+                })
+            elif path == "/_emulator/reset" and method == "POST":
+                state.reset()
+                self.send_json({})
+            else:
+                raise ApiError(404, f"Not found: {method} {path}", "NOT_FOUND")
+
+    return EmulatorHandler
+
+
+def serve(host, port, config):
+    """Start the emulator in a background thread; returns (server, state)."""
+    state = EmulatorState(config)
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Local emulator for the Sheets values and Drive files APIs used by the sync scripts."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8085)
+    parser.add_argument("--latency-ms", type=float, default=0, help="Added to every call.")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Random +/- spread on the latency.")
+    parser.add_argument("--read-quota", type=int, default=0,
+                        help="Read requests allowed per window before 429s (0 = unlimited).")
+    parser.add_argument("--write-quota", type=int, default=0,
+                        help="Write requests allowed per window before 429s (0 = unlimited).")
+    parser.add_argument("--quota-window-seconds", type=float, default=60)
+    parser.add_argument("--failure-rate", type=float, default=0,
+                        help="Probability of answering a call with --failure-status.")
+    parser.add_argument("--failure-status", type=int, default=503)
+    parser.add_argument("--seed-xlsx", help="Load this workbook into --spreadsheet-id at startup.")
+    parser.add_argument("--spreadsheet-id", default="emulated-spreadsheet")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    config = EmulatorConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        read_quota=args.read_quota,
+        write_quota=args.write_quota,
+        quota_window_seconds=args.quota_window_seconds,
+        failure_rate=args.failure_rate,
+        failure_status=args.failure_status,
+    )
+    server, state = serve(args.host, args.port, config)
+    if args.seed_xlsx:
+        with open(args.seed_xlsx, "rb") as file:
+            state.spreadsheets[args.spreadsheet_id] = workbook_to_grid(file.read())
+        print(f"Loaded {args.seed_xlsx} into spreadsheet {args.spreadsheet_id}.")
+    print(f"Google API emulator listening on http://{args.host}:{args.port}")
+    print(f"Point the scripts at it with GOOGLE_API_EMULATOR_URL=http://{args.host}:{args.port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,119 @@
+import argparse
+import json
+import os
+
+# Trimmed discovery documents bundled with the project, one per API version.
+# Building a client from the full documents spends most of its time
+# generating docstrings for hundreds of methods and schemas we never call.
+DISCOVERY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "discovery")
+
+# The methods each bundled document keeps, by dotted resource path
+KEEP_METHODS = {
+    ("sheets", "v4"): {
+        "spreadsheets": ("get", "create", "batchUpdate"),
+        "spreadsheets.values": ("get", "batchGet", "update", "batchUpdate", "clear"),
+    },
+    ("drive", "v3"): {
+        "files": ("list", "get", "create"),
+    },
+}
+
+# Schemas bundled as plain objects instead of in full. Between them they reach
+# nearly every schema of the API, and the client only uses schemas for
+# docstrings, so the bodies are sent and returned exactly the same.
+OPAQUE_SCHEMAS = {
+    ("sheets", "v4"): ("Spreadsheet", "BatchUpdateSpreadsheetRequest", "BatchUpdateSpreadsheetResponse"),
+}
+
+
+def discovery_path(api, version):
+    return os.path.join(DISCOVERY_DIR, f"{api}.{version}.json")
+
+
+def build_service(api, version, credentials=None, http=None):
+    """Build a client from the bundled discovery document, without any network fetch."""
+    from googleapiclient.discovery import build_from_document
+
+    with open(discovery_path(api, version), "r") as file:
+        document = file.read()
+    return build_from_document(document, credentials=credentials, http=http)
+
+
+# ===================== Refreshing The Bundled Documents ===================== #
+def referenced_schemas(value, found=None):
+    """Collect every schema name reachable through $ref from a piece of a discovery document."""
+    found = set() if found is None else found
+    if isinstance(value, dict):
+        ref = value.get("$ref")
+        if isinstance(ref, str):
+            found.add(ref)
+        for child in value.values():
+            referenced_schemas(child, found)
+    elif isinstance(value, list):
+        for child in value:
+            referenced_schemas(child, found)
+    return found
+
+
+def trim_discovery_document(document, keep, opaque=()):
+    """Return a copy of `document` with only the kept methods and the schemas they reach.
+
+    Schemas named in `opaque` are kept as bare objects, so nothing is reached through them.
+    """
+    trimmed = {key: value for key, value in document.items() if key not in ("resources", "schemas")}
+    trimmed["resources"] = {}
+    for resource_path, method_names in keep.items():
+        source, target = document, trimmed
+        for name in resource_path.split("."):
+            source = source["resources"][name]
+            target = target["resources"].setdefault(name, {"methods": {}, "resources": {}})
+        for method_name in method_names:
+            target["methods"][method_name] = source["methods"][method_name]
+
+    schemas = document.get("schemas", {})
+    needed, pending = set(), referenced_schemas(trimmed["resources"])
+    while pending:
+        name = pending.pop()
+        if name in needed:
+            continue
+        needed.add(name)
+        if name not in opaque:
+            pending |= referenced_schemas(schemas[name]) - needed
+    trimmed["schemas"] = {
+        name: {
+            "id": name,
+            "type": "object",
+            "description": schemas[name].get("description", ""),
+            "additionalProperties": {"type": "any"},
+        }
+        if name in opaque
+        else schemas[name]
+        for name in sorted(needed)
+    }
+    return trimmed
+
+
+def refresh_discovery_documents():
+    """Regenerate discovery/ from the documents shipped with google-api-python-client."""
+    from googleapiclient.discovery_cache import get_static_doc
+
+    os.makedirs(DISCOVERY_DIR, exist_ok=True)
+    for (api, version), keep in KEEP_METHODS.items():
+        document = json.loads(get_static_doc(api, version))
+        trimmed = trim_discovery_document(document, keep, OPAQUE_SCHEMAS.get((api, version), ()))
+        with open(discovery_path(api, version), "w") as file:
+            json.dump(trimmed, file, indent=1, sort_keys=True)
+            file.write("\n")
+        print(
+            f"{api} {version} (revision {document.get('revision')}): kept "
+            f"{sum(len(methods) for methods in keep.values())} methods and "
+            f"{len(trimmed['schemas'])} of {len(document.get('schemas', {}))} schemas."
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Regenerate the trimmed discovery documents in discovery/ (after adding to KEEP_METHODS)."
+    )
+    parser.parse_args()
+    refresh_discovery_documents()
@@ -0,0 +1,166 @@
+import mysql.connector
+from openpyxl import load_workbook
+import argparse
+import time
+
+from syncDbAndSheet import calculate_data_hash, calculate_sheet_hash, save_sync_state
+
+# Workbook columns, in order, map onto these internships columns
+COLUMNS = ["id", "company_name", "job_title", "cgpa_cutoff", "remarks"]
+
+
+def get_db_connection():
+    return mysql.connector.connect(
+        host="localhost", database="superzz", user="superjoin", password="super"
+    )
+
+
+def iter_workbook_rows(file_path, sheet_name=None):
+    """Stream raw row tuples from the workbook without loading it into memory."""
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+        for row in worksheet.iter_rows(values_only=True):
+            yield row
+    finally:
+        # Read-only workbooks keep the file handle open until closed
+        workbook.close()
+
+
+def parse_id(value):
+    """Return the row ID as an int, or None for header, blank and non-numeric rows."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else None
+    if isinstance(value, int):
+        return value
+    text = str(value).strip()
+    return int(text) if text.isdigit() else None
+
+
+def iter_internship_rows(file_path, sheet_name=None):
+    """Yield (id, company_name, job_title, cgpa_cutoff, remarks) tuples for each data row."""
+    for row in iter_workbook_rows(file_path, sheet_name):
+        row = list(row[: len(COLUMNS)])
+        if not row:
+            continue
+        row_id = parse_id(row[0])
+        if row_id is None:
+            continue
+        while len(row) < len(COLUMNS):
+            row.append(None)
+        yield [row_id] + [None if value == "" else value for value in row[1:]]
+
+
+def render_sheet_value(value):
+    """Render a workbook value the way the Sheets API returns it as a formatted string."""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def build_upsert_query(row_count):
+    row_placeholder = "(" + ", ".join(["%s"] * len(COLUMNS)) + ")"
+    return (
+        f"INSERT INTO internships ({', '.join(COLUMNS)}) VALUES "
+        + ", ".join([row_placeholder] * row_count)
+        + " ON DUPLICATE KEY UPDATE "
+        + ", ".join(f"{column} = VALUES({column})" for column in COLUMNS[1:])
+    )
+
+
+def upsert_batches(connection, rows, batch_size):
+    """Upsert rows with one multi-row statement and commit per batch, keeping memory flat."""
+    cursor = connection.cursor()
+    total_upserted = 0
+    batch = []
+    try:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                cursor.execute(build_upsert_query(len(batch)), [v for r in batch for v in r])
+                connection.commit()
+                total_upserted += len(batch)
+                batch = []
+        if batch:
+            cursor.execute(build_upsert_query(len(batch)), [v for r in batch for v in r])
+            connection.commit()
+            total_upserted += len(batch)
+    finally:
+        cursor.close()
+    return total_upserted
+
+
+def calculate_table_hash(connection):
+    """Hash the table exactly as fetch_from_mysql() reads it, streaming rows from the server."""
+    cursor = connection.cursor(buffered=False)
+    try:
+        cursor.execute(
+            "SELECT id, company_name, job_title, cgpa_cutoff, remarks FROM internships"
+        )
+        return calculate_data_hash(iter(cursor.fetchone, None))
+    finally:
+        cursor.close()
+
+
+def prime_sync_state(connection, file_path, sheet_name=None):
+    """Record both fingerprints so the first live sync sees nothing to do.
+
+    The sheet fingerprint is computed from the workbook, so this assumes the
+    Google Sheet already holds the same data (e.g. it was uploaded from it).
+    """
+    db_hash = calculate_table_hash(connection)
+    sheet_hash = calculate_sheet_hash(
+        [render_sheet_value(value) for value in row]
+        for row in iter_workbook_rows(file_path, sheet_name)
+    )
+    save_sync_state(db_hash=db_hash, sheet_hash=sheet_hash)
+    print("Sync state primed with the current DB and sheet fingerprints.")
+
+
+def ingest(args):
+    connection = None
+    try:
+        connection = get_db_connection()
+
+        start_time = time.perf_counter()
+        total_upserted = upsert_batches(
+            connection, iter_internship_rows(args.file, args.sheet), args.batch_size
+        )
+        elapsed = time.perf_counter() - start_time
+        rate = total_upserted / elapsed if elapsed > 0 else float("inf")
+        print(
+            f"{total_upserted} records inserted/updated from {args.file} "
+            f"in {elapsed:.2f}s ({rate:,.0f} rows/sec)."
+        )
+
+        if args.prime_sync_state:
+            prime_sync_state(connection, args.file, args.sheet)
+
+    except mysql.connector.Error as error:
+        print(f"Failed to ingest workbook into MySQL table {error}")
+
+    finally:
+        if connection and connection.is_connected():
+            connection.close()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Stream a local XLSX workbook straight into the internships table."
+    )
+    parser.add_argument("--file", default="Super.xlsx", help="Workbook to ingest.")
+    parser.add_argument("--sheet", help="Worksheet name (defaults to the first one).")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per upsert statement.")
+    parser.add_argument(
+        "--prime-sync-state", action="store_true",
+        help="Record sync fingerprints so the first live sync is a no-op.",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    ingest(parse_args())
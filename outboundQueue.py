@@ -0,0 +1,112 @@
+import json
+import sqlite3
+import threading
+import time
+
+
+class OutboundQueue:
+    """Durable queue of sheet writes waiting to be flushed, kept in a local SQLite file.
+
+    There is at most one entry per row id: enqueueing a row that is already
+    pending replaces its values (or turns it into a delete), so a burst of
+    edits to one row becomes a single write. Each entry carries a version that
+    is bumped on every change, and acknowledge() only removes entries whose
+    version hasn't moved since they were read, so a change that arrives while
+    a flush is in flight is never dropped.
+
+    The changelog position the queue has been filled up to is stored in the
+    same file and updated in the same transaction as the entries, so after a
+    crash the queue resumes exactly where it left off.
+    """
+
+    def __init__(self, path="outbound_queue.db"):
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS pending_rows (
+                    row_id INTEGER PRIMARY KEY,
+                    row_values TEXT,  -- JSON list, or NULL for a delete
+                    version INTEGER NOT NULL DEFAULT 1,
+                    first_changed_at REAL NOT NULL
+                )
+                """
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS queue_meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+
+    def get_meta(self, key, default=None):
+        with self.lock:
+            row = self.connection.execute("SELECT value FROM queue_meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_meta(self, key, value):
+        with self.lock, self.connection:
+            self._set_meta(key, value)
+
+    def _set_meta(self, key, value):
+        self.connection.execute(
+            "INSERT INTO queue_meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, json.dumps(value)),
+        )
+
+    def enqueue(self, rows, changed_at=None, **meta):
+        """Queue {row_id: values or None (delete)} and store `meta` in one transaction.
+
+        `changed_at` (unix time, default now) is when the oldest of these
+        changes was made; a replaced entry keeps its original time. Returns how
+        many of the rows replaced an entry that was still pending.
+        """
+        changed_at = changed_at or time.time()
+        with self.lock, self.connection:
+            pending = {
+                row_id
+                for (row_id,) in self.connection.execute("SELECT row_id FROM pending_rows")
+            } if rows else set()
+            self.connection.executemany(
+                """
+                INSERT INTO pending_rows (row_id, row_values, first_changed_at) VALUES (?, ?, ?)
+                ON CONFLICT(row_id) DO UPDATE SET
+                    row_values = excluded.row_values,
+                    version = version + 1
+                """,
+                [
+                    (int(row_id), None if values is None else json.dumps(list(values)), changed_at)
+                    for row_id, values in rows.items()
+                ],
+            )
+            for key, value in meta.items():
+                self._set_meta(key, value)
+        return sum(1 for row_id in rows if int(row_id) in pending)
+
+    def pending(self, limit=None):
+        """Oldest-first list of (row_id, values or None, version, first_changed_at)."""
+        query = "SELECT row_id, row_values, version, first_changed_at FROM pending_rows ORDER BY first_changed_at, row_id"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        with self.lock:
+            rows = self.connection.execute(query).fetchall()
+        return [
+            (row_id, None if values is None else json.loads(values), version, changed_at)
+            for row_id, values, version, changed_at in rows
+        ]
+
+    def acknowledge(self, entries):
+        """Remove flushed entries, unless they were changed again since they were read."""
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "DELETE FROM pending_rows WHERE row_id = ? AND version = ?",
+                [(row_id, version) for row_id, _, version, _ in entries],
+            )
+
+    def __len__(self):
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM pending_rows").fetchone()[0]
+
+    def close(self):
+        self.connection.close()
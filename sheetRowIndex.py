@@ -0,0 +1,137 @@
+import json
+import os
+import threading
+import time
+
+
+class SheetRowIndex:
+    """Maps row ids to sheet row numbers, so one row can be written without reading the sheet first.
+
+    The id column is the anchor. The index is rebuilt from it whenever a sync
+    read sees the sheet, so rows moved by hand (sorting, inserted or deleted
+    rows) are picked up on the next poll. Writes made through the index
+    (appended and blanked rows) update it in place and bump `generation`.
+    rebuild() ignores a read that started before such a write, since it
+    would undo the write. The index changes before the write reaches the
+    sheet, so writers also bracket it with begin_write() and end_write():
+    no rebuild is accepted while one is in flight, and ending it bumps
+    `generation` again for reads that started before it landed.
+    """
+
+    def __init__(self, first_row=3):
+        self.first_row = first_row
+        self.rows = {}
+        self.next_row = first_row
+        self.gaps = 0  # Blank rows between first_row and next_row
+        self.built_at = None
+        self.generation = 0
+        self.pending_writes = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def id_of(cells):
+        """The integer id in the first cell of a row, or None if it doesn't hold one."""
+        cell = str(cells[0]).strip() if cells else ""
+        return int(cell) if cell.isdigit() else None
+
+    def rebuild(self, rows, generation=None):
+        """Rebuild from sheet rows starting at first_row (only the first cell of each is used).
+
+        Pass the `generation` read before the sheet was fetched; if the index
+        has been written to since, the read is stale and False is returned.
+        """
+        mapping, gaps = {}, 0
+        for offset, cells in enumerate(rows):
+            row_id = self.id_of(cells)
+            if row_id is not None:
+                mapping[row_id] = self.first_row + offset
+            elif not cells or not str(cells[0]).strip():
+                gaps += 1
+        with self.lock:
+            if self.pending_writes or (generation is not None and generation != self.generation):
+                return False
+            changed = mapping != self.rows or self.next_row != self.first_row + len(rows)
+            self.rows = mapping
+            self.next_row = self.first_row + len(rows)
+            self.gaps = gaps
+            self.built_at = time.time()
+            self.generation += changed
+        return True
+
+    def age(self):
+        """Seconds since the index was last rebuilt from the sheet (infinite if never)."""
+        return float("inf") if self.built_at is None else time.time() - self.built_at
+
+    def begin_write(self):
+        """Mark a sheet write planned with place()/remove() as in flight; pair with end_write()."""
+        with self.lock:
+            self.pending_writes += 1
+
+    def end_write(self):
+        """The write has landed (or failed); reads from before now can't be trusted to include it."""
+        with self.lock:
+            self.pending_writes -= 1
+            self.generation += 1
+
+    def row_of(self, row_id):
+        with self.lock:
+            return self.rows.get(int(row_id))
+
+    def place(self, row_id):
+        """The row that holds `row_id`, appending it below the last row if it has none."""
+        with self.lock:
+            row_id = int(row_id)
+            if row_id not in self.rows:
+                self.rows[row_id] = self.next_row
+                self.next_row += 1
+                self.generation += 1
+            return self.rows[row_id]
+
+    def remove(self, row_id):
+        """Forget `row_id` (its row is being blanked); returns the row it was on, or None."""
+        with self.lock:
+            row_number = self.rows.pop(int(row_id), None)
+            if row_number is not None:
+                self.gaps += 1
+                self.generation += 1
+            return row_number
+
+    # ----- Sharing with other processes ----- #
+    def save(self, path):
+        with self.lock:
+            state = {"first_row": self.first_row, "next_row": self.next_row, "gaps": self.gaps, "rows": self.rows}
+        # Write to a temp file first so readers never see a half-written index
+        temp_path = path + ".tmp"
+        with open(temp_path, "w") as file:
+            json.dump(state, file)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path, max_age):
+        """Load an index saved by save(), or None if there is none or it is older than `max_age` seconds.
+
+        The file's modification time says when the index was last confirmed
+        against the sheet (see touch()).
+        """
+        try:
+            age = time.time() - os.path.getmtime(path)
+            if age > max_age:
+                return None
+            with open(path, "r") as file:
+                state = json.load(file)
+        except (OSError, ValueError):
+            return None
+        index = cls(state["first_row"])
+        index.rows = {int(row_id): row_number for row_id, row_number in state["rows"].items()}
+        index.next_row = state["next_row"]
+        index.gaps = state["gaps"]
+        index.built_at = time.time() - age
+        return index
+
+    @staticmethod
+    def touch(path):
+        """Mark a saved index as still matching the sheet, without rewriting it."""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
@@ -0,0 +1,112 @@
+import json
+import os
+import threading
+
+from sheetRowIndex import SheetRowIndex
+
+
+class Shard:
+    """One tab holding the rows whose ids fall in [first_id, last_id], with its own row index."""
+
+    def __init__(self, number, spreadsheet_id, tab, first_id, last_id, first_row=3):
+        self.number = number
+        self.spreadsheet_id = spreadsheet_id
+        self.tab = tab
+        self.first_id = first_id
+        self.last_id = last_id
+        self.row_index = SheetRowIndex(first_row)
+
+    def range(self, cells):
+        """A1 range of `cells` (e.g. "A3:F") on this shard's tab."""
+        return f"{self.tab}!{cells}"
+
+    @property
+    def name(self):
+        """How reports refer to the shard: its tab, or its spreadsheet when each shard has its own."""
+        return self.tab if self.tab != "Sheet1" or self.number == 0 else self.spreadsheet_id
+
+    def __repr__(self):
+        return f"Shard({self.number}, {self.spreadsheet_id!r}, {self.tab!r})"
+
+
+class ShardMap:
+    """Which shard owns each id, and where each shard lives.
+
+    Shard n holds ids n * rows_per_shard to (n + 1) * rows_per_shard - 1. In
+    "tabs" mode it is tab Sheet{n + 1} of the main spreadsheet, so shard 0 is
+    the usual Sheet1. In "spreadsheets" mode it is Sheet1 of a spreadsheet of
+    its own; shard 0 is the main spreadsheet and the others are recorded in
+    `path` as they are created. With rows_per_shard 0 there is a single
+    shard, Sheet1, holding every id.
+
+    Only shards that exist are listed; the engine creates the rest on first
+    write (see add()).
+    """
+
+    def __init__(self, spreadsheet_id, rows_per_shard=0, mode="tabs", path="sheet_shards.json", first_row=3):
+        if mode not in ("tabs", "spreadsheets"):
+            raise ValueError(f"Shard mode must be 'tabs' or 'spreadsheets', not {mode!r}")
+        self.spreadsheet_id = spreadsheet_id
+        self.rows_per_shard = rows_per_shard
+        self.mode = mode
+        self.path = path
+        self.first_row = first_row
+        self.lock = threading.Lock()
+        self.shards = {}
+        self.add(0, spreadsheet_id)
+        if mode == "spreadsheets" and rows_per_shard:
+            try:
+                with open(path, "r") as file:
+                    saved = json.load(file)
+            except FileNotFoundError:
+                saved = {}
+            for number, shard_spreadsheet_id in saved.items():
+                self.add(int(number), shard_spreadsheet_id, save=False)
+
+    def number_of(self, row_id):
+        return int(row_id) // self.rows_per_shard if self.rows_per_shard else 0
+
+    def tab_of(self, number):
+        return f"Sheet{number + 1}" if self.mode == "tabs" else "Sheet1"
+
+    def get(self, number):
+        """The shard with this number, or None if it hasn't been created yet."""
+        with self.lock:
+            return self.shards.get(number)
+
+    def owner(self, row_id):
+        """The shard that owns `row_id`, or None if it hasn't been created yet."""
+        return self.get(self.number_of(row_id))
+
+    def all(self):
+        with self.lock:
+            return [self.shards[number] for number in sorted(self.shards)]
+
+    def add(self, number, spreadsheet_id=None, save=True):
+        """Register an existing (or just created) shard and return it."""
+        if self.rows_per_shard:
+            first_id, last_id = number * self.rows_per_shard, (number + 1) * self.rows_per_shard - 1
+        else:
+            first_id, last_id = 0, float("inf")
+        shard = Shard(
+            number, spreadsheet_id or self.spreadsheet_id, self.tab_of(number), first_id, last_id, self.first_row
+        )
+        with self.lock:
+            if number in self.shards:
+                return self.shards[number]
+            self.shards[number] = shard
+            if save and self.mode == "spreadsheets" and number:
+                # Write to a temp file first so a crash can't lose the other shards' ids
+                state = {str(n): s.spreadsheet_id for n, s in self.shards.items() if n}
+                temp_path = self.path + ".tmp"
+                with open(temp_path, "w") as file:
+                    json.dump(state, file, indent=1)
+                os.replace(temp_path, self.path)
+        return shard
+
+    def split(self, rows):
+        """Group rows (id first) by shard number, keeping their order."""
+        groups = {}
+        for row in rows:
+            groups.setdefault(self.number_of(row[0]), []).append(row)
+        return groups
@@ -0,0 +1,52 @@
+import threading
+import time
+
+
+class QuotaWaitCancelled(Exception):
+    """Raised by QuotaScheduler.acquire() when the stop event is set while it waits."""
+
+
+class QuotaScheduler:
+    """Token bucket shared by every thread that writes to the Sheets API.
+
+    Google meters writes per minute per user, so parallel writers have to
+    draw from one budget: acquire() blocks until a request may start. When
+    any of them is answered 429, back_off() holds all of them for the
+    backoff delay instead of letting the others keep hitting the limit.
+
+    With a `stop_event`, a waiting acquire() wakes as soon as it is set, so a
+    writer held by a long back-off doesn't hold up a shutdown.
+    """
+
+    def __init__(self, requests_per_minute, burst=None, stop_event=None):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = float(burst or max(1, requests_per_minute // 6))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self.stop_event = stop_event or threading.Event()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Wait for a request slot; returns the seconds spent waiting.
+
+        Raises QuotaWaitCancelled if the stop event is set before a slot frees up.
+        """
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            if self.stop_event.wait(delay):
+                raise QuotaWaitCancelled(f"Stopped waiting for the write quota after {waited:.1f}s")
+            waited += delay
+
+    def back_off(self, seconds):
+        """Hold every writer for `seconds`, e.g. after a 429."""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
@@ -0,0 +1,10 @@
+#!/bin/sh
+# Linux/macOS counterpart of start.bat: runs the sync engine and serves the
+# Flask app with gunicorn (multiple workers, see flask_app/gunicorn.conf.py)
+cd "$(dirname "$0")"
+
+python syncDbAndSheet.py &
+SYNC_PID=$!
+trap 'kill $SYNC_PID 2>/dev/null' EXIT INT TERM
+
+gunicorn -c flask_app/gunicorn.conf.py
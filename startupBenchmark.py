@@ -0,0 +1,114 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from googleApiEmulator import EmulatorConfig, serve
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+# First Sheets request object from a fresh client, via the library's full
+# discovery document or the trimmed one bundled in discovery/
+CLIENT_SNIPPET = """
+import time, httplib2
+start = time.perf_counter()
+if {bundled}:
+    from googleServices import build_service
+    service = build_service("sheets", "v4", http=httplib2.Http())
+else:
+    from googleapiclient.discovery import build
+    service = build("sheets", "v4", http=httplib2.Http())
+service.spreadsheets().values().get(spreadsheetId="id", range="Sheet1!A1:Z")
+print(time.perf_counter() - start)
+"""
+
+
+def python_env(extra=None):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = REPO_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    env.update(extra or {})
+    return env
+
+
+def time_snippet(code, runs):
+    """Median of the time a snippet reports for itself, each run in a fresh interpreter."""
+    samples = []
+    for _ in range(runs):
+        output = subprocess.check_output(
+            [sys.executable, "-c", code], env=python_env(), cwd=REPO_DIR, text=True
+        )
+        samples.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+
+def time_one_shot_sync(emulator_url, runs):
+    """Median wall time of `syncDbAndSheet.py --once`, from process start to exit.
+
+    Runs in a scratch directory so it never touches the real sync state, and
+    against the emulator so no Google credentials are needed.
+    """
+    samples, db_errors = [], False
+    with tempfile.TemporaryDirectory() as work_dir:
+        with open(os.path.join(work_dir, "spreadsheet_id.txt"), "w") as file:
+            file.write("startup-benchmark")
+        for _ in range(runs):
+            start = time.perf_counter()
+            result = subprocess.run(
+                [sys.executable, os.path.join(REPO_DIR, "syncDbAndSheet.py"), "--once"],
+                env=python_env({"GOOGLE_API_EMULATOR_URL": emulator_url}),
+                cwd=work_dir,
+                capture_output=True,
+                text=True,
+            )
+            samples.append(time.perf_counter() - start)
+            if result.returncode != 0:
+                raise RuntimeError(f"One-shot sync failed:\n{result.stderr}")
+            db_errors = db_errors or "MySQL" in result.stdout
+    return statistics.median(samples), db_errors
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Measure cold-start cost: module imports, client construction and a one-shot sync."
+    )
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per measurement.")
+    parser.add_argument("--output", help="Also write the results to this JSON file.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    server, _ = serve("127.0.0.1", 0, EmulatorConfig())
+    emulator_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    results = {
+        "import_syncDbAndSheet_seconds": time_snippet(IMPORT_SNIPPET.format(module="syncDbAndSheet"), args.runs),
+        "import_uploadSheetToDrive_seconds": time_snippet(
+            IMPORT_SNIPPET.format(module="uploadSheetToDrive"), args.runs
+        ),
+        "sheets_client_library_discovery_seconds": time_snippet(CLIENT_SNIPPET.format(bundled=False), args.runs),
+        "sheets_client_bundled_discovery_seconds": time_snippet(CLIENT_SNIPPET.format(bundled=True), args.runs),
+    }
+    one_shot, db_errors = time_one_shot_sync(emulator_url, args.runs)
+    results["one_shot_sync_seconds"] = one_shot
+    server.shutdown()
+
+    for name, seconds in results.items():
+        print(f"{name:<45} {seconds * 1000:>9.1f} ms")
+    if db_errors:
+        print("Note: MySQL was unreachable during the one-shot runs, so DB time is not included.")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"runs": args.runs, "mysql_reachable": not db_errors, "results": results}, file, indent=2)
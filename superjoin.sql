@@ -17,3 +17,50 @@ VALUES (20, 'super', 'Software Engineer', 9, 'Excellent opportunity');
 -- WHERE id = 7;
 DELETE FROM internships
 WHERE id = 7;
+
+-- Responses of the batch API, replayed when a client retries with the same Idempotency-Key
+CREATE TABLE IF NOT EXISTS api_idempotency_keys (
+    idempotency_key VARCHAR(255) PRIMARY KEY,
+    request_hash CHAR(64) NOT NULL,
+    status_code SMALLINT,
+    response LONGTEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Changelog of every row-level change to internships, whoever made it (Flask,
+-- the sync engine or a manual query). Readers such as the Flask cache poll it
+-- by seq to find out exactly which rows changed.
+CREATE TABLE IF NOT EXISTS internship_changes (
+    seq BIGINT AUTO_INCREMENT PRIMARY KEY,
+    row_id INT NOT NULL,
+    op CHAR(1) NOT NULL,  -- I(nsert), U(pdate) or D(elete)
+    changed_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6)
+);
+
+CREATE TRIGGER internships_after_insert AFTER INSERT ON internships
+FOR EACH ROW INSERT INTO internship_changes (row_id, op) VALUES (NEW.id, 'I');
+
+DELIMITER //
+CREATE TRIGGER internships_after_update AFTER UPDATE ON internships
+FOR EACH ROW
+BEGIN
+    -- Upserts that rewrite a row with identical values are not changes
+    IF NOT (OLD.id <=> NEW.id AND OLD.company_name <=> NEW.company_name
+            AND OLD.job_title <=> NEW.job_title AND OLD.cgpa_cutoff <=> NEW.cgpa_cutoff
+            AND OLD.remarks <=> NEW.remarks) THEN
+        IF NOT OLD.id <=> NEW.id THEN
+            INSERT INTO internship_changes (row_id, op) VALUES (OLD.id, 'D');
+        END IF;
+        INSERT INTO internship_changes (row_id, op) VALUES (NEW.id, 'U');
+    END IF;
+END//
+DELIMITER ;
+
+CREATE TRIGGER internships_after_delete AFTER DELETE ON internships
+FOR EACH ROW INSERT INTO internship_changes (row_id, op) VALUES (OLD.id, 'D');
+
+-- Indexes behind /api/internships/search and the list page's search form:
+-- full-text matching on company and job title, and CGPA range filters
+-- (InnoDB appends the primary key, so this also serves ORDER BY id within a range)
+ALTER TABLE internships ADD FULLTEXT INDEX ft_company_job (company_name, job_title);
+ALTER TABLE internships ADD INDEX idx_cgpa_cutoff (cgpa_cutoff);
@@ -0,0 +1,513 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import mysql.connector
+
+import syncDbAndSheet as sync
+from fakeSheets import FakeSheetsService
+from outboundQueue import OutboundQueue
+
+# db_to_sheets follows the changelog through the outbound queue, as the engine
+# does every cycle; db_to_sheets_snapshot is the full rewrite it falls back to
+# on a first run or a lost queue file
+DIRECTIONS = ("db_to_sheets", "db_to_sheets_snapshot", "sheets_to_db")
+PATTERNS = ("single_cell", "bulk_paste", "mass_delete")
+
+# Same header the engine writes to row 2; data starts on row 3
+HEADER = ["ID", "Company Name", "Job Title", "CGPA \nCut-off", "Remarks"]
+FIRST_DATA_ROW = 3
+
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne", "Wonka"]
+JOB_TITLES = ["Software Engineer", "Data Analyst", "Product Intern", "SRE Intern", "ML Engineer"]
+
+CREATE_TABLE_QUERY = """
+CREATE TABLE IF NOT EXISTS internships (
+    id INT PRIMARY KEY,
+    company_name VARCHAR(255),
+    job_title VARCHAR(255),
+    cgpa_cutoff FLOAT,
+    remarks VARCHAR(255)
+)
+"""
+
+# The changelog table and triggers from superjoin.sql, which the DB to Sheets
+# cycle reads its changes from
+CHANGELOG_QUERIES = [
+    """
+    CREATE TABLE IF NOT EXISTS internship_changes (
+        seq BIGINT AUTO_INCREMENT PRIMARY KEY,
+        row_id INT NOT NULL,
+        op CHAR(1) NOT NULL,
+        changed_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6)
+    )
+    """,
+    """
+    CREATE TRIGGER internships_after_insert AFTER INSERT ON internships
+    FOR EACH ROW INSERT INTO internship_changes (row_id, op) VALUES (NEW.id, 'I')
+    """,
+    """
+    CREATE TRIGGER internships_after_update AFTER UPDATE ON internships
+    FOR EACH ROW
+    BEGIN
+        IF NOT (OLD.id <=> NEW.id AND OLD.company_name <=> NEW.company_name
+                AND OLD.job_title <=> NEW.job_title AND OLD.cgpa_cutoff <=> NEW.cgpa_cutoff
+                AND OLD.remarks <=> NEW.remarks) THEN
+            IF NOT OLD.id <=> NEW.id THEN
+                INSERT INTO internship_changes (row_id, op) VALUES (OLD.id, 'D');
+            END IF;
+            INSERT INTO internship_changes (row_id, op) VALUES (NEW.id, 'U');
+        END IF;
+    END
+    """,
+    """
+    CREATE TRIGGER internships_after_delete AFTER DELETE ON internships
+    FOR EACH ROW INSERT INTO internship_changes (row_id, op) VALUES (OLD.id, 'D')
+    """,
+]
+TRIGGERS = ("internships_after_insert", "internships_after_update", "internships_after_delete")
+
+
+# ===================== Synthetic Data ===================== #
+def synthetic_rows(size, seed):
+    """Rows with ids 1..size, deterministic for a given seed."""
+    rng = random.Random(seed)
+    return [
+        (
+            row_id,
+            rng.choice(COMPANIES),
+            rng.choice(JOB_TITLES),
+            rng.choice([6.0, 6.5, 7.0, 7.5, 8.0, 8.5, 9.0]),
+            f"Batch {rng.randint(2020, 2026)}",
+        )
+        for row_id in range(1, size + 1)
+    ]
+
+
+def sheet_values(rows):
+    """The sheet as a user would see it: title row, header row, then formatted data rows."""
+    return [["Internships"], HEADER] + [
+        [str(row_id), company, job, f"{cgpa:g}", remarks]
+        for row_id, company, job, cgpa, remarks in rows
+    ]
+
+
+def seed_database(rows, chunk_size=5000):
+    connection = mysql.connector.connect(**sync.DB_CONFIG)
+    try:
+        cursor = connection.cursor()
+        cursor.execute(CREATE_TABLE_QUERY)
+        # The triggers go on after seeding, so the changelog starts empty
+        for trigger in TRIGGERS:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        cursor.execute(CHANGELOG_QUERIES[0])
+        cursor.execute("TRUNCATE TABLE internships")
+        cursor.execute("TRUNCATE TABLE internship_changes")
+        for start in range(0, len(rows), chunk_size):
+            cursor.executemany(
+                "INSERT INTO internships (id, company_name, job_title, cgpa_cutoff, remarks) "
+                "VALUES (%s, %s, %s, %s, %s)",
+                rows[start:start + chunk_size],
+            )
+        connection.commit()
+        for query in CHANGELOG_QUERIES[1:]:
+            cursor.execute(query)
+        cursor.close()
+    finally:
+        connection.close()
+
+
+def churn_range(size, pattern, fraction, rng):
+    """Pick the contiguous id range [first, last] a churn pattern touches."""
+    if pattern == "single_cell":
+        row_id = rng.randint(1, size)
+        return row_id, row_id
+    count = max(1, int(size * fraction))
+    first = rng.randint(1, size - count + 1)
+    return first, first + count - 1
+
+
+def churn_database(pattern, first, last):
+    connection = mysql.connector.connect(**sync.DB_CONFIG)
+    try:
+        cursor = connection.cursor()
+        if pattern == "single_cell":
+            cursor.execute("UPDATE internships SET remarks = %s WHERE id = %s", ("Edited", first))
+        elif pattern == "bulk_paste":
+            cursor.execute(
+                "UPDATE internships SET job_title = %s WHERE id BETWEEN %s AND %s",
+                ("Pasted Title", first, last),
+            )
+        else:
+            cursor.execute("DELETE FROM internships WHERE id BETWEEN %s AND %s", (first, last))
+        connection.commit()
+        cursor.close()
+    finally:
+        connection.close()
+
+
+def churn_sheet(grid, pattern, first, last):
+    # Ids are contiguous from 1, so id N sits on sheet row N + 2
+    if pattern == "single_cell":
+        grid.update(f"Sheet1!E{first + FIRST_DATA_ROW - 1}", [["Edited"]])
+    elif pattern == "bulk_paste":
+        grid.update(
+            f"Sheet1!C{first + FIRST_DATA_ROW - 1}",
+            [["Pasted Title"]] * (last - first + 1),
+        )
+    else:
+        # Deleting rows in the UI shifts everything below them up
+        with grid.lock:
+            rows = grid.tabs["Sheet1"]
+            del rows[first + FIRST_DATA_ROW - 2:last + FIRST_DATA_ROW - 1]
+
+
+# ===================== Measurement ===================== #
+def current_rss_bytes():
+    """Resident set size of this process, or None where /proc isn't available."""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def max_rss_bytes():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RssSampler:
+    """Track the peak RSS while a block runs by sampling it from a background thread."""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.baseline = None
+        self.peak = None
+        self.stop = threading.Event()
+
+    def _run(self):
+        while not self.stop.wait(self.interval):
+            rss = current_rss_bytes()
+            if rss is not None:
+                self.peak = max(self.peak or 0, rss)
+
+    def __enter__(self):
+        self.baseline = current_rss_bytes()
+        self.peak = self.baseline
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop.set()
+        self.thread.join()
+        rss = current_rss_bytes()
+        if rss is not None:
+            self.peak = max(self.peak or 0, rss)
+        if self.peak is None:
+            # No /proc: fall back to the lifetime peak of the process
+            self.peak = max_rss_bytes()
+
+
+def start_outbound_queue():
+    """An outbound queue following the changelog from now, with a warm row index.
+
+    Mirrors a running engine: the sheet already matches the DB, and the
+    Sheets to DB polls keep the id to row-number index fresh, so a flush
+    doesn't have to read the id column first.
+    """
+    outbound_queue = OutboundQueue(sync.SYNC_QUEUE_FILE)
+    changelog, _ = sync.fetch_snapshot()
+    if changelog is None:
+        raise RuntimeError("Couldn't read the scratch database")
+    outbound_queue.enqueue({}, changelog_seq=changelog.position, changelog_gaps=changelog.gaps)
+    for shard, values in sync.read_shards(cells=f"A{FIRST_DATA_ROW}:A"):
+        shard.row_index.rebuild(values)
+    sync.SYNC_ROW_INDEX_MAX_AGE_SECONDS = float("inf")
+    return outbound_queue
+
+
+def db_to_sheets_cycle(outbound_queue):
+    """Engine cycles in the DB to Sheets direction until the changelog is drained; returns rows pushed.
+
+    Each one reads up to SYNC_CHANGELOG_BATCH changelog entries and their
+    rows, queues them and flushes the queue to the sheet.
+    """
+    pushed = 0
+    while True:
+        changelog = sync.load_changelog_cursor(outbound_queue)
+        changes = sync.fetch_db_changes(changelog, sync.SYNC_CHANGELOG_BATCH)
+        if changes is None:
+            raise RuntimeError("Couldn't read the changelog")
+        seqs, rows, _, oldest_change = changes
+        if not seqs:
+            return pushed
+        changelog.advance(seqs)
+        outbound_queue.enqueue(
+            rows, changed_at=oldest_change,
+            changelog_seq=changelog.position, changelog_gaps=changelog.gaps,
+        )
+        pushed += len(sync.flush_outbound_queue(outbound_queue))
+
+
+def db_to_sheets_snapshot_cycle(last_hash):
+    """One full-rewrite cycle in the DB to Sheets direction; returns (new hash, rows pushed)."""
+    data = sync.fetch_from_mysql()
+    new_hash = sync.calculate_data_hash(data)
+    if new_hash == last_hash:
+        return new_hash, 0
+    sync.update_google_sheet(data)
+    return new_hash, len(data)
+
+
+def sheets_to_db_cycle(last_hash, last_data):
+    """One engine cycle in the Sheets to DB direction; returns (new hash, new data, rows changed)."""
+    new_data = sync.read_sheet_data()
+    new_hash = sync.calculate_sheet_hash(new_data)
+    if new_hash == last_hash:
+        return new_hash, last_data, 0
+    rows_to_insert_or_update, ids_to_delete = sync.detect_changes(last_data, new_data)
+    if rows_to_insert_or_update:
+        sync.insert_into_mysql([HEADER] + rows_to_insert_or_update)
+    if ids_to_delete:
+        sync.delete_from_mysql(ids_to_delete)
+    return new_hash, new_data, len(rows_to_insert_or_update) + len(ids_to_delete)
+
+
+def run_scenario(size, direction, pattern, options):
+    """Seed both sides in sync, apply one churn pattern, and measure the cycle that propagates it."""
+    sync.DB_CONFIG["database"] = options["database"]
+    service = FakeSheetsService()
+    sync.get_sheets_service = lambda: service
+    sync.read_spreadsheet_id = lambda: "benchmark"
+
+    seed_start = time.perf_counter()
+    rows = synthetic_rows(size, options["seed"])
+    seed_database(rows)
+    service.grid.update("Sheet1!A1", sheet_values(rows))
+    del rows
+    seed_seconds = time.perf_counter() - seed_start
+
+    rng = random.Random(options["seed"] + 1)
+    first, last = churn_range(size, pattern, options["fraction"], rng)
+
+    # Establish the engine's baseline, then time one idle poll for reference
+    if direction == "db_to_sheets":
+        outbound_queue = start_outbound_queue()
+        idle_start = time.perf_counter()
+        db_to_sheets_cycle(outbound_queue)
+    elif direction == "db_to_sheets_snapshot":
+        last_hash = sync.calculate_data_hash(sync.fetch_from_mysql())
+        idle_start = time.perf_counter()
+        db_to_sheets_snapshot_cycle(last_hash)
+    else:
+        last_data = sync.read_sheet_data()
+        last_hash = sync.calculate_sheet_hash(last_data)
+        idle_start = time.perf_counter()
+        sheets_to_db_cycle(last_hash, last_data)
+    idle_seconds = time.perf_counter() - idle_start
+
+    if direction.startswith("db_to_sheets"):
+        churn_database(pattern, first, last)
+    else:
+        churn_sheet(service.grid, pattern, first, last)
+
+    service.calls.clear()
+    with RssSampler() as rss:
+        cycle_start = time.perf_counter()
+        if direction == "db_to_sheets":
+            rows_changed = db_to_sheets_cycle(outbound_queue)
+        elif direction == "db_to_sheets_snapshot":
+            _, rows_changed = db_to_sheets_snapshot_cycle(last_hash)
+        else:
+            _, _, rows_changed = sheets_to_db_cycle(last_hash, last_data)
+        cycle_seconds = time.perf_counter() - cycle_start
+
+    return {
+        "size": size,
+        "direction": direction,
+        "pattern": pattern,
+        "status": "ok",
+        "rows_touched_by_churn": last - first + 1,
+        "rows_changed": rows_changed,
+        "cycle_seconds": round(cycle_seconds, 6),
+        "idle_cycle_seconds": round(idle_seconds, 6),
+        "rows_per_sec": round(size / cycle_seconds, 1) if cycle_seconds else None,
+        "api_calls": dict(service.calls),
+        "api_calls_total": sum(service.calls.values()),
+        "baseline_rss_mb": round(rss.baseline / 2**20, 1) if rss.baseline else None,
+        "peak_rss_mb": round(rss.peak / 2**20, 1) if rss.peak else None,
+        "seed_seconds": round(seed_seconds, 3),
+    }
+
+
+def scenario_worker(size, direction, pattern, options, results):
+    # The engine keeps its queue, row index and sync state in the working
+    # directory, so each scenario gets an empty one of its own
+    previous_directory = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="sync-benchmark-") as directory:
+        os.chdir(directory)
+        try:
+            results.put(run_scenario(size, direction, pattern, options))
+        except Exception as error:
+            results.put({
+                "size": size, "direction": direction, "pattern": pattern,
+                "status": "error", "error": repr(error),
+            })
+        finally:
+            os.chdir(previous_directory)
+
+
+def run_isolated(size, direction, pattern, options):
+    """Run a scenario in a fresh process so its peak RSS isn't inflated by earlier ones."""
+    context = multiprocessing.get_context()
+    results = context.Queue()
+    process = context.Process(
+        target=scenario_worker, args=(size, direction, pattern, options, results)
+    )
+    process.start()
+    process.join(options["timeout"])
+    if process.is_alive():
+        process.terminate()
+        process.join()
+        return {
+            "size": size, "direction": direction, "pattern": pattern,
+            "status": "timeout", "timeout_seconds": options["timeout"],
+        }
+    if results.empty():
+        return {
+            "size": size, "direction": direction, "pattern": pattern,
+            "status": "error", "error": f"worker exited with code {process.exitcode}",
+        }
+    return results.get()
+
+
+# ===================== Reporting ===================== #
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def scenario_key(result):
+    return result["size"], result["direction"], result["pattern"]
+
+
+def print_result(result):
+    label = f"{result['direction']:<21} {result['pattern']:<12} {result['size']:>8}"
+    if result["status"] != "ok":
+        print(f"{label}  {result['status'].upper()} {result.get('error', '')}")
+        return
+    print(
+        f"{label}  cycle {result['cycle_seconds'] * 1000:>9.1f} ms  "
+        f"idle {result['idle_cycle_seconds'] * 1000:>9.1f} ms  "
+        f"{result['rows_per_sec'] or 0:>10.0f} rows/s  "
+        f"api {result['api_calls_total']:>3}  "
+        f"peak rss {result['peak_rss_mb'] or 0:>7.1f} MB"
+    )
+
+
+def compare_results(baseline_path, results, threshold):
+    """Print cycle time and memory changes against an earlier run; return True on regression."""
+    with open(baseline_path, "r") as file:
+        baseline = {scenario_key(r): r for r in json.load(file)["results"] if r["status"] == "ok"}
+
+    regressed = False
+    print(f"\nCompared with {baseline_path}:")
+    for result in results:
+        old = baseline.get(scenario_key(result))
+        if not old or result["status"] != "ok":
+            continue
+        time_change = result["cycle_seconds"] / old["cycle_seconds"] - 1 if old["cycle_seconds"] else 0
+        rss_change = (
+            result["peak_rss_mb"] / old["peak_rss_mb"] - 1
+            if result["peak_rss_mb"] and old["peak_rss_mb"] else 0
+        )
+        flag = ""
+        if time_change > threshold or rss_change > threshold:
+            flag = "  REGRESSION"
+            regressed = True
+        print(
+            f"{result['direction']:<21} {result['pattern']:<12} {result['size']:>8}  "
+            f"cycle {time_change:+7.1%}  peak rss {rss_change:+7.1%}  "
+            f"api calls {old['api_calls_total']} -> {result['api_calls_total']}{flag}"
+        )
+    return regressed
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark sync cycles on synthetic datasets against an in-memory fake of the Sheets API."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000],
+                        help="Table sizes to generate (e.g. 1000 100000 1000000).")
+    parser.add_argument("--directions", nargs="+", choices=DIRECTIONS, default=list(DIRECTIONS))
+    parser.add_argument("--patterns", nargs="+", choices=PATTERNS, default=list(PATTERNS))
+    parser.add_argument("--fraction", type=float, default=0.1,
+                        help="Share of rows touched by bulk_paste and mass_delete.")
+    parser.add_argument("--database", default="superzz_bench",
+                        help="Scratch MySQL database; its internships table is truncated.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=600, help="Seconds allowed per scenario.")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="Earlier results file to compare against.")
+    parser.add_argument("--regression-threshold", type=float, default=0.2,
+                        help="Relative slowdown or memory growth reported as a regression.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.database == "superzz":
+        sys.exit("Refusing to benchmark against the live superzz database; pass a scratch --database.")
+
+    options = {
+        "database": args.database,
+        "seed": args.seed,
+        "fraction": args.fraction,
+        "timeout": args.timeout,
+    }
+    results = []
+    for size in args.sizes:
+        for direction in args.directions:
+            for pattern in args.patterns:
+                result = run_isolated(size, direction, pattern, options)
+                print_result(result)
+                results.append(result)
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "options": options,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare and compare_results(args.compare, results, args.regression_threshold):
+        sys.exit(1)
@@ -1,33 +1,227 @@
-import mysql.connector
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
+# mysql.connector and the Google client libraries are imported where they are
+# first used, so one-shot runs and scripts that only borrow helpers from this
+# module don't pay for them up front
+import argparse
 import os
 import hashlib
+import json
+import random
+import re
+import signal
 import threading
 import time
+import traceback
 import sys
-import msvcrt  # For detecting keypress on Windows
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from syncMetrics import (
+    DB_QUERY_SECONDS,
+    LOCK_SKIPS,
+    LOCK_WAIT_SECONDS,
+    DB_READ_ROUTES,
+    DB_REPLICA_LAG_SECONDS,
+    REPLICATION_LAG_SECONDS,
+    SHEETS_API_BYTES,
+    SHEETS_API_CALLS,
+    SHEETS_API_SECONDS,
+    SHEETS_API_THROTTLED,
+    SYNC_CELLS_CHANGED,
+    SYNC_CHANGELOG_GAPS,
+    SYNC_CHANGELOG_GAPS_EXPIRED,
+    SYNC_CYCLE_SECONDS,
+    SYNC_LAST_SUCCESS,
+    SYNC_QUEUE_COALESCED,
+    SYNC_QUEUE_DEPTH,
+    SYNC_QUEUE_FLUSH_FAILURES,
+    SYNC_RECONCILE_REPAIRS,
+    SYNC_ROWS_CHANGED,
+    SYNC_SETTLE_SECONDS,
+    SYNC_STATES_COLLAPSED,
+    SYNC_TOMBSTONES_PURGED,
+    SYNC_WRITE_PARTITIONS,
+    SYNC_WRITE_QUOTA_WAIT_SECONDS,
+    SYNC_WRITE_RETRIES,
+    start_metrics_server,
+)
+from syncTracing import tracer_from_env
+from googleApiEmulator import emulator_http
+from googleServices import build_service
+from outboundQueue import OutboundQueue
+from changelogCursor import ChangelogCursor
+from sheetRowIndex import SheetRowIndex
+from sheetShards import ShardMap
+from sheetsQuota import QuotaScheduler, QuotaWaitCancelled
+from syncProfiler import SyncProfiler, install_signal_handlers, start_admin_server
 
 SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
 
+# Last synced fingerprints of both sides, persisted so a restart (or a freshly
+# seeded database) doesn't trigger a full rewrite on the first cycle
+SYNC_STATE_FILE = "sync_state.json"
+# The sheet as last applied to the DB, so a fresh process (each --once run)
+# can diff against it: without it, rows removed from the sheet between runs
+# would never be deleted, and every change would re-upsert the whole sheet
+SYNC_SHEET_BASELINE_FILE = os.environ.get("SYNC_SHEET_BASELINE_FILE", "sheet_baseline.json")
+
+DB_CONFIG = dict(
+    host=os.environ.get("SYNC_DB_HOST", "localhost"),
+    port=int(os.environ.get("SYNC_DB_PORT", 3306)),
+    database=os.environ.get("SYNC_DB_NAME", "superzz"),
+    user=os.environ.get("SYNC_DB_USER", "superjoin"),
+    password=os.environ.get("SYNC_DB_PASSWORD", "super"),
+)
+
+# Optional read replica for the polling, checksum and verification reads;
+# upserts and deletes always go to the primary above. A read only uses the
+# replica if it already has every changelog entry the sheet reflects and its
+# oldest missing change is at most SYNC_DB_REPLICA_MAX_LAG_SECONDS old,
+# otherwise it falls back to the primary (see connect_db()).
+DB_REPLICA_CONFIG = (
+    dict(
+        DB_CONFIG,
+        host=os.environ["SYNC_DB_REPLICA_HOST"],
+        port=int(os.environ.get("SYNC_DB_REPLICA_PORT", DB_CONFIG["port"])),
+        user=os.environ.get("SYNC_DB_REPLICA_USER", DB_CONFIG["user"]),
+        password=os.environ.get("SYNC_DB_REPLICA_PASSWORD", DB_CONFIG["password"]),
+    )
+    if os.environ.get("SYNC_DB_REPLICA_HOST")
+    else None
+)
+SYNC_DB_REPLICA_MAX_LAG_SECONDS = float(os.environ.get("SYNC_DB_REPLICA_MAX_LAG_SECONDS", 5))
+
+# Base URL of googleApiEmulator.py; when set, all Sheets calls go there instead of Google
+GOOGLE_API_EMULATOR_URL = os.environ.get("GOOGLE_API_EMULATOR_URL")
+
+# Port for the Prometheus /metrics endpoint of the sync process (0 disables it)
+SYNC_METRICS_PORT = int(os.environ.get("SYNC_METRICS_PORT", 9101))
+
+# Per-cycle traces (fetch, hash, diff and write spans), configured by SYNC_TRACE_*
+tracer = tracer_from_env("sheets-db-sync")
+
+# Response headers that carry a Google request id, if the API sent one
+REQUEST_ID_HEADERS = ("x-goog-request-id", "x-request-id", "x-guploader-uploadid")
+
+# On-demand profiling: SIGUSR1/SIGUSR2 or GET /debug/profile on the admin port
+# (bound to localhost; 0 disables it). Output goes to SYNC_PROFILE_DIR.
+SYNC_ADMIN_HOST = os.environ.get("SYNC_ADMIN_HOST", "127.0.0.1")
+SYNC_ADMIN_PORT = int(os.environ.get("SYNC_ADMIN_PORT", 9102))
+SYNC_PROFILE_SECONDS = float(os.environ.get("SYNC_PROFILE_SECONDS", 10))
+profiler = SyncProfiler(
+    output_dir=os.environ.get("SYNC_PROFILE_DIR", "profiles"),
+    interval=float(os.environ.get("SYNC_PROFILE_INTERVAL_MS", 5)) / 1000,
+)
+
 # Create a global mutex lock
 lock = threading.Lock()
 
-# A global flag to signal threads to exit gracefully
-exit_flag = False
+# Per-thread Google API clients, see get_sheets_service()
+thread_clients = threading.local()
+
+# Guards reads and writes of the sync state file from both sync threads
+state_lock = threading.Lock()
+
+# Set on SIGTERM/SIGINT (or when a sync thread dies). The sync loops check it
+# between cycles and wait on it instead of sleeping, so they stop right away.
+shutdown_event = threading.Event()
+
+# Set when a sync thread died from an exception, so the process exits non-zero
+sync_failed = threading.Event()
+
+# Pause between polling cycles of each direction
+SYNC_POLL_SECONDS = float(os.environ.get("SYNC_POLL_SECONDS", 3))
+
+# DB to Sheets changes wait in this local file until the sheet has them, so a
+# failed or interrupted push is retried rather than lost (see outboundQueue.py)
+SYNC_QUEUE_FILE = os.environ.get("SYNC_QUEUE_FILE", "outbound_queue.db")
+# Changelog entries moved into the queue per cycle
+SYNC_CHANGELOG_BATCH = int(os.environ.get("SYNC_CHANGELOG_BATCH", 10000))
+# A changelog seq missing below ones already read belongs to a transaction
+# that hasn't committed yet; it is asked for again on every poll for this
+# long before it is taken to be rolled back (see changelogCursor.py)
+SYNC_CHANGELOG_GAP_SECONDS = float(os.environ.get("SYNC_CHANGELOG_GAP_SECONDS", 60))
+# Entries this close below the newest one are checked for such gaps when a
+# full snapshot starts following the changelog
+CHANGELOG_SNAPSHOT_WINDOW = 1000
+# Every so often the whole table is compared with the sheet and rows that
+# differ are queued, as a backstop for changes the changelog never delivered
+# (0 turns it off)
+SYNC_RECONCILE_INTERVAL_SECONDS = float(os.environ.get("SYNC_RECONCILE_INTERVAL_SECONDS", 3600))
+# Deleted rows are blanked in place; past this many blank rows the next flush
+# rewrites the whole sheet to close the gaps
+SYNC_QUEUE_MAX_GAPS = int(os.environ.get("SYNC_QUEUE_MAX_GAPS", 200))
+
+# Optional soft deletes. With SYNC_TOMBSTONES=1 a row deleted in the DB stays
+# on the sheet as a tombstone (its id, blank values and the changelog seq of
+# the delete in the Deleted column) instead of being blanked, and anything
+# typed into a row's Deleted cell deletes it from the DB. A background job
+# purges tombstones and changelog entries older than
+# SYNC_TOMBSTONE_RETENTION_SECONDS every SYNC_COMPACTION_INTERVAL_SECONDS.
+SYNC_TOMBSTONES = os.environ.get("SYNC_TOMBSTONES", "0") == "1"
+SYNC_TOMBSTONE_RETENTION_SECONDS = float(os.environ.get("SYNC_TOMBSTONE_RETENTION_SECONDS", 7 * 24 * 3600))
+SYNC_COMPACTION_INTERVAL_SECONDS = float(os.environ.get("SYNC_COMPACTION_INTERVAL_SECONDS", 3600))
+# Column F, right of the five data columns
+TOMBSTONE_COLUMN = 5
+
+# A sheet change is applied only once the sheet has stopped changing for
+# SYNC_QUIESCENCE_SECONDS, so a paste or fill caught half-way is applied once,
+# complete; SYNC_DEBOUNCE_MAX_SECONDS caps the wait during non-stop editing
+SYNC_QUIESCENCE_SECONDS = float(os.environ.get("SYNC_QUIESCENCE_SECONDS", 2))
+SYNC_DEBOUNCE_MAX_SECONDS = float(os.environ.get("SYNC_DEBOUNCE_MAX_SECONDS", 15))
+
+# Sheet writes are split into row-range partitions that each fit comfortably
+# in one request body (Google advises keeping payloads under 2 MB), written by
+# up to SYNC_WRITE_CONCURRENCY threads that share one per-minute write quota.
+# A failed partition is retried on its own, up to SYNC_WRITE_MAX_ATTEMPTS times.
+SYNC_WRITE_PARTITION_ROWS = int(os.environ.get("SYNC_WRITE_PARTITION_ROWS", 5000))
+SYNC_WRITE_PARTITION_BYTES = int(os.environ.get("SYNC_WRITE_PARTITION_BYTES", 1_000_000))
+SYNC_WRITE_CONCURRENCY = int(os.environ.get("SYNC_WRITE_CONCURRENCY", 4))
+SYNC_WRITE_MAX_ATTEMPTS = int(os.environ.get("SYNC_WRITE_MAX_ATTEMPTS", 5))
+write_quota = QuotaScheduler(
+    int(os.environ.get("SYNC_WRITE_QUOTA_PER_MINUTE", 60)), stop_event=shutdown_event
+)
+write_pool = None  # Created on the first partitioned write, see write_partitions()
+read_pool = None  # Created on the first read of several spreadsheets, see read_shards()
+
+# Data rows start on sheet row 3, below the title and header rows
+FIRST_DATA_ROW = 3
+
+# Rows are split by id range across shards once SYNC_SHARD_ROWS is set, so no
+# tab or spreadsheet grows past Sheets' cell limits: each shard is a tab of
+# the main spreadsheet (SYNC_SHARD_MODE=tabs) or a spreadsheet of its own
+# (SYNC_SHARD_MODE=spreadsheets, recorded in SYNC_SHARD_FILE). Shards are
+# created as ids reach them, and read and written in parallel. With the
+# default of 0, Sheet1 holds every row. See sheetShards.py.
+SYNC_SHARD_ROWS = int(os.environ.get("SYNC_SHARD_ROWS", 0))
+SYNC_SHARD_MODE = os.environ.get("SYNC_SHARD_MODE", "tabs")
+SYNC_SHARD_FILE = os.environ.get("SYNC_SHARD_FILE", "sheet_shards.json")
+shard_map = None  # Loaded on first use, see get_shard_map()
+shard_map_lock = threading.Lock()
+shard_create_lock = threading.Lock()
+
+# Each shard has an index of where each id sits on it, rebuilt from every
+# Sheets to DB read and kept current by our own writes, so queue flushes don't
+# have to look rows up. The first shard's is saved to SYNC_ROW_INDEX_FILE for
+# extra/CRUD.py; a flush re-reads a shard's id column itself if its index is
+# older than SYNC_ROW_INDEX_MAX_AGE_SECONDS.
+SYNC_ROW_INDEX_FILE = os.environ.get("SYNC_ROW_INDEX_FILE", "sheet_row_index.json")
+SYNC_ROW_INDEX_MAX_AGE_SECONDS = float(os.environ.get("SYNC_ROW_INDEX_MAX_AGE_SECONDS", 10))
 
 
 # Google Sheets Authentication
 def google_sheets_auth():
+    from google.oauth2.credentials import Credentials
+
     creds = None
     if os.path.exists("token.json"):
         creds = Credentials.from_authorized_user_file("token.json", SCOPES)
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
+            from google.auth.transport.requests import Request
+
             creds.refresh(Request())
         else:
+            from google_auth_oauthlib.flow import InstalledAppFlow
+
             flow = InstalledAppFlow.from_client_secrets_file("credentials.json", SCOPES)
             creds = flow.run_local_server(port=8080)
         with open("token.json", "w") as token:
@@ -42,19 +236,315 @@ def read_spreadsheet_id():
         return file.read().strip()
 
 
+def get_sheets_service():
+    """Return this thread's authorised Sheets v4 client (or one bound to the local emulator).
+
+    Clients are built once per thread: reusing them skips rebuilding the
+    API surface every cycle, and httplib2 connections can't be shared
+    between threads.
+    """
+    service = getattr(thread_clients, "sheets", None)
+    if service is None:
+        if GOOGLE_API_EMULATOR_URL:
+            service = build_service("sheets", "v4", http=emulator_http(GOOGLE_API_EMULATOR_URL))
+        else:
+            service = build_service("sheets", "v4", credentials=google_sheets_auth())
+        thread_clients.sheets = service
+    return service
+
+
+def execute_sheets_request(request, method):
+    """Execute a Sheets API request, recording its latency, payload sizes and outcome."""
+    from googleapiclient.errors import HttpError
+
+    with tracer.span(f"sheets.{method}") as span:
+        if request.body:
+            SHEETS_API_BYTES.labels("sent").inc(len(request.body))
+            tracer.set_attribute("bytes_sent", len(request.body))
+
+        # Count the raw response size before the client parses it
+        postproc = request.postproc
+
+        def count_received(resp, content):
+            SHEETS_API_BYTES.labels("received").inc(len(content or b""))
+            if span is not None:
+                span.set_attribute("bytes_received", len(content or b""))
+                for header in REQUEST_ID_HEADERS:
+                    if resp.get(header):
+                        span.set_attribute("request_id", resp[header])
+                        break
+            return postproc(resp, content)
+
+        request.postproc = count_received
+
+        start_time = time.perf_counter()
+        try:
+            response = request.execute()
+        except HttpError as error:
+            SHEETS_API_CALLS.labels(method, str(error.resp.status)).inc()
+            tracer.set_attribute("http.status_code", error.resp.status)
+            if error.resp.status == 429:
+                SHEETS_API_THROTTLED.labels(method).inc()
+            raise
+        finally:
+            SHEETS_API_SECONDS.labels(method).observe(time.perf_counter() - start_time)
+        SHEETS_API_CALLS.labels(method, "200").inc()
+        tracer.set_attribute("http.status_code", 200)
+        return response
+
+
+# ===================== Shards ===================== #
+def load_shard_map(spreadsheet_id):
+    """Build the shard map of a spreadsheet; in tabs mode its existing shard tabs are listed from the sheet."""
+    shards = ShardMap(spreadsheet_id, SYNC_SHARD_ROWS, SYNC_SHARD_MODE, SYNC_SHARD_FILE, FIRST_DATA_ROW)
+    if SYNC_SHARD_ROWS and SYNC_SHARD_MODE == "tabs":
+        sheet = get_sheets_service().spreadsheets()
+        result = execute_sheets_request(
+            sheet.get(spreadsheetId=spreadsheet_id, fields="sheets.properties.title"), "spreadsheets.get"
+        )
+        for tab in result.get("sheets", []):
+            title = tab["properties"]["title"]
+            if re.fullmatch(r"Sheet[1-9][0-9]*", title):
+                shards.add(int(title[len("Sheet"):]) - 1)
+    return shards
+
+
+def get_shard_map():
+    global shard_map
+    with shard_map_lock:
+        if shard_map is None:
+            shard_map = load_shard_map(read_spreadsheet_id())
+        return shard_map
+
+
+def sheet_header():
+    header = ["ID", "Company Name", "Job Title", "CGPA \nCut-off", "Remarks"]
+    return header + ["Deleted"] if SYNC_TOMBSTONES else header
+
+
+def ensure_shard(number):
+    """The shard with this number, creating its tab or spreadsheet (with title and header rows) if needed."""
+    from googleapiclient.errors import HttpError
+
+    shards = get_shard_map()
+    with shard_create_lock:
+        shard = shards.get(number)
+        if shard is not None:
+            return shard
+        sheet = get_sheets_service().spreadsheets()
+        first_id, last_id = number * SYNC_SHARD_ROWS, (number + 1) * SYNC_SHARD_ROWS - 1
+        title = f"Internships {first_id}-{last_id}"
+        SYNC_WRITE_QUOTA_WAIT_SECONDS.inc(write_quota.acquire())
+        if SYNC_SHARD_MODE == "tabs":
+            body = {"requests": [{"addSheet": {"properties": {"title": shards.tab_of(number)}}}]}
+            try:
+                execute_sheets_request(
+                    sheet.batchUpdate(spreadsheetId=shards.spreadsheet_id, body=body), "spreadsheets.batchUpdate"
+                )
+            except HttpError as error:
+                # 400 if the tab is already there, e.g. made by hand
+                if error.resp.status != 400:
+                    raise
+            shard = shards.add(number)
+        else:
+            result = execute_sheets_request(
+                sheet.create(body={"properties": {"title": title}}, fields="spreadsheetId"), "spreadsheets.create"
+            )
+            shard = shards.add(number, result["spreadsheetId"])
+
+        SYNC_WRITE_QUOTA_WAIT_SECONDS.inc(write_quota.acquire())
+        execute_sheets_request(
+            sheet.values().update(
+                spreadsheetId=shard.spreadsheet_id,
+                range=shard.range("A1"),
+                valueInputOption="RAW",
+                body={"values": [[title], sheet_header()]},
+            ),
+            "update",
+        )
+        shard.row_index.rebuild([])
+        print(f"Created shard {number} ({shard.name}) for ids {first_id}-{last_id}.")
+        return shard
+
+
+def read_shards(shards=None, cells="A1:Z"):
+    """Read `cells` of every shard (or just `shards`); returns [(shard, values)].
+
+    Tabs of one spreadsheet are read in a single batchGet, and separate
+    spreadsheets in parallel.
+    """
+    global read_pool
+    shards = get_shard_map().all() if shards is None else shards
+    by_spreadsheet = {}
+    for shard in shards:
+        by_spreadsheet.setdefault(shard.spreadsheet_id, []).append(shard)
+
+    def read(spreadsheet_id, group):
+        sheet = get_sheets_service().spreadsheets()
+        if len(group) == 1:
+            result = execute_sheets_request(
+                sheet.values().get(spreadsheetId=spreadsheet_id, range=group[0].range(cells)), "get"
+            )
+            return [(group[0], result.get("values", []))]
+        result = execute_sheets_request(
+            sheet.values().batchGet(spreadsheetId=spreadsheet_id, ranges=[shard.range(cells) for shard in group]),
+            "batchGet",
+        )
+        return [
+            (shard, value_range.get("values", []))
+            for shard, value_range in zip(group, result.get("valueRanges", []))
+        ]
+
+    if len(by_spreadsheet) == 1:
+        return read(*next(iter(by_spreadsheet.items())))
+    if read_pool is None:
+        read_pool = ThreadPoolExecutor(max_workers=SYNC_WRITE_CONCURRENCY, thread_name_prefix="sheet_reader")
+    trace_context = tracer.context()
+
+    def read_attached(spreadsheet_id, group):
+        with tracer.attached(trace_context):
+            return read(spreadsheet_id, group)
+
+    futures = [read_pool.submit(read_attached, *item) for item in by_spreadsheet.items()]
+    return [pair for future in futures for pair in future.result()]
+
+
+def load_sync_state():
+    """Load the persisted sync fingerprints, or an empty state if there are none yet."""
+    with state_lock:
+        if not os.path.exists(SYNC_STATE_FILE):
+            return {}
+        with open(SYNC_STATE_FILE, "r") as file:
+            return json.load(file)
+
+
+def save_sync_state(**fingerprints):
+    """Merge the given fingerprints into the persisted sync state."""
+    with state_lock:
+        state = {}
+        if os.path.exists(SYNC_STATE_FILE):
+            with open(SYNC_STATE_FILE, "r") as file:
+                state = json.load(file)
+        state.update(fingerprints)
+        # Write to a temp file first so a crash never leaves a half-written state
+        temp_path = SYNC_STATE_FILE + ".tmp"
+        with open(temp_path, "w") as file:
+            json.dump(state, file)
+        os.replace(temp_path, SYNC_STATE_FILE)
+
+
+def load_sheet_baseline(sheet_hash):
+    """The sheet rows last applied to the DB if they were saved with `sheet_hash`, else []."""
+    try:
+        with open(SYNC_SHEET_BASELINE_FILE, "r") as file:
+            baseline = json.load(file)
+    except (OSError, ValueError):
+        return []
+    return baseline["rows"] if sheet_hash and baseline.get("sheet_hash") == sheet_hash else []
+
+
+def save_sheet_baseline(sheet_hash, rows):
+    temp_path = SYNC_SHEET_BASELINE_FILE + ".tmp"
+    with open(temp_path, "w") as file:
+        json.dump({"sheet_hash": sheet_hash, "rows": rows}, file)
+    os.replace(temp_path, SYNC_SHEET_BASELINE_FILE)
+
+
+# ===================== Read/Write Routing ===================== #
+def replica_lag_seconds(replica_seq):
+    """How old the oldest change the replica doesn't have yet is, measured on the primary (0 if none)."""
+    import mysql.connector
+
+    connection = mysql.connector.connect(**DB_CONFIG)
+    try:
+        cursor = connection.cursor()
+        with DB_QUERY_SECONDS.labels("replica_lag").time():
+            cursor.execute(
+                "SELECT UNIX_TIMESTAMP(NOW(6)) - UNIX_TIMESTAMP(changed_at) FROM internship_changes "
+                "WHERE seq > %s ORDER BY seq LIMIT 1",
+                (replica_seq,),
+            )
+            row = cursor.fetchone()
+        cursor.close()
+        return float(row[0]) if row else 0.0
+    finally:
+        connection.close()
+
+
+def replica_connection(min_seq):
+    """A connection to the read replica if it is fresh enough to read from, else None.
+
+    The changelog is replicated like any other table, so the replica's newest
+    seq says exactly which changes it has. It must have every entry up to
+    `min_seq` (what the sheet already reflects), and the oldest change it is
+    missing must be at most SYNC_DB_REPLICA_MAX_LAG_SECONDS old. The check
+    opens the transaction the caller's queries then run in, so they read
+    the same snapshot the check saw.
+    """
+    import mysql.connector
+
+    connection = None
+    try:
+        connection = mysql.connector.connect(**DB_REPLICA_CONFIG)
+        cursor = connection.cursor()
+        cursor.execute("SELECT COALESCE(MAX(seq), 0) FROM internship_changes")
+        (replica_seq,) = cursor.fetchone()
+        cursor.close()
+        lag = replica_lag_seconds(replica_seq)
+    except mysql.connector.Error as error:
+        print(f"Read replica unavailable, reading from the primary {error}")
+        DB_READ_ROUTES.labels("primary", "replica_error").inc()
+        if connection and connection.is_connected():
+            connection.close()
+        return None
+
+    DB_REPLICA_LAG_SECONDS.set(lag)
+    if min_seq is not None and replica_seq < min_seq:
+        reason = "replica_behind_sheet"
+    elif lag > SYNC_DB_REPLICA_MAX_LAG_SECONDS:
+        reason = "replica_lag"
+    else:
+        DB_READ_ROUTES.labels("replica", "ok").inc()
+        return connection
+    print(f"Read replica is at changelog seq {replica_seq}, {lag:.1f}s behind, reading from the primary.")
+    DB_READ_ROUTES.labels("primary", reason).inc()
+    connection.close()
+    return None
+
+
+def connect_db(purpose="write", min_seq=None):
+    """Open a MySQL connection: the primary for writes, the replica for reads when it is usable.
+
+    `min_seq` is the newest changelog entry the caller's result must include,
+    so a lagging replica can never hand back rows older than the sheet's.
+    """
+    if purpose == "read" and DB_REPLICA_CONFIG:
+        connection = replica_connection(min_seq)
+        if connection is not None:
+            return connection
+    elif purpose == "read":
+        DB_READ_ROUTES.labels("primary", "no_replica").inc()
+
+    import mysql.connector
+
+    return mysql.connector.connect(**DB_CONFIG)
+
+
 # ===================== DB to Sheets Sync ===================== #
-def fetch_from_mysql():
+def fetch_from_mysql(min_seq=None):
     """Fetch all data from the MySQL table."""
+    import mysql.connector
+
+    connection = None
     try:
-        connection = mysql.connector.connect(
-            host="localhost", database="superzz", user="superjoin", password="super"
-        )
+        connection = connect_db("read", min_seq)
         cursor = connection.cursor()
 
-        cursor.execute(
-            "SELECT id, company_name, job_title, cgpa_cutoff, remarks FROM internships"
-        )
-        records = cursor.fetchall()
+        with DB_QUERY_SECONDS.labels("fetch").time():
+            cursor.execute(
+                "SELECT id, company_name, job_title, cgpa_cutoff, remarks FROM internships"
+            )
+            records = cursor.fetchall()
 
         return records
 
@@ -68,33 +558,212 @@ def fetch_from_mysql():
             connection.close()
 
 
-def update_google_sheet(data):
-    """Update Google Sheet with the data fetched from MySQL."""
-    creds = google_sheets_auth()
-    service = build("sheets", "v4", credentials=creds)
+def partition_ranges(ranges, max_rows, max_bytes):
+    """Pack (first sheet row, rows) ranges into partitions under both limits.
+
+    Long ranges are split across partitions. Returns a list of partitions,
+    each a list of (first sheet row, rows).
+    """
+    partitions, current, partition_rows, partition_bytes = [], [], 0, 0
+    for first_row, rows in ranges:
+        chunk_start, chunk = first_row, []
+        for offset, row in enumerate(rows):
+            row_bytes = len(json.dumps(row, default=str)) + 1
+            if partition_rows and (
+                partition_rows >= max_rows or partition_bytes + row_bytes > max_bytes
+            ):
+                if chunk:
+                    current.append((chunk_start, chunk))
+                partitions.append(current)
+                current, partition_rows, partition_bytes = [], 0, 0
+                chunk_start, chunk = first_row + offset, []
+            chunk.append(row)
+            partition_rows += 1
+            partition_bytes += row_bytes
+        if chunk:
+            current.append((chunk_start, chunk))
+    if current:
+        partitions.append(current)
+    return partitions
+
+
+def write_partition(shard, partition, trace_context):
+    """Write one partition of a shard in a values.batchUpdate, retrying it alone on quota and server errors."""
+    from googleapiclient.errors import HttpError
+    from httplib2 import HttpLib2Error
+
+    sheet = get_sheets_service().spreadsheets()
+    last_column = "F" if SYNC_TOMBSTONES else "E"
+    body = {
+        "valueInputOption": "RAW",
+        "data": [
+            {"range": shard.range(f"A{first}:{last_column}{first + len(rows) - 1}"), "values": rows}
+            for first, rows in partition
+        ],
+    }
+    row_count = sum(len(rows) for _, rows in partition)
+    with tracer.attached(trace_context), tracer.span(
+        "write.partition", shard=shard.number, first_row=partition[0][0], rows=row_count
+    ) as span:
+        attempts = 0
+        while True:
+            SYNC_WRITE_QUOTA_WAIT_SECONDS.inc(write_quota.acquire())
+            try:
+                result = execute_sheets_request(
+                    sheet.values().batchUpdate(spreadsheetId=shard.spreadsheet_id, body=body), "batchUpdate"
+                )
+                return result.get("totalUpdatedCells", 0)
+            except (HttpError, HttpLib2Error, OSError) as error:
+                status = error.resp.status if isinstance(error, HttpError) else None
+                attempts += 1
+                if span is not None:
+                    span.set_attribute("attempts", attempts)
+                if status not in (None, 429, 500, 502, 503, 504) or attempts >= SYNC_WRITE_MAX_ATTEMPTS:
+                    raise
+                delay = min(2**attempts + random.random(), 60)
+                if status == 429:
+                    # Every writer shares the quota, so all of them pause
+                    write_quota.back_off(delay)
+                SYNC_WRITE_RETRIES.labels(str(status or "network")).inc()
+                print(
+                    f"Writing rows {partition[0][0]}+ of {shard.name} failed ({error}), retrying in {delay:.1f}s..."
+                )
+                if shutdown_event.wait(delay):
+                    raise
+
+
+def write_partitions(jobs, on_written=None):
+    """Write (shard, partition) jobs concurrently and return the cells updated.
+
+    Partitions of different shards go out side by side, under the same write
+    quota. `on_written(shard, partition)` is called as each one succeeds. A
+    partition that still fails after its retries doesn't stop the others; the
+    first such error is raised once they have all finished.
+    """
+    global write_pool
+    if write_pool is None:
+        write_pool = ThreadPoolExecutor(
+            max_workers=SYNC_WRITE_CONCURRENCY, thread_name_prefix="sheet_writer"
+        )
+    SYNC_WRITE_PARTITIONS.inc(len(jobs))
+    trace_context = tracer.context()
+    futures = {
+        write_pool.submit(write_partition, shard, partition, trace_context): (shard, partition)
+        for shard, partition in jobs
+    }
+    wait(futures)
+
+    cells, first_error = 0, None
+    for future, (shard, partition) in futures.items():
+        error = future.exception()
+        if error is not None:
+            first_error = first_error or error
+            continue
+        cells += future.result()
+        if on_written:
+            on_written(shard, partition)
+    failed = sum(1 for future in futures if future.exception() is not None)
+    if first_error is not None:
+        print(f"{failed} of {len(jobs)} partitions failed to write.")
+        raise first_error
+    return cells
+
+
+def update_google_sheet(data, numbers=None):
+    """Update Google Sheet with the data fetched from MySQL.
+
+    Each shard gets the rows it owns; pass `numbers` to rewrite only those
+    shards. The rows are written in partitions first and only the rows below
+    them are cleared afterwards, so the sheet never shows up empty mid-push,
+    and a failed push leaves the previous rows rather than a blank sheet.
+    """
+    shards = get_shard_map()
+    groups = shards.split(data)
+    if numbers is None:
+        # Shards left without rows are emptied too
+        numbers = set(groups) | {shard.number for shard in shards.all()}
+
+    rewrites, jobs = [], []
+    for number in sorted(numbers):
+        rows = groups.get(number, [])
+        if not rows and shards.get(number) is None:
+            continue
+        shard = ensure_shard(number)
+        values = [sheet_header()] + [sheet_cells(row) for row in rows]
+        partitions = partition_ranges(
+            [(2, values)], SYNC_WRITE_PARTITION_ROWS, SYNC_WRITE_PARTITION_BYTES
+        )
+        rewrites.append((shard, values))
+        jobs += [(shard, partition) for partition in partitions]
+    updated_cells = write_partitions(jobs)
+
+    sheet = get_sheets_service().spreadsheets()
+    for shard, values in rewrites:
+        # Open-ended so every leftover row below the new data is cleared
+        SYNC_WRITE_QUOTA_WAIT_SECONDS.inc(write_quota.acquire())
+        execute_sheets_request(
+            sheet.values().clear(spreadsheetId=shard.spreadsheet_id, range=shard.range(f"A{2 + len(values)}:Z")),
+            "clear",
+        )
+        # The shard now holds exactly its rows of `data`, in order
+        shard.row_index.rebuild(values[FIRST_DATA_ROW - 2:])
 
-    spreadsheet_id = read_spreadsheet_id()
-    sheet = service.spreadsheets()
+    shards_note = f" across {len(rewrites)} shards" if len(rewrites) > 1 else ""
+    print(f"{updated_cells} cells updated in {len(jobs)} partitions{shards_note}.")
+    tracer.set_attribute("cells", updated_cells)
+    SYNC_ROWS_CHANGED.labels("db_to_sheets", "push").inc(len(data))
+    SYNC_CELLS_CHANGED.labels("db_to_sheets").inc(updated_cells)
 
-    clear_range = "Sheet1!A2:Z1000"
-    sheet.values().clear(spreadsheetId=spreadsheet_id, range=clear_range).execute()
 
-    values = [["ID", "Company Name", "Job Title", "CGPA \nCut-off", "Remarks"]]
-    values += data
+def sheet_cells(row):
+    """The cells that write `row` to the sheet, clearing the Deleted cell when tombstones are on."""
+    # A null cell in a values update means "leave as is", so send blanks
+    cells = ["" if value is None else value for value in row]
+    if SYNC_TOMBSTONES:
+        cells += [""] * (TOMBSTONE_COLUMN + 1 - len(cells))
+    return cells
 
-    body = {"values": values}
-    result = (
-        sheet.values()
-        .update(
-            spreadsheetId=spreadsheet_id,
-            range="Sheet1!A2",
-            valueInputOption="RAW",
-            body=body,
-        )
-        .execute()
+
+def tombstone_row(row_id, version):
+    """Sheet row marking `row_id` as deleted by the changelog entry `version`."""
+    return [row_id] + [""] * (TOMBSTONE_COLUMN - 1) + [version]
+
+
+def is_tombstone(row):
+    """True for a row marked deleted (anything in its Deleted cell), when tombstones are on."""
+    return (
+        SYNC_TOMBSTONES
+        and row is not None
+        and len(row) > TOMBSTONE_COLUMN
+        and str(row[TOMBSTONE_COLUMN]).strip() != ""
     )
 
-    print(f"{result.get('updatedCells')} cells updated.")
+
+def canonical_cgpa(value):
+    if value is None or str(value).strip() == "":
+        return ""
+    try:
+        return f"{round(float(value), 2):.2f}"
+    except ValueError:
+        # Not a number, so it can't match the FLOAT column; compare as text
+        return str(value).strip(" ")
+
+
+def canonical_row(row):
+    """Canonical text of [id, company, job, cgpa, remarks], from the DB or the sheet."""
+    row = list(row) + [None] * 5
+    row_id, company, job, cgpa, remarks = row[:5]
+    text = ["" if value is None else str(value).strip(" ") for value in (company, job, remarks)]
+    return "|".join([str(int(row_id)), text[0], text[1], canonical_cgpa(cgpa), text[2]])
+
+
+def canonical_sheet_rows(values):
+    """{row id: canonical text} of the live data rows in sheet `values`, skipping tombstones."""
+    return {
+        int(str(row[0]).strip()): canonical_row(row)
+        for row in values
+        if row and str(row[0]).strip().isdigit() and not is_tombstone(row)
+    }
 
 
 def calculate_data_hash(data):
@@ -106,44 +775,492 @@ def calculate_data_hash(data):
     return hash_md5.hexdigest()
 
 
-def db_to_sheets_sync():
-    """Synchronize data from MySQL to Google Sheets."""
-    last_data_hash = ""  # Initialize with an empty hash
+def calculate_sheet_hash(values):
+    """Hash only the sheet's data rows (numeric ID in the first cell), ignoring header and blank rows."""
+    return calculate_data_hash(
+        [str(cell).strip() for cell in row]
+        for row in values
+        if row and str(row[0]).strip().isdigit()
+    )
+
+
+def raise_if_changelog_missing(error):
+    """Turn a missing changelog table into a hard failure instead of a retried poll that never syncs anything."""
+    from mysql.connector import errorcode
 
-    while not exit_flag:  # Exit if the flag is set to True
-        current_db_data = fetch_from_mysql()
-        new_data_hash = calculate_data_hash(current_db_data)
+    if error.errno == errorcode.ER_NO_SUCH_TABLE:
+        raise RuntimeError(
+            f"The internship_changes changelog is missing ({error}). Load superjoin.sql to create it and its triggers."
+        ) from error
 
-        if new_data_hash != last_data_hash:
-            # Only acquire the lock if a change is detected
-            if lock.acquire(blocking=False):
-                try:
-                    print("Lock acquired for DB to Sheets Sync.")
-                    print("Changes detected in DB. Syncing with Google Sheets...")
-                    update_google_sheet(current_db_data)
-                    last_data_hash = new_data_hash
-                finally:
-                    print("Lock released for DB to Sheets Sync.")
-                    lock.release()  # Release the lock after completion
-        # else:
-        # print("No changes detected in DB.")
 
-        # Small break between iterations to prevent aggressive CPU use
-        time.sleep(3)
+def check_changelog():
+    """Fail fast if the changelog table or any of its three triggers is missing.
+
+    DB to Sheets only sees changes through them, so without them it would
+    quietly sync nothing. A DB that can't be reached yet isn't an error here;
+    the polls retry it.
+    """
+    import mysql.connector
+
+    connection = None
+    try:
+        connection = connect_db()
+        cursor = connection.cursor()
+        cursor.execute("SELECT 1 FROM internship_changes LIMIT 1")
+        cursor.fetchall()
+        cursor.execute(
+            "SELECT DISTINCT EVENT_MANIPULATION FROM information_schema.TRIGGERS "
+            "WHERE EVENT_OBJECT_SCHEMA = DATABASE() AND EVENT_OBJECT_TABLE = 'internships' "
+            "AND ACTION_STATEMENT LIKE %s",
+            ("%internship_changes%",),
+        )
+        missing = {"INSERT", "UPDATE", "DELETE"} - {event for (event,) in cursor.fetchall()}
+        if missing:
+            raise RuntimeError(
+                f"internships has no changelog trigger for {', '.join(sorted(missing))}. "
+                "Load superjoin.sql to create the triggers."
+            )
+
+    except mysql.connector.Error as error:
+        raise_if_changelog_missing(error)
+        print(f"Failed to check the internship changelog {error}")
+
+    finally:
+        if connection and connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+def fetch_snapshot(min_seq=None):
+    """Return (changelog cursor, all rows) read in one transaction, or (None, None) on error.
+
+    Both come from the same snapshot. The cursor starts at the newest seq,
+    with gaps for the seqs just below it whose transactions hadn't committed
+    yet, so following it picks up exactly the changes the rows don't include.
+    """
+    import mysql.connector
+
+    connection = None
+    try:
+        connection = connect_db("read", min_seq)
+        cursor = connection.cursor()
+        with DB_QUERY_SECONDS.labels("fetch").time():
+            cursor.execute("SELECT COALESCE(MIN(seq), 1) - 1, COALESCE(MAX(seq), 0) FROM internship_changes")
+            # Seqs compaction already purged aren't gaps
+            purged_seq, newest_seq = cursor.fetchone()
+            window_start = max(newest_seq - CHANGELOG_SNAPSHOT_WINDOW, purged_seq)
+            cursor.execute(
+                "SELECT seq FROM internship_changes WHERE seq > %s ORDER BY seq", (window_start,)
+            )
+            recent_seqs = [seq for (seq,) in cursor.fetchall()]
+            cursor.execute(
+                "SELECT id, company_name, job_title, cgpa_cutoff, remarks FROM internships"
+            )
+            records = cursor.fetchall()
+        changelog = ChangelogCursor(window_start, gap_timeout=SYNC_CHANGELOG_GAP_SECONDS)
+        changelog.advance(recent_seqs)
+        return changelog, records
+
+    except mysql.connector.Error as error:
+        raise_if_changelog_missing(error)
+        print(f"Failed to read data from MySQL table {error}")
+        return None, None
+
+    finally:
+        if connection and connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+def fetch_db_changes(changelog, limit):
+    """Read up to `limit` changelog entries the cursor hasn't seen and the current state of their rows.
+
+    Returns (seqs read, {row_id: row or None if deleted}, entries read, unix
+    time of the oldest entry), or None on error. The cursor isn't moved; pass
+    the seqs to changelog.advance() once the rows are safely queued.
+    """
+    import mysql.connector
+
+    connection = None
+    try:
+        connection = connect_db("read", changelog.position)
+        cursor = connection.cursor()
+        where, params = changelog.where()
+        with DB_QUERY_SECONDS.labels("changelog").time():
+            cursor.execute(
+                "SELECT seq, row_id, UNIX_TIMESTAMP(changed_at) FROM internship_changes "
+                f"WHERE {where} ORDER BY seq LIMIT %s",
+                params + [limit],
+            )
+            entries = cursor.fetchall()
+        if not entries:
+            return [], {}, 0, None
+
+        # Many entries for one row collapse to a single read of its current values
+        rows = {row_id: None for _, row_id, _ in entries}
+        last_seq = {row_id: seq for seq, row_id, _ in entries}
+        ids = list(rows)
+        with DB_QUERY_SECONDS.labels("fetch_changed").time():
+            for start in range(0, len(ids), 1000):
+                chunk = ids[start:start + 1000]
+                cursor.execute(
+                    "SELECT id, company_name, job_title, cgpa_cutoff, remarks FROM internships "
+                    f"WHERE id IN ({', '.join(['%s'] * len(chunk))})",
+                    chunk,
+                )
+                for row in cursor.fetchall():
+                    rows[row[0]] = row
+        if SYNC_TOMBSTONES:
+            # The delete's seq versions the tombstone, so compaction can tell its age
+            for row_id, row in rows.items():
+                if row is None:
+                    rows[row_id] = tombstone_row(row_id, last_seq[row_id])
+        return [seq for seq, _, _ in entries], rows, len(entries), min(float(entry[2]) for entry in entries)
+
+    except mysql.connector.Error as error:
+        raise_if_changelog_missing(error)
+        print(f"Failed to read changed rows from MySQL {error}")
+        return None
+
+    finally:
+        if connection and connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+def load_changelog_cursor(outbound_queue):
+    """The changelog position the queue has been filled up to, or None before the first snapshot."""
+    position = outbound_queue.get_meta("changelog_seq")
+    if position is None:
+        return None
+    return ChangelogCursor(
+        position, outbound_queue.get_meta("changelog_gaps"), gap_timeout=SYNC_CHANGELOG_GAP_SECONDS
+    )
+
+
+def push_full_snapshot(outbound_queue):
+    """Rewrite the whole sheet if the DB differs from the last push, and start following the changelog.
+
+    Used when the queue has no changelog position yet (first run, or a new
+    queue file), where there is nothing to replay and only a snapshot will do.
+    Returns the rows pushed, or None if the DB couldn't be read.
+    """
+    changelog, data = fetch_snapshot()
+    if changelog is None:
+        return None
+    data_hash = calculate_data_hash(data)
+    pushed = 0
+    if data_hash != load_sync_state().get("db_hash", ""):
+        print("Changes detected in DB. Syncing with Google Sheets...")
+        update_google_sheet(data)
+        save_sync_state(db_hash=data_hash)
+        pushed = len(data)
+    # A snapshot is as good as a reconcile, so the next one is a full interval away
+    outbound_queue.enqueue(
+        {}, changelog_seq=changelog.position, changelog_gaps=changelog.gaps, reconciled_at=time.time()
+    )
+    return pushed
+
+
+def reconcile_sheet(outbound_queue, changelog):
+    """Queue a write for every row where the sheet and the DB disagree; returns how many, or None if skipped.
+
+    The backstop for changes the changelog never delivered: a gap given up
+    on too early, or a write made with the triggers disabled. Rows are
+    compared by canonical text (see canonical_row()). Rows still pending in
+    the queue are left alone, and so are rows edited on the sheet since
+    Sheets to DB last applied it, as those are meant to differ for now.
+    """
+    applied = load_sheet_baseline(load_sync_state().get("sheet_hash", ""))
+    if not applied:
+        # Without the applied rows a sheet edit can't be told from drift
+        print("No applied sheet state saved yet. Reconcile postponed.")
+        return None
+    values = combine_shards(read_shards())
+    snapshot, records = fetch_snapshot(changelog.position)
+    if snapshot is None:
+        return None
+
+    applied_rows = canonical_sheet_rows(applied)
+    sheet_rows = canonical_sheet_rows(values)
+    db_rows = {row[0]: row for row in records}
+    skipped = {entry[0] for entry in outbound_queue.pending()}
+    skipped.update(
+        row_id for row_id in applied_rows.keys() | sheet_rows.keys()
+        if applied_rows.get(row_id) != sheet_rows.get(row_id)
+    )
+
+    repairs = {}
+    for row_id, row in db_rows.items():
+        if row_id not in skipped and sheet_rows.get(row_id) != canonical_row(row):
+            repairs[row_id] = row
+    for row_id in sheet_rows.keys() - db_rows.keys() - skipped:
+        # The newest seq in the snapshot is at least as new as the delete
+        repairs[row_id] = tombstone_row(row_id, snapshot.position) if SYNC_TOMBSTONES else None
+    outbound_queue.enqueue(repairs, reconciled_at=time.time())
+    if repairs:
+        print(f"Reconcile found {len(repairs)} rows that differ from the DB. Queued them for rewrite.")
+        SYNC_RECONCILE_REPAIRS.inc(len(repairs))
+    return len(repairs)
+
+
+def flush_outbound_queue(outbound_queue):
+    """Write every pending row to the sheet in place; returns the entries flushed.
+
+    Each shard's row index says where its rows sit (its id column is read
+    again if the index is stale). Changed rows are overwritten where they are,
+    new rows are appended below the last one of their shard and deleted rows
+    are blanked. Adjacent rows are merged into one range, and the ranges of
+    every shard are written as partitions (see write_partitions()); each
+    partition's entries leave the queue as soon as it is written.
+    """
+    entries = outbound_queue.pending()
+    if not entries:
+        return []
+
+    shards = get_shard_map()
+    by_shard = {}
+    for entry in entries:
+        by_shard.setdefault(shards.number_of(entry[0]), []).append(entry)
+
+    stale = [
+        shard for shard in map(shards.get, sorted(by_shard))
+        if shard is not None and shard.row_index.age() > SYNC_ROW_INDEX_MAX_AGE_SECONDS
+    ]
+    if stale:
+        generations = {shard.number: shard.row_index.generation for shard in stale}
+        for shard, values in read_shards(stale, f"A{FIRST_DATA_ROW}:A"):
+            shard.row_index.rebuild(values, generations[shard.number])
+
+    crowded, blank_rows = [], 0
+    for number, shard_entries in by_shard.items():
+        shard = shards.get(number)
+        if shard is None:
+            continue
+        index = shard.row_index
+        deletes = sum(1 for row_id, values, _, _ in shard_entries if values is None and index.row_of(row_id))
+        if index.gaps + deletes > SYNC_QUEUE_MAX_GAPS:
+            crowded.append(number)
+            blank_rows += index.gaps + deletes
+    if crowded:
+        # A full rewrite reads the DB after every pending change was made, so
+        # it covers all of them
+        data = fetch_from_mysql(min_seq=outbound_queue.get_meta("changelog_seq"))
+        if data:
+            print(f"{blank_rows} blank rows on the sheet. Rewriting it to close the gaps...")
+            update_google_sheet(data, None if len(shards.all()) == 1 else crowded)
+            for number in crowded:
+                outbound_queue.acknowledge(by_shard.pop(number))
+            if not by_shard:
+                return entries
+
+    jobs, entry_of_row, unwritten, written_shards, range_count = [], {}, [], [], 0
+    writing = []  # Indexes changed ahead of the write, see SheetRowIndex.begin_write()
+    try:
+        for number, shard_entries in sorted(by_shard.items()):
+            shard = shards.get(number)
+            if shard is None:
+                if all(values is None or is_tombstone(values) for _, values, _, _ in shard_entries):
+                    # No row of this shard ever reached the sheet
+                    unwritten += shard_entries
+                    continue
+                shard = ensure_shard(number)
+            index = shard.row_index
+            index.begin_write()
+            writing.append(index)
+            writes = []
+            for entry in shard_entries:
+                row_id, values, _, _ = entry
+                if values is None:
+                    row_number = index.remove(row_id)
+                    if row_number is None:
+                        # Never reached the sheet, so there is nothing to blank
+                        unwritten.append(entry)
+                        continue
+                    cells = [""] * 5
+                elif is_tombstone(values) and index.row_of(row_id) is None:
+                    # Nor is there anything to mark deleted
+                    unwritten.append(entry)
+                    continue
+                else:
+                    # A tombstone stays on its row, so it leaves no gap behind
+                    row_number = index.place(row_id)
+                    cells = sheet_cells(values)
+                writes.append((row_number, cells))
+                entry_of_row[number, row_number] = entry
+
+            ranges = []
+            for row_number, cells in sorted(writes, key=lambda write: write[0]):
+                if ranges and ranges[-1][0] + len(ranges[-1][1]) == row_number:
+                    ranges[-1][1].append(cells)
+                else:
+                    ranges.append((row_number, [cells]))
+            if ranges:
+                written_shards.append(shard)
+                range_count += len(ranges)
+                partitions = partition_ranges(ranges, SYNC_WRITE_PARTITION_ROWS, SYNC_WRITE_PARTITION_BYTES)
+                jobs += [(shard, partition) for partition in partitions]
+        outbound_queue.acknowledge(unwritten)
+
+        # If a partition fails, its rows may or may not be on the sheet; the next
+        # flush must look them up again rather than trust the index
+        def acknowledge_partition(shard, partition):
+            outbound_queue.acknowledge([
+                entry_of_row[shard.number, first + offset]
+                for first, rows in partition
+                for offset in range(len(rows))
+            ])
+
+        if jobs:
+            try:
+                updated_cells = write_partitions(jobs, acknowledge_partition)
+            except Exception:
+                for shard in written_shards:
+                    shard.row_index.built_at = None
+                raise
+            shards_note = f" across {len(written_shards)} shards" if len(written_shards) > 1 else ""
+            print(f"{updated_cells} cells updated in {range_count} ranges, {len(jobs)} partitions{shards_note}.")
+            tracer.set_attribute("cells", updated_cells)
+            SYNC_CELLS_CHANGED.labels("db_to_sheets").inc(updated_cells)
+    finally:
+        for index in writing:
+            index.end_write()
+
+    upserts = sum(1 for _, values, _, _ in entries if values is not None and not is_tombstone(values))
+    SYNC_ROWS_CHANGED.labels("db_to_sheets", "upsert").inc(upserts)
+    SYNC_ROWS_CHANGED.labels("db_to_sheets", "delete").inc(len(entries) - upserts)
+    return entries
+
+
+def db_to_sheets_sync(once=False):
+    """Synchronize data from MySQL to Google Sheets (a single cycle if `once`).
+
+    Each cycle moves new changelog entries into the outbound queue, then
+    flushes the queue if it holds anything. Entries only leave the queue once
+    the sheet has accepted them. Every SYNC_RECONCILE_INTERVAL_SECONDS the
+    whole sheet is also compared with the DB (see reconcile_sheet()).
+    """
+    from googleapiclient.errors import HttpError
+    from httplib2 import HttpLib2Error
+
+    check_changelog()
+    outbound_queue = OutboundQueue(SYNC_QUEUE_FILE)
+    change_detected_at = None  # When the rows waiting in the queue were first seen
+
+    while not shutdown_event.is_set():
+        profiler.checkpoint()
+        cycle_start = time.perf_counter()
+        succeeded = True  # Whether the cycle got through without an error
+        with tracer.trace("db_to_sheets.cycle", changed=False) as cycle:
+            changelog = load_changelog_cursor(outbound_queue)
+            snapshot_needed = changelog is None
+            if not snapshot_needed:
+                with tracer.span("fetch") as span:
+                    changes = fetch_db_changes(changelog, SYNC_CHANGELOG_BATCH)
+                    span.set_attribute("changes", changes[2] if changes else 0)
+                if changes is None:
+                    succeeded = False
+                else:
+                    seqs, rows, entries_read, oldest_change = changes
+                    changelog.advance(seqs)
+                    given_up = changelog.expire()
+                    if given_up:
+                        # Most are rolled back transactions; anything real is
+                        # repaired by the next reconcile
+                        print(f"Stopped waiting for {given_up} missing changelog entries.")
+                        SYNC_CHANGELOG_GAPS_EXPIRED.inc(given_up)
+                    SYNC_CHANGELOG_GAPS.set(len(changelog.gaps))
+                    if seqs or given_up:
+                        coalesced = outbound_queue.enqueue(
+                            rows, changed_at=oldest_change,
+                            changelog_seq=changelog.position, changelog_gaps=changelog.gaps,
+                        )
+                        # Changelog entries that won't cost a write of their own
+                        SYNC_QUEUE_COALESCED.inc(entries_read - len(rows) + coalesced)
+
+                    reconcile_due = SYNC_RECONCILE_INTERVAL_SECONDS and (
+                        time.time() - outbound_queue.get_meta("reconciled_at", 0) >= SYNC_RECONCILE_INTERVAL_SECONDS
+                    )
+                    # Holding the lock keeps Sheets to DB from applying edits mid-compare
+                    if reconcile_due and lock.acquire(blocking=False):
+                        try:
+                            with tracer.span("reconcile") as span:
+                                span.set_attribute("repaired", reconcile_sheet(outbound_queue, changelog) or 0)
+                        except (HttpError, HttpLib2Error, OSError) as error:
+                            print(f"Failed to reconcile the sheet with the DB {error}")
+                            cycle.set_attribute("error", str(error))
+                            succeeded = False
+                        finally:
+                            lock.release()
+            pending = len(outbound_queue)
+            SYNC_QUEUE_DEPTH.set(pending)
+
+            if snapshot_needed or pending:
+                cycle.set_attribute("changed", True)
+                if change_detected_at is None:
+                    change_detected_at = time.perf_counter()
+                # Only acquire the lock if a change is detected
+                if lock.acquire(blocking=False):
+                    try:
+                        LOCK_WAIT_SECONDS.labels("db_to_sheets").observe(
+                            time.perf_counter() - change_detected_at
+                        )
+                        print("Lock acquired for DB to Sheets Sync.")
+                        with tracer.span("write", rows=pending) as span:
+                            if snapshot_needed:
+                                succeeded = push_full_snapshot(outbound_queue) is not None
+                            else:
+                                print(f"{pending} changed rows queued. Syncing with Google Sheets...")
+                                flushed = flush_outbound_queue(outbound_queue)
+                                span.set_attribute("rows", len(flushed))
+                                if flushed:
+                                    REPLICATION_LAG_SECONDS.labels("db_to_sheets").set(
+                                        time.time() - min(entry[3] for entry in flushed)
+                                    )
+                        SYNC_QUEUE_DEPTH.set(len(outbound_queue))
+                        change_detected_at = None
+                    except (HttpError, HttpLib2Error, OSError) as error:
+                        # The rows stay queued and the next cycle tries again
+                        print(f"Failed to write queued changes to Google Sheets {error}")
+                        SYNC_QUEUE_FLUSH_FAILURES.inc()
+                        cycle.set_attribute("error", str(error))
+                        succeeded = False
+                    except QuotaWaitCancelled:
+                        # Shutting down; whatever wasn't written stays queued for the next run
+                        print("Shutdown requested while waiting for the write quota. Unwritten rows stay queued.")
+                        succeeded = False
+                    finally:
+                        print("Lock released for DB to Sheets Sync.")
+                        lock.release()  # Release the lock after completion
+                else:
+                    LOCK_SKIPS.labels("db_to_sheets").inc()
+                    cycle.set_attribute("lock_skipped", True)
+
+        SYNC_CYCLE_SECONDS.labels("db_to_sheets").observe(time.perf_counter() - cycle_start)
+        if succeeded:
+            SYNC_LAST_SUCCESS.labels("db_to_sheets").set_to_current_time()
+
+        if once:
+            break
+        # Wait for the next poll; returns immediately on shutdown
+        shutdown_event.wait(SYNC_POLL_SECONDS)
+    outbound_queue.close()
 
 
 # ===================== Sheets to DB Sync ===================== #
+def combine_shards(shard_values):
+    """Join (shard, values) pairs into one sheet: the first shard's title and header, then every shard's rows."""
+    if len(shard_values) == 1:
+        return shard_values[0][1]
+    values = list(shard_values[0][1][:FIRST_DATA_ROW - 1])
+    for _, shard_rows in shard_values:
+        values += shard_rows[FIRST_DATA_ROW - 1:]
+    return values
+
+
 def read_sheet_data():
-    spreadsheet_id = read_spreadsheet_id()
-    creds = google_sheets_auth()
-    service = build("sheets", "v4", credentials=creds)
-
-    range_name = "Sheet1!A1:Z1000"
-    sheet = service.spreadsheets()
-    result = (
-        sheet.values().get(spreadsheetId=spreadsheet_id, range=range_name).execute()
-    )
-    values = result.get("values", [])
+    values = combine_shards(read_shards())
     if not values:
         print("No data found.")
         return []
@@ -152,12 +1269,13 @@ def read_sheet_data():
 
 
 def insert_into_mysql(data):
+    """Upsert the sheet rows in `data` (header first) in one transaction; returns whether it committed."""
+    import mysql.connector
+
     connection = None
     total_inserted = 0
     try:
-        connection = mysql.connector.connect(
-            host="localhost", database="superzz", user="superjoin", password="super"
-        )
+        connection = connect_db()
         cursor = connection.cursor()
 
         for row in data[1:]:
@@ -167,6 +1285,7 @@ def insert_into_mysql(data):
             while len(row) < 5:
                 row.append(None)
 
+            row = row[:5]
             sql_insert_query = """
             INSERT INTO internships (id, company_name, job_title, cgpa_cutoff, remarks)
             VALUES (%s, %s, %s, %s, %s)
@@ -176,16 +1295,20 @@ def insert_into_mysql(data):
             cgpa_cutoff = VALUES(cgpa_cutoff),
             remarks = VALUES(remarks)
             """
-            cursor.execute(sql_insert_query, row)
+            with DB_QUERY_SECONDS.labels("upsert").time():
+                cursor.execute(sql_insert_query, row)
             total_inserted += 1
 
         connection.commit()
         print(
             f"{total_inserted} records inserted/updated successfully into the database."
         )
+        SYNC_ROWS_CHANGED.labels("sheets_to_db", "upsert").inc(total_inserted)
+        return True
 
     except mysql.connector.Error as error:
         print(f"Failed to insert record into MySQL table {error}")
+        return False
 
     finally:
         if connection and connection.is_connected():
@@ -194,21 +1317,26 @@ def insert_into_mysql(data):
 
 
 def delete_from_mysql(ids_to_delete):
+    """Delete rows by id in one transaction; returns whether it committed."""
+    import mysql.connector
+
     connection = None
     try:
-        connection = mysql.connector.connect(
-            host="localhost", database="superzz", user="superjoin", password="super"
-        )
+        connection = connect_db()
         cursor = connection.cursor()
 
         sql_delete_query = "DELETE FROM internships WHERE id = %s"
-        cursor.executemany(sql_delete_query, [(id,) for id in ids_to_delete])
+        with DB_QUERY_SECONDS.labels("delete").time():
+            cursor.executemany(sql_delete_query, [(id,) for id in ids_to_delete])
 
         connection.commit()
         print(f"{len(ids_to_delete)} records deleted from the database.")
+        SYNC_ROWS_CHANGED.labels("sheets_to_db", "delete").inc(len(ids_to_delete))
+        return True
 
     except mysql.connector.Error as error:
         print(f"Failed to delete records from MySQL table {error}")
+        return False
 
     finally:
         if connection and connection.is_connected():
@@ -220,20 +1348,56 @@ def detect_changes(old_data, new_data):
     """Compares old data with new data to detect rows that need to be inserted, updated, or deleted."""
     old_data_clean = clean_data(old_data)
     new_data_clean = clean_data(new_data)
+    if SYNC_TOMBSTONES:
+        return detect_changes_with_tombstones(old_data_clean, new_data_clean)
 
     old_ids = {row[0] for row in old_data_clean[1:]}
     new_ids = {row[0] for row in new_data_clean[1:]}
+    # A set, so each lookup is O(1) rather than a scan of the whole old sheet
+    old_rows = {tuple(row) for row in old_data_clean}
 
     rows_to_insert_or_update = [
         row
         for row in new_data_clean[1:]
-        if row[0] not in old_ids or row not in old_data_clean
+        if row[0] not in old_ids or tuple(row) not in old_rows
     ]
     ids_to_delete = old_ids - new_ids
 
     return rows_to_insert_or_update, ids_to_delete
 
 
+def detect_changes_with_tombstones(old_data_clean, new_data_clean):
+    """detect_changes() for sheets that mark deletes in the Deleted column.
+
+    A delete is a changed row that became a tombstone, so it comes out of
+    the same pass as the upserts, with no comparison of the id sets. Only if
+    the sheet has fewer ids than before (rows removed outright, or
+    tombstones purged) are the id sets compared to find them.
+    """
+    width = TOMBSTONE_COLUMN + 1
+    old_rows = [row[:width] + [""] * (width - len(row)) for row in old_data_clean[1:]]
+    new_rows = [row[:width] + [""] * (width - len(row)) for row in new_data_clean[1:]]
+    # Both sides padded to the same width, so adding the column changes nothing
+    old_row_set = {tuple(row) for row in old_rows}
+    old_tombstones = {row[0] for row in old_rows if is_tombstone(row)}
+
+    rows_to_insert_or_update, ids_to_delete = [], set()
+    for row in new_rows:
+        if tuple(row) in old_row_set:
+            continue
+        if not is_tombstone(row):
+            rows_to_insert_or_update.append(row)
+        elif row[0] not in old_tombstones:
+            ids_to_delete.add(row[0])
+
+    if sum(1 for row in new_rows if row[0]) < sum(1 for row in old_rows if row[0]):
+        new_ids = {row[0] for row in new_rows}
+        ids_to_delete |= {row[0] for row in old_rows if row[0] not in new_ids} - old_tombstones
+    ids_to_delete.discard("")
+
+    return rows_to_insert_or_update, ids_to_delete
+
+
 def clean_data(data):
     """Cleans the data by stripping all strings and removing empty rows. Ensures rows have the same number of columns."""
     if not data:
@@ -250,82 +1414,362 @@ def clean_data(data):
     return cleaned_data
 
 
-def sheets_to_db_sync():
-    """Synchronize data from Google Sheets to MySQL."""
-    last_data_hash = ""  # Initialize with an empty hash
-    last_data = []  # Store the last data
-
-    while not exit_flag:  # Exit if the flag is set to True
-        new_data = read_sheet_data()
-        new_data_hash = calculate_data_hash(new_data)
+def share_row_index(row_index, saved_generation):
+    """Save the row index for extra/CRUD.py if it changed, else just mark it as current."""
+    if row_index.generation != saved_generation or not os.path.exists(SYNC_ROW_INDEX_FILE):
+        row_index.save(SYNC_ROW_INDEX_FILE)
+    else:
+        SheetRowIndex.touch(SYNC_ROW_INDEX_FILE)
+    return row_index.generation
+
+
+def sheets_to_db_sync(once=False):
+    """Synchronize data from Google Sheets to MySQL (a single cycle if `once`).
+
+    A detected change is held until the sheet stops changing (see
+    SYNC_QUIESCENCE_SECONDS), then the diff from the last applied state to
+    the settled one is applied in one pass. A one-shot run applies at once.
+    """
+    from googleapiclient.errors import HttpError
+    from httplib2 import HttpLib2Error
+
+    last_data_hash = load_sync_state().get("sheet_hash", "")
+    last_data = load_sheet_baseline(last_data_hash)  # The sheet as last applied to the DB
+    change_detected_at = None  # When the change waiting to be applied was first seen
+    settling_hash = None  # Newest unapplied sheet state, while waiting for edits to stop
+    settling_since = None  # When that state was first seen
+    states_seen = 0  # Distinct unapplied states seen since the change was detected
+    saved_index_generation = None  # Row index generation last saved for other processes
+
+    while not shutdown_event.is_set():
+        profiler.checkpoint()
+        cycle_start = time.perf_counter()
+        wait_seconds = SYNC_POLL_SECONDS
+        succeeded = True  # Whether the cycle got through without an error
+        with tracer.trace("sheets_to_db.cycle", changed=False) as cycle:
+            try:
+                with tracer.span("fetch") as span:
+                    shards = get_shard_map().all()
+                    index_generations = [shard.row_index.generation for shard in shards]
+                    shard_values = read_shards(shards)
+                    new_data = combine_shards(shard_values)
+                    span.set_attribute("rows", len(new_data))
+            except (HttpError, HttpLib2Error, OSError) as error:
+                # A 429, a 5xx or a network error; the next cycle reads the sheet again
+                print(f"Failed to read the sheet {error}")
+                cycle.set_attribute("error", str(error))
+                succeeded = False
+                new_data = None
+            if new_data is not None:
+                for (shard, values), generation in zip(shard_values, index_generations):
+                    rebuilt = bool(values) and shard.row_index.rebuild(values[FIRST_DATA_ROW - 1:], generation)
+                    # extra/CRUD.py only edits the first shard (Sheet1)
+                    if rebuilt and shard.number == 0:
+                        saved_index_generation = share_row_index(shard.row_index, saved_index_generation)
+                with tracer.span("hash"):
+                    new_data_hash = calculate_sheet_hash(new_data)
+
+                if not last_data and new_data_hash == last_data_hash:
+                    # The sheet matches the persisted fingerprint, so adopt it as the
+                    # diff baseline instead of re-upserting every row
+                    last_data = new_data
+                    save_sheet_baseline(new_data_hash, new_data)
+
+                settled = True
+                if new_data_hash == last_data_hash and states_seen:
+                    # The edits were undone before they settled; nothing to apply
+                    SYNC_STATES_COLLAPSED.inc(states_seen)
+                    print(f"Sheet returned to its last synced state. {states_seen} unapplied states dropped.")
+                    change_detected_at, settling_hash, settling_since, states_seen = None, None, None, 0
+                elif new_data_hash != last_data_hash and not once:
+                    now = time.perf_counter()
+                    if new_data_hash != settling_hash:
+                        settling_hash, settling_since = new_data_hash, now
+                        states_seen += 1
+                    still_editing = now - settling_since < SYNC_QUIESCENCE_SECONDS
+                    waited_too_long = now - (change_detected_at or now) >= SYNC_DEBOUNCE_MAX_SECONDS
+                    if still_editing and not waited_too_long:
+                        settled = False
+                        cycle.set_attribute("settling", True)
+                        # Check again as soon as the quiet window could be over
+                        wait_seconds = min(SYNC_POLL_SECONDS, SYNC_QUIESCENCE_SECONDS)
+
+                if new_data_hash != last_data_hash:
+                    cycle.set_attribute("changed", True)
+                    if change_detected_at is None:
+                        change_detected_at = time.perf_counter()
+                if new_data_hash != last_data_hash and settled:
+                    # Only acquire the lock if a change is detected
+                    if lock.acquire(blocking=False):
+                        try:
+                            LOCK_WAIT_SECONDS.labels("sheets_to_db").observe(
+                                time.perf_counter() - change_detected_at
+                            )
+                            print("Lock acquired for Sheets to DB Sync.")
+                            print("Data has changed in Sheets. Processing updates...")
+                            if states_seen > 1:
+                                SYNC_STATES_COLLAPSED.inc(states_seen - 1)
+                                print(f"Waited for edits to settle: {states_seen - 1} intermediate states collapsed.")
+                            SYNC_SETTLE_SECONDS.observe(time.perf_counter() - change_detected_at)
+                            cycle.set_attribute("states_collapsed", max(states_seen - 1, 0))
+
+                            with tracer.span("diff") as span:
+                                rows_to_insert_or_update, ids_to_delete = detect_changes(
+                                    last_data, new_data
+                                )
+                                span.set_attribute("upserts", len(rows_to_insert_or_update))
+                                span.set_attribute("deletes", len(ids_to_delete))
+
+                            with tracer.span("write"):
+                                if rows_to_insert_or_update:
+                                    print("Inserting/Updating rows in DB...")
+                                    with tracer.span("db.upsert", rows=len(rows_to_insert_or_update)):
+                                        succeeded = insert_into_mysql(
+                                            [
+                                                [
+                                                    "ID",
+                                                    "Company Name",
+                                                    "Job Title",
+                                                    "CGPA Cut-off",
+                                                    "Remarks",
+                                                ]
+                                            ]
+                                            + rows_to_insert_or_update
+                                        )
+
+                                if ids_to_delete:
+                                    print("Deleting rows in DB...")
+                                    with tracer.span("db.delete", rows=len(ids_to_delete)):
+                                        succeeded = delete_from_mysql(ids_to_delete) and succeeded
+
+                            if succeeded:
+                                last_data = new_data
+                                last_data_hash = new_data_hash
+                                save_sheet_baseline(new_data_hash, new_data)
+                                save_sync_state(sheet_hash=new_data_hash)
+                                # The Sheets API exposes no edit timestamps here, so lag is
+                                # measured from the poll that first saw the change
+                                REPLICATION_LAG_SECONDS.labels("sheets_to_db").set(
+                                    time.perf_counter() - change_detected_at
+                                )
+                                change_detected_at, settling_hash, settling_since, states_seen = None, None, None, 0
+                            else:
+                                # Keep the old baseline so the next cycle diffs and applies this again
+                                cycle.set_attribute("error", "apply failed")
+                                print("Sheet changes were not fully applied. Retrying next cycle...")
+                        finally:
+                            print("Lock released for Sheets to DB Sync.")
+                            lock.release()  # Release the lock after completion
+                    else:
+                        LOCK_SKIPS.labels("sheets_to_db").inc()
+                        cycle.set_attribute("lock_skipped", True)
+                # else:
+                # print("No changes detected in Sheets.")
+
+        SYNC_CYCLE_SECONDS.labels("sheets_to_db").observe(time.perf_counter() - cycle_start)
+        if succeeded:
+            SYNC_LAST_SUCCESS.labels("sheets_to_db").set_to_current_time()
+
+        if once:
+            break
+        # Wait for the next poll; returns immediately on shutdown
+        shutdown_event.wait(wait_seconds)
+
+
+# ===================== Tombstone Compaction ===================== #
+def purge_sheet_tombstones(cutoff_seq):
+    """Blank the sheet's tombstones for deletes at or before changelog entry `cutoff_seq`; returns how many."""
+    shard_values = read_shards(cells=f"A{FIRST_DATA_ROW}:F")
+    # Tombstones leave the index before their rows are blanked
+    for shard, _ in shard_values:
+        shard.row_index.begin_write()
+    try:
+        jobs, purged = plan_tombstone_purge(shard_values, cutoff_seq)
+        if jobs:
+            try:
+                write_partitions(jobs)
+            except Exception:
+                for shard, _ in jobs:
+                    shard.row_index.built_at = None
+                raise
+    finally:
+        for shard, _ in shard_values:
+            shard.row_index.end_write()
+    return purged
+
+
+def plan_tombstone_purge(shard_values, cutoff_seq):
+    """The (shard, partition) jobs blanking the old enough tombstones in `shard_values`, and how many rows they blank."""
+    jobs, purged = [], 0
+    for shard, values in shard_values:
+        ranges = []
+        for offset, row in enumerate(values):
+            version = str(row[TOMBSTONE_COLUMN]).strip() if is_tombstone(row) else ""
+            # A mark typed into the sheet is replaced by the delete's seq once it
+            # reaches the DB; until then it isn't old enough to purge
+            if not version.isdigit() or int(version) > cutoff_seq:
+                continue
+            row_number = FIRST_DATA_ROW + offset
+            row_id = SheetRowIndex.id_of(row)
+            if row_id is not None:
+                shard.row_index.remove(row_id)
+            if ranges and ranges[-1][0] + len(ranges[-1][1]) == row_number:
+                ranges[-1][1].append([""] * (TOMBSTONE_COLUMN + 1))
+            else:
+                ranges.append((row_number, [[""] * (TOMBSTONE_COLUMN + 1)]))
+        partitions = partition_ranges(ranges, SYNC_WRITE_PARTITION_ROWS, SYNC_WRITE_PARTITION_BYTES)
+        jobs += [(shard, partition) for partition in partitions]
+        purged += sum(len(rows) for _, rows in ranges)
+    return jobs, purged
+
+
+def compact_tombstones():
+    """Physically purge deletes older than SYNC_TOMBSTONE_RETENTION_SECONDS from the sheet and the changelog.
+
+    Only changelog entries the outbound queue has already consumed are
+    purged. The sheet goes first: its tombstones are aged by the changelog
+    entries, so they can't be purged once those are gone.
+    """
+    import mysql.connector
+
+    outbound_queue = OutboundQueue(SYNC_QUEUE_FILE)
+    try:
+        changelog = load_changelog_cursor(outbound_queue)
+    finally:
+        outbound_queue.close()
+    # Entries still missing below the position may yet commit, so they stay
+    consumed_seq = changelog.floor() if changelog else None
+    if not consumed_seq:
+        return
 
-        if new_data_hash != last_data_hash:
-            # Only acquire the lock if a change is detected
-            if lock.acquire(blocking=False):
-                try:
-                    print("Lock acquired for Sheets to DB Sync.")
-                    print("Data has changed in Sheets. Processing updates...")
+    connection = None
+    try:
+        connection = connect_db()
+        cursor = connection.cursor()
+        cursor.execute(
+            "SELECT COALESCE(MIN(seq), 0), COALESCE(MAX(seq), 0) FROM internship_changes "
+            "WHERE changed_at < NOW(6) - INTERVAL %s SECOND",
+            (SYNC_TOMBSTONE_RETENTION_SECONDS,),
+        )
+        first_seq, cutoff_seq = cursor.fetchone()
+        cutoff_seq = min(cutoff_seq, consumed_seq)
+        if not cutoff_seq:
+            return
+
+        with lock:
+            purged = purge_sheet_tombstones(cutoff_seq)
+        SYNC_TOMBSTONES_PURGED.labels("sheet").inc(purged)
+
+        # Small batches by seq range keep each delete short on a busy table
+        deleted = 0
+        with DB_QUERY_SECONDS.labels("compact").time():
+            for start in range(first_seq - 1, cutoff_seq, SYNC_CHANGELOG_BATCH):
+                cursor.execute(
+                    "DELETE FROM internship_changes WHERE seq > %s AND seq <= %s",
+                    (start, min(start + SYNC_CHANGELOG_BATCH, cutoff_seq)),
+                )
+                deleted += cursor.rowcount
+                connection.commit()
+        SYNC_TOMBSTONES_PURGED.labels("changelog").inc(deleted)
+        print(f"Compaction purged {purged} sheet tombstones and {deleted} changelog entries up to seq {cutoff_seq}.")
 
-                    rows_to_insert_or_update, ids_to_delete = detect_changes(
-                        last_data, new_data
-                    )
+    except mysql.connector.Error as error:
+        print(f"Failed to purge old changelog entries {error}")
 
-                    if rows_to_insert_or_update:
-                        print("Inserting/Updating rows in DB...")
-                        insert_into_mysql(
-                            [
-                                [
-                                    "ID",
-                                    "Company Name",
-                                    "Job Title",
-                                    "CGPA Cut-off",
-                                    "Remarks",
-                                ]
-                            ]
-                            + rows_to_insert_or_update
-                        )
+    finally:
+        if connection and connection.is_connected():
+            cursor.close()
+            connection.close()
 
-                    if ids_to_delete:
-                        print("Deleting rows in DB...")
-                        delete_from_mysql(ids_to_delete)
 
-                    last_data = new_data
-                    last_data_hash = new_data_hash
-                finally:
-                    print("Lock released for Sheets to DB Sync.")
-                    lock.release()  # Release the lock after completion
-        # else:
-        # print("No changes detected in Sheets.")
+def compaction_loop(once=False):
+    """Run compact_tombstones() every SYNC_COMPACTION_INTERVAL_SECONDS (once if `once`)."""
+    from googleapiclient.errors import HttpError
+    from httplib2 import HttpLib2Error
 
-        # Small break between iterations to prevent aggressive CPU use
-        time.sleep(3)
+    while not shutdown_event.is_set():
+        try:
+            compact_tombstones()
+        except (HttpError, HttpLib2Error, OSError, QuotaWaitCancelled) as error:
+            # Nothing was purged from the changelog; the next run tries again
+            print(f"Failed to purge tombstones from Google Sheets {error}")
+        if once:
+            break
+        shutdown_event.wait(SYNC_COMPACTION_INTERVAL_SECONDS)
 
 
 # ===================== Main Code ===================== #
-def keypress_exit_monitor():
-    """Monitor for keypress 'e' to exit the program."""
-    global exit_flag
-    while not exit_flag:
-        if msvcrt.kbhit():
-            key = msvcrt.getch()
-            if key.lower() == b"e":  # Exit on 'e'
-                print("Exit key pressed. Exiting...")
-                exit_flag = True
-                break
+def request_shutdown(signum, frame):
+    """Signal handler: finish the current cycles and stop; a second signal exits at once."""
+    if shutdown_event.is_set():
+        print("Second signal received. Exiting immediately.")
+        os._exit(1)
+    print(f"Received {signal.Signals(signum).name}. Finishing current cycles and shutting down...")
+    shutdown_event.set()
+
+
+def run_sync_loop(target):
+    """Run one sync direction; if it dies, stop the whole process so a supervisor can restart it."""
+    try:
+        target()
+    except Exception:
+        traceback.print_exc()
+        sync_failed.set()
+    finally:
+        shutdown_event.set()
 
 
 if __name__ == "__main__":
-    # Start a thread to monitor keypress for exit
-    keypress_thread = threading.Thread(target=keypress_exit_monitor)
-    keypress_thread.start()
+    parser = argparse.ArgumentParser(description="Keep the internships table and Google Sheet in sync.")
+    parser.add_argument(
+        "--once", action="store_true",
+        help="Run one Sheets to DB cycle, then one DB to Sheets cycle, and exit (e.g. from cron).",
+    )
+    parser.add_argument(
+        "--compact", action="store_true",
+        help="Purge tombstones older than the retention window once, and exit (SYNC_TOMBSTONES=1 only).",
+    )
+    args = parser.parse_args()
+
+    if args.compact:
+        if not SYNC_TOMBSTONES:
+            sys.exit("--compact needs SYNC_TOMBSTONES=1.")
+        compaction_loop(once=True)
+        sys.exit(0)
+
+    if args.once:
+        # Sheet edits go first so the DB push that follows already includes them
+        sheets_to_db_sync(once=True)
+        db_to_sheets_sync(once=True)
+        sys.exit(0)
+
+    if SYNC_METRICS_PORT:
+        start_metrics_server(SYNC_METRICS_PORT)
+    if SYNC_ADMIN_PORT:
+        start_admin_server(profiler, SYNC_ADMIN_HOST, SYNC_ADMIN_PORT, SYNC_PROFILE_SECONDS)
+    install_signal_handlers(profiler, SYNC_PROFILE_SECONDS)
+
+    # Ctrl+C, or SIGTERM from a service manager, stops the engine gracefully
+    signal.signal(signal.SIGINT, request_shutdown)
+    signal.signal(signal.SIGTERM, request_shutdown)
 
     # Run both syncs concurrently
-    t1 = threading.Thread(target=db_to_sheets_sync)
-    t2 = threading.Thread(target=sheets_to_db_sync)
+    t1 = threading.Thread(target=run_sync_loop, args=(db_to_sheets_sync,), name="db_to_sheets")
+    t2 = threading.Thread(target=run_sync_loop, args=(sheets_to_db_sync,), name="sheets_to_db")
+
+    threads = [t1, t2]
+    if SYNC_TOMBSTONES:
+        threads.append(threading.Thread(target=run_sync_loop, args=(compaction_loop,), name="compaction"))
+
+    for thread in threads:
+        thread.start()
 
-    t1.start()
-    t2.start()
+    # Wait with a timeout rather than indefinitely: on Windows an untimed wait
+    # can't be interrupted by Ctrl+C
+    while not shutdown_event.wait(1.0):
+        pass
 
-    t1.join()
-    t2.join()
-    keypress_thread.join()  # Wait for the keypress thread to finish
+    for thread in threads:
+        thread.join()
+    print("Sync engine stopped.")
+    sys.exit(1 if sync_failed.is_set() else 0)
@@ -0,0 +1,150 @@
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+
+# Buckets wide enough for both a quick no-change poll and a multi-second push
+CYCLE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+QUERY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+SYNC_CYCLE_SECONDS = Histogram(
+    "sync_cycle_duration_seconds",
+    "Duration of one sync cycle (read, hash, and write if anything changed).",
+    ["direction"],
+    buckets=CYCLE_BUCKETS,
+)
+SYNC_ROWS_CHANGED = Counter(
+    "sync_rows_changed_total",
+    "Rows written to the target side, by operation.",
+    ["direction", "operation"],
+)
+SYNC_CELLS_CHANGED = Counter(
+    "sync_cells_changed_total",
+    "Sheet cells updated by DB to Sheets pushes.",
+    ["direction"],
+)
+SYNC_LAST_SUCCESS = Gauge(
+    "sync_last_success_timestamp_seconds",
+    "Unix time of the last cycle that completed without errors.",
+    ["direction"],
+)
+
+SHEETS_API_CALLS = Counter(
+    "sheets_api_calls_total",
+    "Google Sheets API requests, by method and HTTP status.",
+    ["method", "status"],
+)
+SHEETS_API_BYTES = Counter(
+    "sheets_api_bytes_total",
+    "Bytes of JSON sent to and received from the Sheets API.",
+    ["direction"],
+)
+SHEETS_API_THROTTLED = Counter(
+    "sheets_api_throttled_total",
+    "Sheets API requests rejected with 429 Too Many Requests.",
+    ["method"],
+)
+SHEETS_API_SECONDS = Histogram(
+    "sheets_api_request_duration_seconds",
+    "Latency of Sheets API requests.",
+    ["method"],
+    buckets=QUERY_BUCKETS + (10, 30),
+)
+
+DB_QUERY_SECONDS = Histogram(
+    "sync_db_query_duration_seconds",
+    "Latency of the sync engine's MySQL queries.",
+    ["query"],
+    buckets=QUERY_BUCKETS,
+)
+
+LOCK_WAIT_SECONDS = Histogram(
+    "sync_lock_wait_seconds",
+    "Time from first detecting a change until the sync lock was acquired to apply it.",
+    ["direction"],
+    buckets=CYCLE_BUCKETS,
+)
+LOCK_SKIPS = Counter(
+    "sync_lock_skips_total",
+    "Cycles that detected a change but skipped it because the other direction held the lock.",
+    ["direction"],
+)
+
+REPLICATION_LAG_SECONDS = Gauge(
+    "sync_replication_lag_seconds",
+    "Age of the oldest change included in the last applied sync, at the time it was applied.",
+    ["direction"],
+)
+
+SYNC_STATES_COLLAPSED = Counter(
+    "sync_sheet_states_collapsed_total",
+    "Intermediate sheet states (a paste or fill caught mid-edit) folded into one applied change set.",
+)
+SYNC_SETTLE_SECONDS = Histogram(
+    "sync_sheet_settle_seconds",
+    "Time from first seeing a sheet change until it was applied, including the wait for edits to stop.",
+    buckets=CYCLE_BUCKETS,
+)
+SYNC_QUEUE_DEPTH = Gauge(
+    "sync_outbound_queue_rows",
+    "Rows waiting in the durable outbound queue to be written to the sheet.",
+)
+SYNC_QUEUE_COALESCED = Counter(
+    "sync_outbound_coalesced_total",
+    "Row changes folded into a sheet write that was already pending instead of writing the row again.",
+)
+SYNC_QUEUE_FLUSH_FAILURES = Counter(
+    "sync_outbound_flush_failures_total",
+    "Outbound queue flushes that failed and left their rows queued for the next cycle.",
+)
+SYNC_CHANGELOG_GAPS = Gauge(
+    "sync_changelog_open_gaps",
+    "Changelog seqs skipped by a poll (their transactions hadn't committed yet) that are still being waited for.",
+)
+SYNC_CHANGELOG_GAPS_EXPIRED = Counter(
+    "sync_changelog_gaps_expired_total",
+    "Skipped changelog seqs given up on after SYNC_CHANGELOG_GAP_SECONDS, usually rolled back transactions.",
+)
+SYNC_RECONCILE_REPAIRS = Counter(
+    "sync_reconcile_repaired_rows_total",
+    "Rows the periodic full reconcile found out of sync with the DB and queued for the sheet.",
+)
+
+SYNC_WRITE_PARTITIONS = Counter(
+    "sync_write_partitions_total",
+    "Row-range partitions sent to the sheet by DB to Sheets pushes.",
+)
+SYNC_WRITE_RETRIES = Counter(
+    "sync_write_partition_retries_total",
+    "Partition writes retried after a quota, server or network error, by HTTP status.",
+    ["status"],
+)
+SYNC_WRITE_QUOTA_WAIT_SECONDS = Counter(
+    "sync_write_quota_wait_seconds_total",
+    "Time sheet writers spent waiting for the shared per-minute write quota.",
+)
+
+SYNC_TOMBSTONES_PURGED = Counter(
+    "sync_tombstones_purged_total",
+    "Deletes purged by compaction after the retention window: sheet tombstones and changelog entries.",
+    ["side"],
+)
+
+DB_READ_ROUTES = Counter(
+    "sync_db_read_routes_total",
+    "Sync engine reads by the server they went to and why.",
+    ["target", "reason"],
+)
+DB_REPLICA_LAG_SECONDS = Gauge(
+    "sync_db_replica_lag_seconds",
+    "Age of the oldest change the read replica hadn't applied yet, at the last routing check.",
+)
+
+DIRECTIONS = ("db_to_sheets", "sheets_to_db")
+
+
+def start_metrics_server(port):
+    """Expose the sync process's metrics at http://<host>:<port>/metrics."""
+    # Pre-create labelled series so dashboards see zeros rather than gaps
+    for direction in DIRECTIONS:
+        SYNC_CYCLE_SECONDS.labels(direction)
+        LOCK_SKIPS.labels(direction)
+    start_http_server(port)
+    print(f"Serving sync metrics on port {port}.")
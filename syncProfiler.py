@@ -0,0 +1,302 @@
+import cProfile
+import json
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+MODES = ("sample", "cprofile")
+
+
+class ProfilerBusy(Exception):
+    pass
+
+
+class ProfileSession:
+    def __init__(self, mode, seconds):
+        self.mode = mode
+        self.seconds = seconds
+        self.deadline = time.monotonic() + seconds
+        self.started_at = time.strftime("%Y%m%d-%H%M%S")
+        # cProfile mode: only one profiler can be enabled per process at a
+        # time (Python 3.12+ raises otherwise), so the sync threads take
+        # turns, one cycle each, and hand their profiles in at checkpoints
+        self.profiling_thread = None  # Whose turn it is, if anyone's
+        self.waiting = set()  # Threads that found it someone else's turn
+        self.profiles = {}  # Thread name -> profiles of its turns
+        self.lock = threading.Lock()
+        self.collected = threading.Condition(self.lock)
+
+
+class SyncProfiler:
+    """Capture a profile of the running sync process on demand, without restarting it.
+
+    Two modes:
+    - "sample": a background thread samples every thread's stack at a fixed
+      interval and writes folded stacks (flamegraph.pl / speedscope input).
+    - "cprofile": the sync threads take turns running cProfile over one
+      whole cycle each, from one checkpoint to the next, for as long as the
+      window lasts. The turns are merged into a .pstats file.
+    Either mode can also take tracemalloc snapshots at the start and end.
+    """
+
+    def __init__(self, output_dir="profiles", interval=0.005, memory_frames=10):
+        self.output_dir = output_dir
+        self.interval = interval
+        self.memory_frames = memory_frames
+        self.session = None
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    # ----- Called from the sync loops ----- #
+    def checkpoint(self):
+        """End this thread's profiled cycle, or start one if it is its turn. Call once per cycle.
+
+        Never raises: a profiler that can't start is skipped, not fatal to the sync loop.
+        """
+        try:
+            self._checkpoint()
+        except Exception as error:
+            print(f"Profiler checkpoint failed, skipping this cycle {error!r}")
+
+    def _checkpoint(self):
+        name = threading.current_thread().name
+        active = getattr(self.local, "active", None)
+        if active is not None:
+            active_session, profile = active
+            self.local.active = None
+            profile.disable()
+            with active_session.lock:
+                active_session.profiles.setdefault(name, []).append(profile)
+                active_session.profiling_thread = None
+                active_session.collected.notify_all()
+            return
+        session = self.session
+        if session is None or session.mode != "cprofile" or time.monotonic() >= session.deadline:
+            return
+        with session.lock:
+            # A thread that just had a turn lets one that has been waiting go first
+            if session.profiling_thread is not None or (name not in session.waiting and session.waiting - {name}):
+                session.waiting.add(name)
+                return
+            session.waiting.discard(name)
+            session.profiling_thread = name
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as error:
+            # Another profiling tool (a debugger, coverage) already holds the
+            # hook; it won't let go mid-window, so stop trying for this session
+            with session.lock:
+                session.profiling_thread = None
+                session.deadline = time.monotonic()
+                session.collected.notify_all()
+            print(f"Couldn't start cProfile, giving up on this profile {error}")
+            return
+        self.local.active = (session, profile)
+
+    # ----- Capturing ----- #
+    def capture(self, seconds, mode="sample", memory=True, collect_timeout=30):
+        """Profile the process for `seconds`; returns a summary with the written file paths."""
+        if mode not in MODES:
+            raise ValueError(f"Unknown profile mode: {mode}")
+        if not self.lock.acquire(blocking=False):
+            raise ProfilerBusy("A profile is already being captured.")
+        try:
+            session = ProfileSession(mode, seconds)
+            os.makedirs(self.output_dir, exist_ok=True)
+            base_path = os.path.join(self.output_dir, f"sync-{session.started_at}-{mode}")
+
+            started_tracing = False
+            if memory and not tracemalloc.is_tracing():
+                tracemalloc.start(self.memory_frames)
+                started_tracing = True
+            start_snapshot = tracemalloc.take_snapshot() if memory else None
+
+            self.session = session
+            if mode == "sample":
+                stacks = self._sample(session)
+            else:
+                time.sleep(max(0.0, session.deadline - time.monotonic()))
+            self.session = None
+
+            summary = {"mode": mode, "seconds": seconds, "files": {}}
+            if mode == "sample":
+                path = base_path + ".folded"
+                write_folded(path, stacks)
+                summary["files"]["folded"] = path
+                summary["samples"] = sum(stacks.values())
+                summary["top"] = top_leaf_functions(stacks)
+            else:
+                profiles = self._collect(session, collect_timeout)
+                if profiles:
+                    path = base_path + ".pstats"
+                    stats = pstats.Stats(*(profile for turns in profiles.values() for profile in turns))
+                    stats.dump_stats(path)
+                    summary["files"]["pstats"] = path
+                    summary["threads"] = sorted(profiles)
+                    summary["top"] = top_cumulative_functions(stats)
+
+            if memory:
+                end_snapshot = tracemalloc.take_snapshot()
+                if started_tracing:
+                    tracemalloc.stop()
+                path = base_path + "-memory.txt"
+                write_memory_report(path, start_snapshot, end_snapshot)
+                summary["files"]["memory"] = path
+            return summary
+        finally:
+            self.session = None
+            self.lock.release()
+
+    def capture_in_background(self, seconds, mode="sample", memory=True):
+        def run():
+            try:
+                summary = self.capture(seconds, mode, memory)
+                print(f"Profile written: {json.dumps(summary['files'])}")
+            except ProfilerBusy as error:
+                print(error)
+
+        threading.Thread(target=run, daemon=True, name="profiler").start()
+
+    def _sample(self, session):
+        stacks = Counter()
+        own_ident = threading.get_ident()
+        while time.monotonic() < session.deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stacks[fold_stack(names.get(ident, str(ident)), frame)] += 1
+            time.sleep(self.interval)
+        return stacks
+
+    def _collect(self, session, timeout):
+        """Wait for the thread whose turn it is to reach its next checkpoint; returns {thread: [profiles]}."""
+        deadline = time.monotonic() + timeout
+        with session.lock:
+            while session.profiling_thread is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    print(f"Gave up waiting for the profile from {session.profiling_thread}")
+                    break
+                session.collected.wait(remaining)
+            return {name: list(turns) for name, turns in session.profiles.items()}
+
+
+# ===================== Output Formats ===================== #
+def frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ",")
+
+
+def fold_stack(thread_name, frame):
+    """Collapse a stack to 'thread;outermost;...;innermost', the folded flamegraph format."""
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame.f_code))
+        frame = frame.f_back
+    labels.append(thread_name.replace(";", ","))
+    return ";".join(reversed(labels))
+
+
+def write_folded(path, stacks):
+    with open(path, "w") as file:
+        for stack, count in stacks.most_common():
+            file.write(f"{stack} {count}\n")
+
+
+def top_leaf_functions(stacks, limit=10):
+    """Functions that were on top of the stack most often, i.e. where the CPU time went."""
+    leaves = Counter()
+    for stack, count in stacks.items():
+        leaves[stack.rsplit(";", 1)[-1]] += count
+    total = sum(leaves.values()) or 1
+    return [
+        {"function": name, "samples": count, "share": round(count / total, 3)}
+        for name, count in leaves.most_common(limit)
+    ]
+
+
+def top_cumulative_functions(stats, limit=10):
+    entries = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+    return [
+        {
+            "function": f"{name} ({os.path.basename(file_name)}:{line})",
+            "calls": calls,
+            "cumulative_seconds": round(cumulative, 4),
+        }
+        for (file_name, line, name), (_, calls, _, cumulative, _) in entries[:limit]
+    ]
+
+
+def write_memory_report(path, start_snapshot, end_snapshot, limit=25):
+    ignored = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    ]
+    start_snapshot = start_snapshot.filter_traces(ignored)
+    end_snapshot = end_snapshot.filter_traces(ignored)
+    with open(path, "w") as file:
+        file.write(f"Top {limit} allocation sites still alive at the end of the window\n")
+        for stat in end_snapshot.statistics("traceback")[:limit]:
+            file.write(f"\n{stat.size / 1024:.1f} KiB in {stat.count} blocks\n")
+            for line in stat.traceback.format():
+                file.write(f"  {line}\n")
+        file.write(f"\n\nTop {limit} changes over the window, by line\n")
+        for stat in end_snapshot.compare_to(start_snapshot, "lineno")[:limit]:
+            file.write(f"{stat}\n")
+
+
+# ===================== Triggers ===================== #
+def install_signal_handlers(profiler, seconds):
+    """SIGUSR1 captures a sampled profile, SIGUSR2 a cProfile one (POSIX only)."""
+    if not hasattr(signal, "SIGUSR1"):
+        return False
+    signal.signal(signal.SIGUSR1, lambda *_: profiler.capture_in_background(seconds, "sample"))
+    signal.signal(signal.SIGUSR2, lambda *_: profiler.capture_in_background(seconds, "cprofile"))
+    return True
+
+
+def start_admin_server(profiler, host, port, default_seconds):
+    """Serve GET /debug/profile?seconds=N&mode=sample|cprofile&memory=1 on a local port."""
+
+    class AdminHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def send_json(self, payload, status=200):
+            data = json.dumps(payload, indent=2).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path != "/debug/profile":
+                self.send_json({"error": "Not found"}, 404)
+                return
+            query = parse_qs(url.query)
+            try:
+                seconds = float(query.get("seconds", [default_seconds])[0])
+                mode = query.get("mode", ["sample"])[0]
+                memory = query.get("memory", ["1"])[0] != "0"
+                self.send_json(profiler.capture(seconds, mode, memory))
+            except ProfilerBusy as error:
+                self.send_json({"error": str(error)}, 409)
+            except ValueError as error:
+                self.send_json({"error": str(error)}, 400)
+
+    server = ThreadingHTTPServer((host, port), AdminHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="admin-server").start()
+    print(f"Serving profiler at http://{host}:{port}/debug/profile")
+    return server
@@ -0,0 +1,246 @@
+import json
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+# Spans are written in the OTLP/JSON trace format, so the same payload can go
+# to a file or be POSTed to any OTLP/HTTP collector (or traceCollector.py)
+SCOPE_NAME = "sheets-db-sync"
+
+
+class Span:
+    def __init__(self, name, trace_id, parent_id, attributes):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes = dict(attributes)
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    @property
+    def duration(self):
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def to_otlp(self):
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def otlp_attribute(key, value):
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def otlp_payload(service_name, spans):
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": [otlp_attribute("service.name", service_name)]},
+                "scopeSpans": [
+                    {"scope": {"name": SCOPE_NAME}, "spans": [s.to_otlp() for s in spans]}
+                ],
+            }
+        ]
+    }
+
+
+# ===================== Exporters ===================== #
+class FileSpanExporter:
+    """Append each finished trace to a file as one line of OTLP/JSON."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def export(self, service_name, spans):
+        line = json.dumps(otlp_payload(service_name, spans))
+        with self.lock:
+            with open(self.path, "a") as file:
+                file.write(line + "\n")
+
+
+class OtlpHttpSpanExporter:
+    """POST finished traces to an OTLP/HTTP collector from a background thread.
+
+    Export never blocks a sync cycle: traces are queued and dropped (with a
+    count) if the collector can't keep up.
+    """
+
+    def __init__(self, endpoint, max_queue=1000):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+        threading.Thread(target=self._send_loop, daemon=True).start()
+
+    def export(self, service_name, spans):
+        try:
+            self.queue.put_nowait(otlp_payload(service_name, spans))
+        except queue.Full:
+            self.dropped += 1
+
+    def _send_loop(self):
+        import requests
+
+        session = requests.Session()
+        while True:
+            payload = self.queue.get()
+            try:
+                session.post(self.url, json=payload, timeout=5)
+            except requests.RequestException as error:
+                print(f"Failed to export trace to {self.url} {error}")
+
+
+# ===================== Tracer ===================== #
+class Tracer:
+    """Minimal per-thread tracer: one trace per sync cycle, with nested child spans.
+
+    Spans opened outside a trace are no-ops, so instrumented helpers can be
+    called from scripts that don't trace at all.
+    """
+
+    def __init__(self, service_name, exporter=None, slow_threshold=None,
+                 slow_log_path=None, only_changes=True):
+        self.service_name = service_name
+        self.exporter = exporter
+        self.slow_threshold = slow_threshold
+        self.slow_log_path = slow_log_path
+        self.only_changes = only_changes
+        self.local = threading.local()
+
+    def current_span(self):
+        stack = getattr(self.local, "stack", None)
+        return stack[-1] if stack else None
+
+    @contextmanager
+    def trace(self, name, **attributes):
+        """Start a new trace whose root span covers the block."""
+        root = Span(name, os.urandom(16).hex(), None, attributes)
+        self.local.stack = [root]
+        self.local.finished = []
+        try:
+            yield root
+        except BaseException as error:
+            root.error = repr(error)
+            raise
+        finally:
+            root.end_ns = time.time_ns()
+            spans = [root] + self.local.finished
+            self.local.stack = []
+            self.local.finished = []
+            self._finish_trace(root, spans)
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """Record a child span of the current span for the duration of the block."""
+        parent = self.current_span()
+        if parent is None:
+            yield None
+            return
+        span = Span(name, parent.trace_id, parent.span_id, attributes)
+        self.local.stack.append(span)
+        try:
+            yield span
+        except BaseException as error:
+            span.error = repr(error)
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            self.local.stack.pop()
+            self.local.finished.append(span)
+
+    def context(self):
+        """The current span and the trace's finished spans, to continue the trace on another thread."""
+        parent = self.current_span()
+        return None if parent is None else (parent, self.local.finished)
+
+    @contextmanager
+    def attached(self, context):
+        """Record the block's spans under a span from another thread (see context())."""
+        if context is None:
+            yield
+            return
+        parent, finished = context
+        self.local.stack = [parent]
+        self.local.finished = finished
+        try:
+            yield
+        finally:
+            self.local.stack = []
+            self.local.finished = []
+
+    def set_attribute(self, key, value):
+        """Set an attribute on the current span, if there is one."""
+        span = self.current_span()
+        if span is not None:
+            span.set_attribute(key, value)
+
+    def _finish_trace(self, root, spans):
+        slow = self.slow_threshold is not None and root.duration > self.slow_threshold
+        if slow:
+            self._log_slow_cycle(root, spans)
+        if self.exporter is None:
+            return
+        # Idle polls are the vast majority of cycles; by default only keep the
+        # ones that changed something, failed or were slow
+        if self.only_changes and not (root.attributes.get("changed") or root.error or slow):
+            return
+        try:
+            self.exporter.export(self.service_name, spans)
+        except OSError as error:
+            print(f"Failed to export trace {error}")
+
+    def _log_slow_cycle(self, root, spans):
+        breakdown = ", ".join(
+            f"{span.name}={span.duration:.3f}s" for span in sorted(spans[1:], key=lambda s: s.start_ns)
+        )
+        line = (
+            f"{time.strftime('%Y-%m-%dT%H:%M:%S')} slow {root.name} "
+            f"{root.duration:.3f}s (threshold {self.slow_threshold}s) "
+            f"trace={root.trace_id} {json.dumps(root.attributes)} [{breakdown}]"
+        )
+        print(line)
+        if self.slow_log_path:
+            with open(self.slow_log_path, "a") as file:
+                file.write(line + "\n")
+
+
+def tracer_from_env(service_name):
+    """Build the tracer configured by the SYNC_TRACE_* environment variables."""
+    exporter_name = os.environ.get("SYNC_TRACE_EXPORTER", "none")
+    exporter = None
+    if exporter_name == "file":
+        exporter = FileSpanExporter(os.environ.get("SYNC_TRACE_FILE", "sync_traces.jsonl"))
+    elif exporter_name == "otlp":
+        exporter = OtlpHttpSpanExporter(
+            os.environ.get("SYNC_TRACE_OTLP_ENDPOINT", "http://127.0.0.1:4318")
+        )
+    return Tracer(
+        service_name,
+        exporter=exporter,
+        slow_threshold=float(os.environ.get("SYNC_SLOW_CYCLE_SECONDS", 10)),
+        slow_log_path=os.environ.get("SYNC_SLOW_CYCLE_LOG", "slow_cycles.log"),
+        only_changes=os.environ.get("SYNC_TRACE_ALL_CYCLES", "0") != "1",
+    )
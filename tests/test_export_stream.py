@@ -0,0 +1,51 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'flask_app'))
+
+import mysql.connector  # noqa: E402
+
+import app  # noqa: E402
+
+
+class UnreadCursor:
+    """Unbuffered cursor that, like mysql-connector, won't close with rows left unread."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute(self, query, params):
+        pass
+
+    def fetchmany(self, size):
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+    def close(self):
+        if self.rows:
+            raise mysql.connector.errors.InternalError('Unread result found')
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.closed = False
+
+    def cursor(self, buffered=True):
+        return UnreadCursor(self.rows)
+
+    def close(self):
+        self.closed = True
+
+
+def test_abandoned_export_closes_its_connection(monkeypatch):
+    """A client disconnecting midway still releases the export's connection."""
+    conn = FakeConnection([(i,) for i in range(10)])
+    monkeypatch.setattr(app.mysql.connector, 'connect', lambda **config: conn)
+    monkeypatch.setattr(app, 'EXPORT_FETCH_SIZE', 3)
+
+    batches = app.iter_export_batches(['id'], {'q': '', 'cgpa_min': None, 'cgpa_max': None})
+    assert next(batches) == [(0,), (1,), (2,)]
+    batches.close()
+
+    assert conn.closed
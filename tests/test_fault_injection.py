@@ -0,0 +1,30 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import googleApiEmulator  # noqa: E402
+import syncDbAndSheet as sync  # noqa: E402
+
+
+def test_once_cycle_survives_failed_sheet_read(tmp_path, monkeypatch):
+    """An injected 503 on every read fails the cycle without stopping the process."""
+    server, state = googleApiEmulator.serve(
+        "127.0.0.1", 0, googleApiEmulator.EmulatorConfig(failure_rate=1.0)
+    )
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "spreadsheet_id.txt").write_text("faults")
+    monkeypatch.setattr(sync, "GOOGLE_API_EMULATOR_URL", f"http://127.0.0.1:{server.server_address[1]}")
+    monkeypatch.setattr(sync, "thread_clients", type(sync.thread_clients)())
+    monkeypatch.setattr(sync, "shard_map", None)
+    last_success = sync.SYNC_LAST_SUCCESS.labels("sheets_to_db")
+    last_success.set(0)
+    try:
+        sync.run_sync_loop(lambda: sync.sheets_to_db_sync(once=True))
+        assert state.calls["values.get"] >= 1
+        assert not sync.sync_failed.is_set()
+        assert last_success._value.get() == 0
+    finally:
+        sync.sync_failed.clear()
+        sync.shutdown_event.clear()
+        server.shutdown()
@@ -0,0 +1,66 @@
+import argparse
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def summarize(payload):
+    """Yield one line per trace: root span name, duration and its child spans."""
+    for resource_spans in payload.get("resourceSpans", []):
+        for scope_spans in resource_spans.get("scopeSpans", []):
+            spans = scope_spans.get("spans", [])
+            for root in (s for s in spans if not s.get("parentSpanId")):
+                duration = (int(root["endTimeUnixNano"]) - int(root["startTimeUnixNano"])) / 1e9
+                children = ", ".join(
+                    f"{s['name']}={(int(s['endTimeUnixNano']) - int(s['startTimeUnixNano'])) / 1e6:.1f}ms"
+                    for s in spans
+                    if s.get("parentSpanId") == root["spanId"]
+                )
+                yield f"{root['traceId'][:8]} {root['name']} {duration * 1000:.1f}ms [{children}]"
+
+
+def make_handler(output_path):
+    class TraceHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != "/v1/traces":
+                self.send_error(404)
+                return
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                self.send_error(400, "Only OTLP/JSON is supported")
+                return
+
+            for line in summarize(payload):
+                print(line)
+            if output_path:
+                with open(output_path, "a") as file:
+                    file.write(json.dumps(payload) + "\n")
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, format, *args):
+            pass
+
+    return TraceHandler
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Minimal OTLP/HTTP (JSON) trace receiver for local debugging of the sync engine."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4318)
+    parser.add_argument("--output", default="collected_traces.jsonl",
+                        help="Append received payloads here (empty to only print).")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.output))
+    print(f"Collecting traces on http://{args.host}:{args.port}/v1/traces")
+    server.serve_forever()
@@ -1,10 +1,12 @@
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
 import os.path
-from googleapiclient.http import MediaFileUpload
-from googleapiclient.discovery import build
+import argparse
+import json
 import os
+import random
+import time
+
+from googleApiEmulator import emulator_http
+from googleServices import build_service
 
 # Updated scopes to include both Google Sheets and Drive permissions
 SCOPES = [
@@ -12,15 +14,44 @@ SCOPES = [
     "https://www.googleapis.com/auth/drive"
 ]
 
+SPREADSHEET_MIME_TYPE = "application/vnd.google-apps.spreadsheet"
+XLSX_MIME_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Local name -> file ID cache, so repeated runs don't have to list Drive
+FILE_CACHE_PATH = "drive_file_cache.json"
+# Cached IDs younger than this are trusted without asking Drive at all
+FILE_CACHE_TTL_SECONDS = 24 * 60 * 60
+
+# Resumable upload sessions in progress, so an interrupted upload can continue
+UPLOAD_SESSIONS_PATH = "upload_sessions.json"
+
+# Drive requires chunk sizes to be a multiple of 256 KiB
+CHUNK_SIZE_UNIT = 256 * 1024
+DEFAULT_CHUNK_SIZE = 32 * CHUNK_SIZE_UNIT  # 8 MiB
+MAX_CHUNK_ATTEMPTS = 5
+
+# Base URL of googleApiEmulator.py; when set, Drive calls go there instead of Google
+GOOGLE_API_EMULATOR_URL = os.environ.get("GOOGLE_API_EMULATOR_URL")
+
+# The Drive client is built once and shared by the lookup and the upload
+_drive_service = None
+
 
 def google_sheets_auth():
+    from google.oauth2.credentials import Credentials
+
     creds = None
     if os.path.exists("token.json"):
         creds = Credentials.from_authorized_user_file("token.json", SCOPES)
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
+            from google.auth.transport.requests import Request
+
             creds.refresh(Request())
         else:
+            # Only needed for the first, interactive sign-in
+            from google_auth_oauthlib.flow import InstalledAppFlow
+
             flow = InstalledAppFlow.from_client_secrets_file("credentials.json", SCOPES)
             creds = flow.run_local_server(port=8080)
         with open("token.json", "w") as token:
@@ -28,52 +59,250 @@ def google_sheets_auth():
     return creds
 
 
-def file_exists_in_drive(file_name):
-    creds = google_sheets_auth()
-    drive_service = build("drive", "v3", credentials=creds)
+def get_drive_service():
+    global _drive_service
+    if _drive_service is None:
+        if GOOGLE_API_EMULATOR_URL:
+            _drive_service = build_service("drive", "v3", http=emulator_http(GOOGLE_API_EMULATOR_URL))
+        else:
+            _drive_service = build_service("drive", "v3", credentials=google_sheets_auth())
+    return _drive_service
+
+
+def load_json(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as file:
+        return json.load(file)
+
+
+def save_json(path, data):
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as file:
+        json.dump(data, file, indent=2)
+    os.replace(temp_path, path)
+
+
+def escape_query_value(value):
+    """Escape a value for use inside a single-quoted Drive query string."""
+    return value.replace("\\", "\\\\").replace("'", "\\'")
+
+
+# ===================== File Lookup ===================== #
+def cache_key(file_name, folder_id):
+    return f"{folder_id or 'root'}/{file_name}"
+
+
+def cached_file_id(file_name, folder_id=None):
+    """Return a cached file ID if it is still valid, revalidating stale entries with a single get."""
+    from googleapiclient.errors import HttpError
+
+    cache = load_json(FILE_CACHE_PATH)
+    entry = cache.get(cache_key(file_name, folder_id))
+    if not entry:
+        return None
+
+    if time.time() - entry["validated_at"] < FILE_CACHE_TTL_SECONDS:
+        return entry["id"]
+
+    try:
+        file = (
+            get_drive_service()
+            .files()
+            .get(fileId=entry["id"], fields="id, name, trashed")
+            .execute()
+        )
+    except HttpError as error:
+        if error.resp.status != 404:
+            raise
+        file = None
+
+    if file and not file.get("trashed") and file.get("name") == file_name:
+        remember_file_id(file_name, folder_id, entry["id"])
+        return entry["id"]
+
+    # The file was deleted, trashed or renamed, so forget it
+    cache.pop(cache_key(file_name, folder_id), None)
+    save_json(FILE_CACHE_PATH, cache)
+    return None
+
+
+def remember_file_id(file_name, folder_id, file_id):
+    cache = load_json(FILE_CACHE_PATH)
+    cache[cache_key(file_name, folder_id)] = {"id": file_id, "validated_at": time.time()}
+    save_json(FILE_CACHE_PATH, cache)
+
 
-    # Search for the file by name
-    query = f"name='{file_name}'"
-    results = drive_service.files().list(q=query, fields="files(id, name)").execute()
+def file_exists_in_drive(file_name, folder_id=None):
+    file_id = cached_file_id(file_name, folder_id)
+    if file_id:
+        print(f"File already exists in Drive (cached). File ID: {file_id}")
+        return file_id
+
+    # Search for a live spreadsheet with exactly this name, in the target folder if given
+    query = (
+        f"name = '{escape_query_value(file_name)}' "
+        f"and mimeType = '{SPREADSHEET_MIME_TYPE}' and trashed = false"
+    )
+    if folder_id:
+        query += f" and '{escape_query_value(folder_id)}' in parents"
+    results = (
+        get_drive_service()
+        .files()
+        .list(q=query, spaces="drive", pageSize=1, fields="files(id, name)")
+        .execute()
+    )
     files = results.get("files", [])
 
     if files:
         print(f"File already exists in Drive. File ID: {files[0]['id']}")
+        remember_file_id(file_name, folder_id, files[0]["id"])
         return files[0]["id"]
     else:
         return None
 
 
-def upload_excel_to_sheets(file_path):
+# ===================== Resumable Upload ===================== #
+def print_progress(bytes_sent, total_bytes):
+    percent = 100.0 * bytes_sent / total_bytes if total_bytes else 100.0
+    print(f"Uploaded {bytes_sent}/{total_bytes} bytes ({percent:.1f}%)")
+
+
+def session_fingerprint(file_path):
+    stat = os.stat(file_path)
+    return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+
+def create_upload_request(file_path, file_name, folder_id, chunk_size):
+    from googleapiclient.http import MediaFileUpload
+
+    file_metadata = {"name": file_name, "mimeType": SPREADSHEET_MIME_TYPE}
+    if folder_id:
+        file_metadata["parents"] = [folder_id]
+    media = MediaFileUpload(
+        file_path, mimetype=XLSX_MIME_TYPE, chunksize=chunk_size, resumable=True
+    )
+    return get_drive_service().files().create(
+        body=file_metadata, media_body=media, fields="id"
+    )
+
+
+def resume_upload_session(request, file_path):
+    """Point `request` at an interrupted session for the same, unchanged file, if Drive still has it.
+
+    Drive is asked how many bytes it holds with an empty PUT carrying
+    `Content-Range: bytes */<size>`, and the upload continues from there.
+    Returns the uploaded file if the session had in fact finished, else None.
+    """
+    sessions = load_json(UPLOAD_SESSIONS_PATH)
+    session = sessions.get(os.path.abspath(file_path))
+    if not session or session["fingerprint"] != session_fingerprint(file_path):
+        return None
+
+    total_bytes = os.path.getsize(file_path)
+    response, content = request.http.request(
+        session["uri"],
+        method="PUT",
+        body=b"",
+        headers={"Content-Range": f"bytes */{total_bytes}", "Content-Length": "0"},
+    )
+    if response.status in (200, 201):
+        return json.loads(content)
+    if response.status != 308:
+        # Expired (404/410) or otherwise unusable, so start a new session
+        print(f"Previous upload session is no longer valid ({response.status}), starting over...")
+        clear_upload_session(file_path)
+        return None
+
+    # Range is "bytes=0-<last byte received>", and absent if nothing arrived
+    received = response.get("range")
+    request.resumable_uri = session["uri"]
+    request.resumable_progress = int(received.rsplit("-", 1)[1]) + 1 if received else 0
+    print(f"Resuming previous upload session at byte {request.resumable_progress}...")
+    return None
+
+
+def save_upload_session(file_path, uri):
+    sessions = load_json(UPLOAD_SESSIONS_PATH)
+    sessions[os.path.abspath(file_path)] = {
+        "uri": uri,
+        "fingerprint": session_fingerprint(file_path),
+    }
+    save_json(UPLOAD_SESSIONS_PATH, sessions)
+
+
+def clear_upload_session(file_path):
+    sessions = load_json(UPLOAD_SESSIONS_PATH)
+    if sessions.pop(os.path.abspath(file_path), None) is not None:
+        save_json(UPLOAD_SESSIONS_PATH, sessions)
+
+
+def run_resumable_upload(request, file_path, progress_callback):
+    """Send the upload chunk by chunk, retrying failed chunks with exponential backoff."""
+    from googleapiclient.errors import HttpError
+
+    total_bytes = os.path.getsize(file_path)
+    response = None
+    attempts = 0
+    while response is None:
+        try:
+            status, response = request.next_chunk()
+        except (HttpError, OSError) as error:
+            retriable = not isinstance(error, HttpError) or error.resp.status in (
+                429, 500, 502, 503, 504,
+            )
+            if request.resumable_uri:
+                save_upload_session(file_path, request.resumable_uri)
+            attempts += 1
+            if not retriable or attempts >= MAX_CHUNK_ATTEMPTS:
+                # The session is kept on disk so the next run resumes from here
+                raise
+            delay = min(2**attempts + random.random(), 60)
+            print(f"Chunk upload failed ({error}), retrying in {delay:.1f}s...")
+            time.sleep(delay)
+            continue
+
+        attempts = 0
+        if request.resumable_uri:
+            save_upload_session(file_path, request.resumable_uri)
+        if status and progress_callback:
+            progress_callback(status.resumable_progress, total_bytes)
+
+    if progress_callback:
+        progress_callback(total_bytes, total_bytes)
+    return response
+
+
+def upload_excel_to_sheets(
+    file_path, chunk_size=DEFAULT_CHUNK_SIZE, progress_callback=print_progress, folder_id=None
+):
+    from googleapiclient.errors import HttpError
+
     # Get the file name from the path
     file_name = os.path.basename(file_path).split(".")[0]
 
     # Check if the file already exists in Google Drive
-    file_id = file_exists_in_drive(file_name)
+    file_id = file_exists_in_drive(file_name, folder_id)
 
     if file_id:
         # If the file exists, return the file ID without uploading again
         return file_id
     else:
-        # Otherwise, upload the file to Google Drive
-        creds = google_sheets_auth()
-        drive_service = build("drive", "v3", credentials=creds)
-
-        file_metadata = {
-            "name": file_name,
-            "mimeType": "application/vnd.google-apps.spreadsheet",
-        }
-        media = MediaFileUpload(
-            file_path,
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        )
+        # Otherwise, upload the file to Google Drive in resumable chunks
+        request = create_upload_request(file_path, file_name, folder_id, chunk_size)
+        try:
+            file = resume_upload_session(request, file_path)
+            if file is None:
+                file = run_resumable_upload(request, file_path, progress_callback)
+        except HttpError as error:
+            if error.resp.status in (404, 410):
+                # The saved session expired; start over on the next run
+                clear_upload_session(file_path)
+            raise
+        clear_upload_session(file_path)
 
-        file = (
-            drive_service.files()
-            .create(body=file_metadata, media_body=media, fields="id")
-            .execute()
-        )
         print(f'File uploaded successfully. File ID: {file.get("id")}')
+        remember_file_id(file_name, folder_id, file.get("id"))
         return file.get("id")
 
 
@@ -83,11 +312,28 @@ def save_spreadsheet_id(file_id):
         file.write(file_id)
 
 
-# Example usage:
-file_path = "Super.xlsx"  # Path to your uploaded Excel file
+def parse_args():
+    parser = argparse.ArgumentParser(description="Upload an Excel workbook to Drive as a Google Sheet.")
+    parser.add_argument("file_path", nargs="?", default="Super.xlsx", help="Workbook to upload.")
+    parser.add_argument(
+        "--chunk-size-mb", type=float, default=DEFAULT_CHUNK_SIZE / (1024 * 1024),
+        help="Upload chunk size in MiB (rounded to a multiple of 256 KiB).",
+    )
+    parser.add_argument("--folder-id", help="Drive folder to look up and upload into.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    chunk_size = max(
+        CHUNK_SIZE_UNIT,
+        int(args.chunk_size_mb * 1024 * 1024) // CHUNK_SIZE_UNIT * CHUNK_SIZE_UNIT,
+    )
 
-# Upload the Excel file to Google Sheets or use the existing file
-spreadsheet_id = upload_excel_to_sheets(file_path)
+    # Upload the Excel file to Google Sheets or use the existing file
+    spreadsheet_id = upload_excel_to_sheets(
+        args.file_path, chunk_size=chunk_size, folder_id=args.folder_id
+    )
 
-# Save the spreadsheet ID in a text file for later use
-save_spreadsheet_id(spreadsheet_id)
+    # Save the spreadsheet ID in a text file for later use
+    save_spreadsheet_id(spreadsheet_id)
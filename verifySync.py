@@ -0,0 +1,242 @@
+import argparse
+import hashlib
+import json
+import sys
+import time
+from collections import defaultdict
+
+import syncDbAndSheet as sync
+
+COLUMNS = ["id", "company_name", "job_title", "cgpa_cutoff", "remarks"]
+
+# Data rows start on sheet row 3, below the title and header rows
+FIRST_DATA_ROW = 3
+
+# Canonical text of a row, identical to sync.canonical_row(), so both sides
+# hash the same bytes: trimmed text, NULL as empty, CGPA to two decimals
+CANONICAL_ROW_SQL = """
+CONCAT_WS('|', id,
+    TRIM(COALESCE(company_name, '')),
+    TRIM(COALESCE(job_title, '')),
+    COALESCE(CAST(ROUND(cgpa_cutoff, 2) AS DECIMAL(10, 2)), ''),
+    TRIM(COALESCE(remarks, '')))
+"""
+
+BUCKET_CHECKSUM_QUERY = f"""
+SELECT FLOOR(id / %s) AS bucket,
+       COUNT(*),
+       BIT_XOR(CAST(CONV(LEFT(MD5({CANONICAL_ROW_SQL}), 16), 16, 10) AS UNSIGNED))
+FROM internships
+GROUP BY bucket
+"""
+
+
+def row_checksum(canonical):
+    return int(hashlib.md5(canonical.encode("utf-8")).hexdigest()[:16], 16)
+
+
+# ===================== Sheet Side ===================== #
+def read_sheet_pages(spreadsheet_id, page_rows, pages_per_call, stats):
+    """Yield (sheet row, values) for all data rows of every shard, reading several pages per batchGet.
+
+    The sheet row is a row number, or "<shard>!<row number>" once the sheet
+    is sharded (see SYNC_SHARD_ROWS).
+    """
+    sheet = sync.get_sheets_service().spreadsheets()
+    shards = sync.load_shard_map(spreadsheet_id).all()
+    for shard in shards:
+        start_row = FIRST_DATA_ROW
+        while True:
+            ranges = [
+                shard.range(f"A{start_row + page * page_rows}:F{start_row + (page + 1) * page_rows - 1}")
+                for page in range(pages_per_call)
+            ]
+            result = sync.execute_sheets_request(
+                sheet.values().batchGet(spreadsheetId=shard.spreadsheet_id, ranges=ranges), "batchGet"
+            )
+            stats["sheet_api_calls"] += 1
+            value_ranges = result.get("valueRanges", [])
+            for page, value_range in enumerate(value_ranges):
+                first_row = start_row + page * page_rows
+                for offset, values in enumerate(value_range.get("values", [])):
+                    row_number = first_row + offset
+                    yield row_number if len(shards) == 1 else f"{shard.name}!{row_number}", values
+            # Ranges come back without their trailing blank rows, so a short page
+            # may just end in a gap; only an empty last page means the data is over
+            if not value_ranges or not value_ranges[-1].get("values"):
+                break
+            start_row += pages_per_call * page_rows
+
+
+def summarize_sheet(spreadsheet_id, bucket_size, page_rows, pages_per_call, stats):
+    """Bucket checksums of the sheet, plus its rows by id for drill-down."""
+    buckets = defaultdict(lambda: [0, 0])
+    rows_by_id = {}
+    duplicate_ids = defaultdict(list)
+    unparseable_rows = []
+    for row_number, values in read_sheet_pages(spreadsheet_id, page_rows, pages_per_call, stats):
+        # Tombstones (SYNC_TOMBSTONES=1) are deleted rows, like blank ones
+        if not any(str(cell).strip() for cell in values) or sync.is_tombstone(values):
+            continue
+        row_id = str(values[0]).strip() if values else ""
+        if not row_id.lstrip("-").isdigit():
+            unparseable_rows.append(row_number)
+            continue
+        row_id = int(row_id)
+        if row_id in rows_by_id:
+            duplicate_ids[row_id].append(row_number)
+        rows_by_id[row_id] = (row_number, values)
+        bucket = buckets[row_id // bucket_size]
+        bucket[0] += 1
+        bucket[1] ^= row_checksum(sync.canonical_row(values))
+    return buckets, rows_by_id, dict(duplicate_ids), unparseable_rows
+
+
+# ===================== DB Side ===================== #
+def summarize_database(cursor, bucket_size):
+    cursor.execute(BUCKET_CHECKSUM_QUERY, (bucket_size,))
+    return {int(bucket): [int(count), int(checksum or 0)] for bucket, count, checksum in cursor.fetchall()}
+
+
+def fetch_bucket_rows(cursor, bucket, bucket_size):
+    cursor.execute(
+        "SELECT id, company_name, job_title, cgpa_cutoff, remarks FROM internships "
+        "WHERE id >= %s AND id < %s",
+        (bucket * bucket_size, (bucket + 1) * bucket_size),
+    )
+    return {row[0]: row for row in cursor.fetchall()}
+
+
+# ===================== Comparison ===================== #
+def compare_bucket(bucket, bucket_size, db_rows, sheet_rows_by_id):
+    low, high = bucket * bucket_size, (bucket + 1) * bucket_size
+    sheet_rows = {
+        row_id: entry for row_id, entry in sheet_rows_by_id.items() if low <= row_id < high
+    }
+    report = {
+        "only_in_db": sorted(set(db_rows) - set(sheet_rows)),
+        "only_in_sheet": sorted(set(sheet_rows) - set(db_rows)),
+        "cells": [],
+    }
+    for row_id in sorted(set(db_rows) & set(sheet_rows)):
+        row_number, values = sheet_rows[row_id]
+        db_parts = sync.canonical_row(db_rows[row_id]).split("|", len(COLUMNS) - 1)
+        sheet_parts = sync.canonical_row(values).split("|", len(COLUMNS) - 1)
+        for column, db_value, sheet_value in zip(COLUMNS, db_parts, sheet_parts):
+            if db_value != sheet_value:
+                report["cells"].append({
+                    "id": row_id,
+                    "sheet_row": row_number,
+                    "column": column,
+                    "db": db_value,
+                    "sheet": sheet_value,
+                })
+    return report
+
+
+def verify(spreadsheet_id, bucket_size, page_rows, pages_per_call, max_buckets):
+    """Compare DB and sheet without writing to either; returns a JSON-serialisable report."""
+    started = time.perf_counter()
+    stats = {"sheet_api_calls": 0}
+    sheet_buckets, sheet_rows, duplicate_ids, unparseable_rows = summarize_sheet(
+        spreadsheet_id, bucket_size, page_rows, pages_per_call, stats
+    )
+
+    connection = sync.connect_db("read")
+    try:
+        cursor = connection.cursor()
+        db_buckets = summarize_database(cursor, bucket_size)
+        mismatched = sorted(
+            bucket
+            for bucket in set(db_buckets) | set(sheet_buckets)
+            if db_buckets.get(bucket) != sheet_buckets.get(bucket)
+        )
+
+        differences = []
+        for bucket in mismatched[:max_buckets]:
+            db_rows = fetch_bucket_rows(cursor, bucket, bucket_size)
+            detail = compare_bucket(bucket, bucket_size, db_rows, sheet_rows)
+            detail["bucket"] = [bucket * bucket_size, (bucket + 1) * bucket_size - 1]
+            differences.append(detail)
+        cursor.close()
+    finally:
+        connection.close()
+
+    return {
+        "in_sync": not mismatched and not duplicate_ids and not unparseable_rows,
+        "db_rows": sum(count for count, _ in db_buckets.values()),
+        "sheet_rows": len(sheet_rows),
+        "buckets": len(set(db_buckets) | set(sheet_buckets)),
+        "mismatched_buckets": len(mismatched),
+        "drilled_buckets": min(len(mismatched), max_buckets),
+        "sheet_api_calls": stats["sheet_api_calls"],
+        "db_queries": 1 + min(len(mismatched), max_buckets),
+        "duplicate_sheet_ids": {str(row_id): rows for row_id, rows in duplicate_ids.items()},
+        "unparseable_sheet_rows": unparseable_rows,
+        "differences": differences,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def print_report(report, max_cells):
+    print(
+        f"DB rows: {report['db_rows']}  Sheet rows: {report['sheet_rows']}  "
+        f"Buckets: {report['buckets']} ({report['mismatched_buckets']} differ)  "
+        f"Sheets calls: {report['sheet_api_calls']}  DB queries: {report['db_queries']}  "
+        f"{report['seconds']}s"
+    )
+    for row_id, rows in report["duplicate_sheet_ids"].items():
+        print(f"Duplicate id {row_id} on sheet rows {rows}")
+    if report["unparseable_sheet_rows"]:
+        print(f"Sheet rows without a numeric id: {report['unparseable_sheet_rows'][:20]}")
+
+    shown = 0
+    for detail in report["differences"]:
+        low, high = detail["bucket"]
+        print(f"\nIds {low}-{high}:")
+        if detail["only_in_db"]:
+            print(f"  Only in DB: {detail['only_in_db']}")
+        if detail["only_in_sheet"]:
+            print(f"  Only in sheet: {detail['only_in_sheet']}")
+        for cell in detail["cells"]:
+            if shown >= max_cells:
+                break
+            print(
+                f"  id {cell['id']} (sheet row {cell['sheet_row']}) {cell['column']}: "
+                f"DB {cell['db']!r} != sheet {cell['sheet']!r}"
+            )
+            shown += 1
+    if report["mismatched_buckets"] > report["drilled_buckets"]:
+        print(f"\n{report['mismatched_buckets'] - report['drilled_buckets']} more differing buckets not shown.")
+    print("\nIn sync." if report["in_sync"] else "\nDrift detected.")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Read-only check that MySQL and the sheet agree, using bucketed checksums."
+    )
+    parser.add_argument("--spreadsheet-id", help="Defaults to the contents of spreadsheet_id.txt.")
+    parser.add_argument("--bucket-size", type=int, default=1000, help="Ids per checksum bucket.")
+    parser.add_argument("--page-rows", type=int, default=20000, help="Sheet rows per range read.")
+    parser.add_argument("--pages-per-call", type=int, default=5, help="Ranges per batchGet call.")
+    parser.add_argument("--max-buckets", type=int, default=50, help="Differing buckets to drill into.")
+    parser.add_argument("--max-cells", type=int, default=200, help="Differing cells to print.")
+    parser.add_argument("--json", help="Also write the full report to this file.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = verify(
+        args.spreadsheet_id or sync.read_spreadsheet_id(),
+        args.bucket_size,
+        args.page_rows,
+        args.pages_per_call,
+        args.max_buckets,
+    )
+    print_report(report, args.max_cells)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(report, file, indent=2)
+    # Non-zero on drift so it can gate scripts and alerts
+    sys.exit(0 if report["in_sync"] else 1)